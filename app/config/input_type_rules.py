@@ -0,0 +1,40 @@
+"""
+Default rule table for input type detection.
+
+Rules are checked in priority order: the first rule with a pattern that
+matches anywhere in the lowercased input decides the type. Patterns are
+regular expressions. Rules with requires_previous only apply when there is
+a previous input to respond to. A JSON file with the same structure can
+replace this table (see InputTypeClassifier.from_env).
+"""
+
+INPUT_TYPE_RULES = [
+    {
+        "input_type": "preference_update",
+        "patterns": [r'i prefer', r'i like', r'i want', r'i would rather', r'set preference', r'update preference']
+    },
+    {
+        "input_type": "preference_removal",
+        "patterns": [r'remove preference', r"don't prefer", r"don't like", r'remove', r'delete preference']
+    },
+    {
+        "input_type": "preference_query",
+        "patterns": [r'what are my preferences', r'show preferences', r'list preferences', r'get preferences']
+    },
+    {
+        "input_type": "clarification_response",
+        "patterns": [
+            r'^yes', r'^no', r'^actually', r'^i meant', r'^to clarify',
+            r'^let me clarify', r'^what i meant'
+        ],
+        "requires_previous": True
+    },
+    {
+        "input_type": "rewrite_request",
+        "patterns": [r'rewrite', r'rephrase', r'change', r'modify']
+    },
+    {
+        "input_type": "input_enhancement",
+        "patterns": [r'add more', r'enhance', r'elaborate', r'provide more']
+    }
+]
@@ -0,0 +1,157 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+
+# Attributes every LogRecord has; anything else was passed via extra= and is emitted as a field
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including extra= fields"""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class SamplingFilter(logging.Filter):
+    """
+    Per-logger rate limiting: each (logger, module, level) gets a token bucket
+    of `rate` records per second with `burst` capacity. Records over the limit
+    are dropped before they are queued; the number dropped is reported on the
+    next record that gets through as `suppressed`.
+    """
+    def __init__(self, rate: float = 20.0, burst: int = 100, error_rate: float = 100.0):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.error_rate = error_rate
+        self._buckets: Dict[Tuple[str, str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.module, record.levelno)
+        rate = self.error_rate if record.levelno >= logging.ERROR else self.rate
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                # [tokens, last refill, suppressed since last emitted record]
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1.0
+            if bucket[2]:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks the caller and defers formatting.
+    Records are enqueued as-is, so %-style arguments are only rendered on the
+    listener thread; when the queue is full the record is dropped and counted.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None, queue_size: int = 10000):
+    """
+    Route all logging through a bounded in-memory queue drained by a background
+    thread, so stdout/disk I/O never runs on the event loop. Configured from
+    LOG_LEVEL (default INFO), LOG_FORMAT ('json' or 'text', default json),
+    LOG_SAMPLE_RATE and LOG_SAMPLE_BURST.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    level = level or os.getenv("LOG_LEVEL", "INFO")
+    fmt = fmt or os.getenv("LOG_FORMAT", "json")
+
+    output = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    _queue_handler.addFilter(SamplingFilter(
+        rate=float(os.getenv("LOG_SAMPLE_RATE", "20")),
+        burst=int(os.getenv("LOG_SAMPLE_BURST", "100"))
+    ))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def _restart_listener_after_fork():
+    # Only the calling thread survives fork(), so a preloaded app's listener
+    # thread is gone in each worker. The inherited queue's lock may have been
+    # held by that thread, so start a fresh listener on a fresh queue.
+    global _listener
+    if _listener is not None and _queue_handler is not None:
+        log_queue: queue.Queue = queue.Queue(maxsize=_listener.queue.maxsize)
+        _queue_handler.queue = log_queue
+        _listener = QueueListener(log_queue, *_listener.handlers, respect_handler_level=True)
+        _listener.start()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def logging_metrics() -> Dict[str, int]:
+    """Records dropped because the log queue was full"""
+    return {"dropped": _queue_handler.dropped if _queue_handler else 0}
+
+def summarize_details(details: Dict, max_length: int = 200) -> Dict:
+    """Truncate long values (raw inputs, LLM responses) so error logs stay bounded"""
+    return {
+        key: value[:max_length] + "..." if isinstance(value, str) and len(value) > max_length else value
+        for key, value in details.items()
+    }
@@ -1,22 +1,41 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
-from app.middleware.auth import auth_middleware
-from app.middleware.rate_limit import limiter, rate_limit_handler
-from app.nodes.validation import create_validation_workflow
+from app.middleware.auth import auth_middleware, token_cache
+from app.middleware.rate_limit import limiter, rate_limit_handler, user_limiter, user_rate_limit_handler
+from app.middleware.admission import admission_controller, overload_handler
+from app.middleware.token_budget import token_budget, estimate_tokens
+from app.middleware.idempotency import IdempotencyStore, idempotency_store, idempotency_conflict_handler
+from app.utils.exceptions import OverloadedError, IdempotencyConflictError, UserRateLimitExceeded
+from app.nodes.validation import create_validation_workflow, preference_store
 from app.models.graph_state import GraphState
 from app.models.user_input import UserInput
 from app.models.validation_result import ValidationResult
+from app.models.batch import BatchValidationRequest
+from app.models.job import JobSubmitRequest
+from app.utils.batch_validator import validate_batch
+from app.utils.job_manager import JobManager
+from app.utils.llm_client import track_token_usage
+from app.utils.deadline import request_deadline
+from app.utils.local_classifier import local_classifier
+from app.utils.session_memory import session_memory_store
+from app.utils.result_cache import validation_result_cache
+from app.utils.guardrails import guardrails_service
+from app.utils.json_response import ModelJSONResponse
+from app.nodes.example_generation import generate_examples
+from app.config.logging_config import configure_logging, logging_metrics
+from contextlib import asynccontextmanager
+from typing import Optional
+from pydantic_core import to_jsonable_python
+import json
 import logging
+import os
 import uvicorn
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Configure logging (queued, so log I/O never blocks the event loop)
+configure_logging()
 
 # Initialize FastAPI app
 app = FastAPI(title="Rishi API")
@@ -33,44 +52,237 @@ app.add_middleware(
 # Add rate limiting
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, rate_limit_handler)
+app.add_exception_handler(UserRateLimitExceeded, user_rate_limit_handler)
 
-@app.post("/api/process_input")
-@limiter.limit("5/minute")
-async def process_input(request: Request, input_text: str):
+# Add admission control
+app.add_exception_handler(OverloadedError, overload_handler)
+
+# Replay responses for retried requests
+app.add_exception_handler(IdempotencyConflictError, idempotency_conflict_handler)
+
+# Background jobs run on their own bounded worker pool
+job_manager = JobManager.from_env()
+job_manager.register("example_generation", generate_examples)
+
+@app.on_event("startup")
+async def warm_guardrails():
+    # Build the rails once up front instead of during the first request
+    if guardrails_service is not None:
+        guardrails_service.warm()
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    await job_manager.stop()
+
+def _scoped_session_id(request: Request, session_id: Optional[str]) -> Optional[str]:
+    """Namespace client session ids by user so one user can never read another's conversation"""
+    if session_id is None:
+        return None
+    return f"{request.state.user.get('user_id')}:{session_id}"
+
+_validation_workflow = None
+
+def _get_validation_workflow():
+    """The validation graph, compiled once on first use"""
+    global _validation_workflow
+    if _validation_workflow is None:
+        _validation_workflow = create_validation_workflow().compile()
+    return _validation_workflow
+
+async def _invoke_validation_workflow(request: Request, input_text: str, session_id: Optional[str] = None) -> dict:
     """
-    Process user input through the validation node
+    Run the validation workflow for one input and build the response payload;
+    the result models are left for the response to serialize
     """
-    # Authenticate user
-    auth_middleware(request)
-    
     try:
         # Create initial state
         initial_state = GraphState(
-            user_input=UserInput(raw_input=input_text),
-            validation_result=ValidationResult(),
+            user_input=UserInput(raw_input=input_text, session_id=_scoped_session_id(request, session_id)),
+            validation_result=None,
             messages=[],
             next_step="",
-            token=request.headers.get("Authorization")
+            token=request.headers.get("Authorization"),
+            user_id=request.state.user.get('user_id'),
+            preferences=None
         )
         
-        # Create and run validation node
-        validation_node = create_validation_workflow()
-        final_state = await validation_node.ainvoke(initial_state)
+        # Run the validation workflow
+        final_state = await _get_validation_workflow().ainvoke(initial_state)
+        preferences = final_state.get('preferences')
         
-        return JSONResponse({
+        return {
             'is_valid': final_state['validation_result'].is_valid,
             'next_step': final_state['next_step'],
             'messages': final_state['messages'],
-            'validation_result': final_state['validation_result'].dict()
-        })
+            'validation_result': final_state['validation_result'],
+            'preferences': preferences
+        }
         
     except Exception as e:
-        logging.error(f"Error processing input: {str(e)}")
+        logging.error("Error processing input: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
         )
 
+# End-to-end budget for one validation; past it the validator answers heuristically (degraded)
+VALIDATION_DEADLINE_SECONDS = float(os.getenv("VALIDATION_DEADLINE_SECONDS", "10"))
+
+@asynccontextmanager
+async def _charged_llm_call(request: Request, input_text: str):
+    """Reserve the call's estimated tokens and an admission slot; settle with the real usage afterwards"""
+    reservation = await token_budget.reserve(request, estimate_tokens(input_text))
+    with track_token_usage() as usage:
+        try:
+            # Shed load before queuing another LLM call
+            async with admission_controller.admit():
+                yield
+        finally:
+            await token_budget.settle(reservation, usage.total_tokens)
+
+async def _run_validation(request: Request, input_text: str, session_id: Optional[str] = None) -> dict:
+    """
+    Run the validation workflow for one input under the user's rate limit,
+    token budget, admission control and deadline
+    """
+    await user_limiter.check(request, "process_input")
+    with request_deadline(VALIDATION_DEADLINE_SECONDS):
+        async with _charged_llm_call(request, input_text):
+            return await _invoke_validation_workflow(request, input_text, session_id)
+
+@app.post("/api/process_input")
+async def process_input(request: Request, input_text: str, session_id: Optional[str] = None):
+    """
+    Process user input through the validation node.
+    Retries carrying the same Idempotency-Key replay the original response
+    without being charged against the user's rate limit again.
+    """
+    # Authenticate user
+    auth_middleware(request)
+    
+    idempotency_key = request.headers.get("Idempotency-Key")
+    if not idempotency_key:
+        return ModelJSONResponse(await _run_validation(request, input_text, session_id))
+
+    async def run_stored():
+        # Stored responses must be plain JSON data
+        return to_jsonable_python(await _run_validation(request, input_text, session_id))
+
+    # Keys are scoped per user so clients cannot collide with each other
+    payload, replayed = await idempotency_store.run(
+        f"{request.state.user.get('user_id')}:{idempotency_key}",
+        IdempotencyStore.fingerprint(input_text, session_id or ""),
+        run_stored
+    )
+    return ModelJSONResponse(payload, headers={"Idempotent-Replayed": "true" if replayed else "false"})
+
+@app.post("/api/validate_batch")
+@limiter.limit("2/minute")
+async def validate_batch_inputs(request: Request, batch: BatchValidationRequest):
+    """
+    Validate many inputs in one call, streaming NDJSON results in completion order.
+    The batch counts once against the user's rate limit; each input that
+    reaches the LLM is charged to the token budget and admission control.
+    """
+    # Authenticate user
+    auth_middleware(request)
+
+    inputs = [
+        user_input.model_copy(update={"session_id": _scoped_session_id(request, user_input.session_id)})
+        for user_input in batch.inputs
+    ]
+
+    await user_limiter.check(request, "validate_batch")
+
+    async def stream_results():
+        # Only inputs that pass the local checks are charged, one LLM call at a time
+        async for item in validate_batch(
+            inputs,
+            max_concurrency=batch.max_concurrency,
+            guard=lambda user_input: _charged_llm_call(request, user_input.raw_input),
+            deadline_seconds=VALIDATION_DEADLINE_SECONDS
+        ):
+            # Echo the session id the client sent, not the scoped one
+            item.session_id = batch.inputs[item.index].session_id
+            yield item.model_dump_json() + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+async def _get_owned_job(request: Request, job_id: str):
+    """Look up a job, hiding jobs that belong to other users"""
+    job = await job_manager.fetch(job_id)
+    if job is None or job.user_id != request.state.user.get("user_id"):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/api/jobs", status_code=202)
+@limiter.limit("10/minute")
+async def submit_job(request: Request, job_request: JobSubmitRequest):
+    """
+    Submit a long-running job (e.g. example generation); returns a job id to poll
+    """
+    # Authenticate user
+    auth_middleware(request)
+
+    await user_limiter.check(request, "jobs")
+    # Jobs call the LLM too: debit an estimate now and settle with the tokens the job used
+    reservation = await token_budget.reserve(request, estimate_tokens(json.dumps(job_request.params)))
+
+    async def settle(tokens: int):
+        await token_budget.settle(reservation, tokens)
+
+    try:
+        job = job_manager.submit(
+            job_request.kind, job_request.params, user_id=request.state.user.get("user_id"), on_finish=settle
+        )
+    except ValueError as e:
+        await settle(0)
+        raise HTTPException(status_code=400, detail=str(e))
+    except OverloadedError:
+        await settle(0)
+        raise
+    return {"job_id": job.job_id, "status": job.status}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(request: Request, job_id: str):
+    """Poll the status, progress and result of a job"""
+    auth_middleware(request)
+    job = await _get_owned_job(request, job_id)
+    return JSONResponse(job.model_dump(mode="json"))
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(request: Request, job_id: str):
+    """Stream job progress as server-sent events until the job finishes"""
+    auth_middleware(request)
+    await _get_owned_job(request, job_id)
+
+    async def events():
+        async for job in job_manager.watch(job_id):
+            if job is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {job.status.value}\ndata: {job.model_dump_json()}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.get("/api/metrics")
+async def metrics(request: Request):
+    """Runtime metrics for load shedding and capacity"""
+    auth_middleware(request)
+    return {
+        "admission": admission_controller.metrics(),
+        "jobs": job_manager.metrics(),
+        "idempotency": idempotency_store.metrics(),
+        "token_budget": token_budget.metrics(),
+        "auth_cache": token_cache.metrics(),
+        "logging": logging_metrics(),
+        "local_classifier": local_classifier.metrics() if local_classifier else None,
+        "session_memory": session_memory_store.metrics(),
+        "preferences": preference_store.metrics(),
+        "validation_cache": validation_result_cache.metrics(),
+        "guardrails": guardrails_service.metrics() if guardrails_service else None
+    }
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from app.utils.exceptions import OverloadedError
+
+class AdmissionController:
+    """
+    Bounded in-flight counter with a bounded wait queue and an adaptive limit.
+
+    The concurrency limit follows AIMD driven by observed latency: while the
+    smoothed latency stays within latency_tolerance of the best latency seen,
+    the limit grows by roughly one per limit's worth of completions; once
+    latency climbs past that (or requests fail) it is cut multiplicatively, at
+    most once per smoothed round trip. Requests that find the queue full, or
+    wait longer than queue_timeout, are shed.
+    """
+    def __init__(
+        self,
+        initial_limit: int = 16,
+        min_limit: int = 1,
+        max_limit: int = 128,
+        max_queue: int = 64,
+        queue_timeout: float = 5.0,
+        latency_tolerance: float = 2.0,
+        backoff: float = 0.9,
+        smoothing: float = 0.2
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.smoothing = smoothing
+
+        self.in_flight = 0
+        self.shed_count = 0
+        self.admitted_count = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._smoothed_latency: Optional[float] = None
+        self._min_latency: Optional[float] = None
+        self._last_decrease = 0.0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Build a controller from ADMISSION_* environment variables"""
+        return cls(
+            initial_limit=int(os.getenv("ADMISSION_INITIAL_LIMIT", "16")),
+            min_limit=int(os.getenv("ADMISSION_MIN_LIMIT", "1")),
+            max_limit=int(os.getenv("ADMISSION_MAX_LIMIT", "128")),
+            max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "64")),
+            queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5.0"))
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def admit(self):
+        """Hold an in-flight slot for the duration of the block, or raise OverloadedError"""
+        await self._acquire()
+        start = time.monotonic()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self._release(time.monotonic() - start, failed)
+
+    async def _acquire(self):
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            self.admitted_count += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self._shed("queue full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self._shed("queue timeout")
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        self.admitted_count += 1
+
+    def _abandon(self, waiter: asyncio.Future):
+        """Drop a waiter that gave up, handing back the slot if one was granted meanwhile"""
+        if waiter.done() and not waiter.cancelled():
+            self.in_flight -= 1
+            self._wake_waiters()
+            return
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _shed(self, reason: str):
+        self.shed_count += 1
+        logging.warning("Shedding request (%s): in_flight=%d limit=%d queue=%d",
+                        reason, self.in_flight, int(self.limit), len(self._waiters))
+        raise OverloadedError("Server is at capacity", retry_after=self.retry_after())
+
+    def _release(self, latency: float, failed: bool):
+        self.in_flight -= 1
+        self._record_sample(latency, failed)
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def _record_sample(self, latency: float, failed: bool):
+        if self._smoothed_latency is None:
+            self._smoothed_latency = latency
+        else:
+            self._smoothed_latency += self.smoothing * (latency - self._smoothed_latency)
+        # Let the baseline drift up slowly so it can relearn after the backend gets slower
+        if self._min_latency is None or latency < self._min_latency:
+            self._min_latency = latency
+        else:
+            self._min_latency *= 1.001
+
+        congested = self._smoothed_latency > self._min_latency * self.latency_tolerance
+        now = time.monotonic()
+        if failed or congested:
+            if now - self._last_decrease >= self._smoothed_latency:
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                self._last_decrease = now
+        elif self.in_flight + 1 >= int(self.limit) // 2:
+            # Only grow when the current limit is actually being used
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def retry_after(self) -> int:
+        """Estimated seconds until a slot frees up, for the Retry-After header"""
+        latency = self._smoothed_latency or 1.0
+        rounds = 1 + len(self._waiters) / max(int(self.limit), 1)
+        return min(60, max(1, math.ceil(latency * rounds)))
+
+    def metrics(self) -> Dict[str, float]:
+        """Current admission state for the metrics endpoint"""
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "shed_count": self.shed_count,
+            "admitted_count": self.admitted_count,
+            "smoothed_latency_seconds": round(self._smoothed_latency or 0.0, 4),
+            "min_latency_seconds": round(self._min_latency or 0.0, 4)
+        }
+
+# Initialize admission controller
+admission_controller = AdmissionController.from_env()
+
+async def overload_handler(request: Request, exc: OverloadedError) -> JSONResponse:
+    """Handler for requests shed by admission control"""
+    return JSONResponse(
+        {
+            "error": "Service overloaded",
+            "detail": f"Server is at capacity. Please try again in {exc.retry_after} seconds."
+        },
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)}
+    )
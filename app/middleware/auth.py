@@ -1,9 +1,105 @@
 import os
 import jwt
+import time
+import hashlib
 import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
 from fastapi import Request, HTTPException
 from starlette.status import HTTP_401_UNAUTHORIZED
 
+load_dotenv()
+
+JWT_ALGORITHMS = ["HS256"]
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified token digests to their decoded payloads.
+    An entry is served until the token's exp (or max_ttl for tokens without
+    one), so a cache hit skips signature verification entirely.
+    """
+    def __init__(self, max_size: int = 10000, max_ttl: float = 3600.0):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        # Keyed by hash so raw bearer tokens are never held in memory longer than the request
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[Dict]:
+        key = self._digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        payload, valid_until = entry
+        if time.time() >= valid_until:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def put(self, token: str, payload: Dict):
+        valid_until = time.time() + self.max_ttl
+        if "exp" in payload:
+            valid_until = min(valid_until, float(payload["exp"]))
+        key = self._digest(token)
+        self._entries[key] = (payload, valid_until)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def metrics(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+token_cache = VerifiedTokenCache(
+    max_size=int(os.getenv("JWT_CACHE_SIZE", "10000")),
+    max_ttl=float(os.getenv("JWT_CACHE_MAX_TTL", "3600"))
+)
+_jwt_secrets: List[str] = []
+
+def reload_jwt_secret():
+    """
+    Load the signing secrets from the environment and drop cached verifications.
+    Call after rotating JWT_SECRET; tokens signed with JWT_SECRET_PREVIOUS keep
+    verifying until that variable is removed and this is called again.
+    """
+    global _jwt_secrets
+    secrets = [os.getenv("JWT_SECRET"), os.getenv("JWT_SECRET_PREVIOUS")]
+    _jwt_secrets = [secret for secret in secrets if secret]
+    token_cache.clear()
+    logging.info("Loaded %d JWT signing secret(s)", len(_jwt_secrets))
+
+# Secrets are loaded once at startup
+reload_jwt_secret()
+
+def verify_token(token: str) -> Dict:
+    """Verify a JWT against the current (then previous) secret, using the verified-token cache"""
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
+    secrets = _jwt_secrets or [None]
+    for i, secret in enumerate(secrets):
+        try:
+            payload = jwt.decode(token, secret, algorithms=JWT_ALGORITHMS)
+            break
+        except jwt.InvalidSignatureError:
+            if i == len(secrets) - 1:
+                raise
+    token_cache.put(token, payload)
+    return payload
+
 def auth_middleware(req: Request):
     """Authentication middleware for validating JWT tokens"""
     auth_header = req.headers.get("Authorization")
@@ -16,13 +112,9 @@ def auth_middleware(req: Request):
 
     token = auth_header.split(" ")[1]
     try:
-        payload = jwt.decode(
-            token, 
-            os.getenv("JWT_SECRET"), 
-            algorithms=["HS256"]
-        )
+        payload = verify_token(token)
         req.state.user = payload
-        logging.info(f"Authenticated user: {payload['user_id']}")
+        logging.debug("Authenticated user: %s", payload['user_id'])
     except jwt.ExpiredSignatureError:
         logging.warning("Token has expired")
         raise HTTPException(
@@ -0,0 +1,204 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from app.utils.exceptions import IdempotencyConflictError, OverloadedError
+from app.utils.shared_state import get_redis_client
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    task: asyncio.Task
+    expires_at: float
+
+class IdempotencyStore:
+    """
+    TTL store of in-progress and completed responses keyed by Idempotency-Key.
+
+    The first request for a key runs the computation in its own task; retries
+    with the same key attach to that task while it runs and get the stored
+    response once it completes. Failed computations are forgotten so the client
+    can retry them. Completed entries are evicted least recently used first
+    past max_entries. Every entry gets the same TTL, so creation order is
+    expiry order: expired entries are purged from the front of that order and
+    request cost does not grow with the number of stored keys.
+
+    With a shared Redis client, retries that land on a different worker see the
+    same state: the first worker claims the key with SET NX, other workers poll
+    until the stored response appears, for up to pending_timeout seconds.
+    """
+    def __init__(
+        self,
+        ttl: float = 86400.0,
+        max_entries: int = 10000,
+        redis=None,
+        pending_timeout: float = 120.0,
+        poll_interval: float = 0.2
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.redis = redis
+        self.pending_timeout = pending_timeout
+        self.poll_interval = poll_interval
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()   # least recently used first
+        self._expiry_order: "OrderedDict[str, None]" = OrderedDict()  # oldest (first to expire) first
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "IdempotencyStore":
+        """Build a store from IDEMPOTENCY_* environment variables"""
+        return cls(
+            ttl=float(os.getenv("IDEMPOTENCY_TTL", "86400")),
+            max_entries=int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000")),
+            redis=get_redis_client()
+        )
+
+    @staticmethod
+    def fingerprint(*parts: str) -> str:
+        """Hash of the request payload, used to detect a key reused for a different request"""
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    async def run(self, key: str, fingerprint: str, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Return (result, replayed): the stored or in-progress result for key if
+        there is one, otherwise the result of running compute.
+        """
+        self._purge_expired()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyConflictError("Idempotency-Key was already used with a different request", key)
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return await asyncio.shield(entry.task), True
+
+        computation = None
+        if self.redis is not None:
+            try:
+                stored = await self._claim_shared(key, fingerprint)
+            except (IdempotencyConflictError, OverloadedError):
+                raise
+            except Exception as e:
+                # A store outage degrades to per-worker replay
+                logging.error("Idempotency store unavailable, using local replay: %s", e)
+            else:
+                if stored is not None:
+                    self.hits += 1
+                    return stored["response"], True
+                computation = self._publish_shared(key, fingerprint, compute())
+
+        self.misses += 1
+        task = asyncio.ensure_future(computation or compute())
+        self._entries[key] = _Entry(fingerprint, task, time.monotonic() + self.ttl)
+        self._expiry_order[key] = None
+        self._expiry_order.move_to_end(key)
+        task.add_done_callback(lambda done: self._on_done(key, done))
+        self._evict_overflow()
+        return await asyncio.shield(task), False
+
+    async def _claim_shared(self, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Claim key in the shared store, or wait for the worker that holds it.
+        Returns None once claimed, or the stored entry if another worker finished.
+        """
+        redis_key = f"idempotency:{key}"
+        claim = json.dumps({"state": "pending", "fingerprint": fingerprint})
+        deadline = time.monotonic() + self.pending_timeout
+        while True:
+            if await self.redis.set(redis_key, claim, nx=True, px=int(self.pending_timeout * 1000)):
+                return None
+
+            stored = await self.redis.get(redis_key)
+            if stored is not None:
+                entry = json.loads(stored)
+                if entry["fingerprint"] != fingerprint:
+                    raise IdempotencyConflictError("Idempotency-Key was already used with a different request", key)
+                if entry["state"] == "done":
+                    return entry
+
+            # Still running on another worker; if it failed the key is gone and the next SET NX wins
+            if time.monotonic() >= deadline:
+                raise OverloadedError("Original request is still in progress", retry_after=1)
+            await asyncio.sleep(self.poll_interval)
+
+    async def _publish_shared(self, key: str, fingerprint: str, computation: Awaitable[Any]) -> Any:
+        redis_key = f"idempotency:{key}"
+        try:
+            result = await computation
+        except BaseException:
+            await self._shared_call(self.redis.delete(redis_key))
+            raise
+        stored = json.dumps({"state": "done", "fingerprint": fingerprint, "response": result})
+        await self._shared_call(self.redis.set(redis_key, stored, px=int(self.ttl * 1000)))
+        return result
+
+    @staticmethod
+    async def _shared_call(call: Awaitable[Any]):
+        # The response is already computed; a store error must not turn it into a failure
+        try:
+            await call
+        except Exception as e:
+            logging.error("Failed to update idempotency store: %s", e)
+
+    def _on_done(self, key: str, task: asyncio.Task):
+        # Only successful responses are replayed; errors should be retried for real
+        entry = self._entries.get(key)
+        if entry is not None and entry.task is task and (task.cancelled() or task.exception() is not None):
+            self._remove(key)
+
+    def _remove(self, key: str):
+        del self._entries[key]
+        del self._expiry_order[key]
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        while self._expiry_order:
+            key = next(iter(self._expiry_order))
+            entry = self._entries[key]
+            # Stops at the first live entry; one still running past its TTL holds the rest until it finishes
+            if entry.expires_at >= now or not entry.task.done():
+                break
+            self._remove(key)
+
+    def _evict_overflow(self):
+        excess = len(self._entries) - self.max_entries
+        if excess <= 0:
+            return
+        evictable = []
+        for key, entry in self._entries.items():
+            if entry.task.done():
+                evictable.append(key)
+                if len(evictable) == excess:
+                    break
+        for key in evictable:
+            self._remove(key)
+
+    def metrics(self) -> Dict[str, int]:
+        """Current replay cache state for the metrics endpoint"""
+        return {
+            "entries": len(self._entries),
+            "in_progress": sum(1 for entry in self._entries.values() if not entry.task.done()),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+# Initialize idempotency store
+idempotency_store = IdempotencyStore.from_env()
+
+async def idempotency_conflict_handler(request: Request, exc: IdempotencyConflictError) -> JSONResponse:
+    """Handler for idempotency keys reused with a different payload"""
+    return JSONResponse(
+        {
+            "error": "Idempotency key conflict",
+            "detail": exc.message
+        },
+        status_code=422
+    )
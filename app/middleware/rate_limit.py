@@ -1,18 +1,194 @@
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from fastapi import Request
 from fastapi.responses import JSONResponse
+from app.utils.exceptions import UserRateLimitExceeded
+from app.utils.shared_state import REDIS_URL, get_redis_client
 
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
+# Initialize rate limiter (shared across workers when REDIS_URL is set)
+limiter = Limiter(key_func=get_remote_address, storage_uri=REDIS_URL or "memory://")
 
 async def rate_limit_handler(request: Request, exc: RateLimitExceeded) -> JSONResponse:
     """Handler for rate limit exceeded exceptions"""
     return JSONResponse(
         {
             "error": "Rate limit exceeded",
-            "detail": f"Too many requests. Please try again in {exc.retry_after} seconds."
+            "detail": f"Too many requests: {exc.detail}. Please try again later."
         },
         status_code=429
     )
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+@dataclass(frozen=True)
+class RateLimit:
+    """A rate such as 5/minute, with an optional burst allowance"""
+    rate: int
+    period: float
+    burst: int
+
+    @classmethod
+    def parse(cls, spec: str) -> "RateLimit":
+        """Parse '5/minute' or '60/hour;burst=10'"""
+        limit, _, options = spec.partition(";")
+        count, _, period = limit.strip().partition("/")
+        burst = int(count)
+        if options.strip().startswith("burst="):
+            burst = int(options.strip()[len("burst="):])
+        return cls(rate=int(count), period=PERIODS[period.strip().rstrip("s")], burst=burst)
+
+    @property
+    def emission_interval(self) -> float:
+        return self.period / self.rate
+
+    def __str__(self) -> str:
+        return f"{self.rate}/{int(self.period)}s"
+
+@dataclass
+class RateLimitDecision:
+    """Outcome of a GCRA check"""
+    allowed: bool
+    remaining: int
+    retry_after: float
+    reset_after: float
+
+# Per-tier limits, selected by the 'tier' claim of the JWT
+TIER_LIMITS: Dict[str, RateLimit] = {
+    "free": RateLimit.parse(os.getenv("RATE_LIMIT_FREE", "30/minute;burst=10")),
+    "pro": RateLimit.parse(os.getenv("RATE_LIMIT_PRO", "60/minute;burst=10")),
+    "internal": RateLimit.parse(os.getenv("RATE_LIMIT_INTERNAL", "600/minute;burst=50"))
+}
+DEFAULT_TIER = "free"
+
+def _gcra(tat: Optional[float], now: float, limit: RateLimit, cost: int):
+    """
+    Generic cell rate algorithm: returns (decision, new_tat).
+    new_tat is None when the request is rejected and the stored TAT must not change.
+    """
+    emission = limit.emission_interval
+    tolerance = emission * limit.burst
+    new_tat = max(tat or now, now) + emission * cost
+    allow_at = new_tat - tolerance
+    if now < allow_at:
+        return RateLimitDecision(False, 0, allow_at - now, (tat or now) - now), None
+    remaining = int((now - allow_at) / emission)
+    return RateLimitDecision(True, remaining, 0.0, new_tat - now), new_tat
+
+class InMemoryRateLimitBackend:
+    """Process-local GCRA backend for single-worker deployments and tests"""
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._tats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, limit: RateLimit, cost: int = 1) -> RateLimitDecision:
+        with self._lock:
+            now = time.time()
+            if len(self._tats) > self.max_keys:
+                # A TAT in the past carries no state, same as a missing key
+                self._tats = {k: tat for k, tat in self._tats.items() if tat > now}
+            decision, new_tat = _gcra(self._tats.get(key), now, limit, cost)
+            if new_tat is not None:
+                self._tats[key] = new_tat
+            return decision
+
+# Runs atomically inside Redis; uses the server clock so all app nodes agree on "now"
+GCRA_SCRIPT = """
+local emission = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+local new_tat = tat + emission * cost
+local allow_at = new_tat - tolerance
+if now < allow_at then
+    return {0, 0, tostring(allow_at - now), tostring(tat - now)}
+end
+local ttl_ms = math.ceil((new_tat - now) * 1000)
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', ttl_ms)
+return {1, math.floor((now - allow_at) / emission), '0', tostring(new_tat - now)}
+"""
+
+class RedisRateLimitBackend:
+    """GCRA backend in a shared Redis-protocol store, so limits hold across workers and nodes"""
+    def __init__(self, client, prefix: str = "ratelimit"):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(GCRA_SCRIPT)
+
+    async def hit(self, key: str, limit: RateLimit, cost: int = 1) -> RateLimitDecision:
+        emission = limit.emission_interval
+        allowed, remaining, retry_after, reset_after = await self._script(
+            keys=[f"{self.prefix}:{key}"],
+            args=[emission, emission * limit.burst, cost]
+        )
+        return RateLimitDecision(bool(allowed), int(remaining), float(retry_after), float(reset_after))
+
+class UserRateLimiter:
+    """
+    Token-bucket (GCRA) limiter keyed by the authenticated user's id, with the
+    limit chosen by the 'tier' claim. Must run after auth_middleware.
+    """
+    def __init__(self, backend, tiers: Dict[str, RateLimit] = None, default_tier: str = DEFAULT_TIER):
+        self.backend = backend
+        self.tiers = tiers or TIER_LIMITS
+        self.default_tier = default_tier
+        self._fallback = InMemoryRateLimitBackend()
+
+    @classmethod
+    def from_env(cls) -> "UserRateLimiter":
+        client = get_redis_client()
+        if client is not None:
+            return cls(RedisRateLimitBackend(client))
+        return cls(InMemoryRateLimitBackend())
+
+    def limit_for(self, user: Dict) -> RateLimit:
+        return self.tiers.get(user.get("tier"), self.tiers[self.default_tier])
+
+    async def check(self, request: Request, scope: str, cost: int = 1) -> RateLimitDecision:
+        """Debit the request's user for scope, raising UserRateLimitExceeded when over the limit"""
+        user = getattr(request.state, "user", None) or {}
+        user_key = user.get("user_id") or get_remote_address(request)
+        limit = self.limit_for(user)
+        key = f"{scope}:{user_key}"
+        try:
+            decision = await self.backend.hit(key, limit, cost)
+        except Exception as e:
+            # A store outage degrades to per-process limits rather than failing every request
+            logging.error("Rate limit store unavailable, using local limits: %s", e)
+            decision = await self._fallback.hit(key, limit, cost)
+
+        request.state.rate_limit = decision
+        if not decision.allowed:
+            raise UserRateLimitExceeded(
+                f"Rate limit of {limit} exceeded",
+                retry_after=max(1, math.ceil(decision.retry_after)),
+                limit=str(limit)
+            )
+        return decision
+
+# Initialize per-user limiter
+user_limiter = UserRateLimiter.from_env()
+
+async def user_rate_limit_handler(request: Request, exc: UserRateLimitExceeded) -> JSONResponse:
+    """Handler for per-user rate limit exceeded exceptions"""
+    return JSONResponse(
+        {
+            "error": "Rate limit exceeded",
+            "detail": f"Too many requests. Please try again in {exc.retry_after} seconds."
+        },
+        status_code=429,
+        headers={"Retry-After": str(exc.retry_after), "X-RateLimit-Limit": exc.limit}
+    )
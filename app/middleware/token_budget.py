@@ -0,0 +1,266 @@
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from fastapi import Request
+from slowapi.util import get_remote_address
+from app.utils.exceptions import UserRateLimitExceeded
+from app.utils.shared_state import get_redis_client
+
+# Rough cost of one validation call beyond the user's text: prompt template,
+# format instructions and the structured response
+PROMPT_OVERHEAD_TOKENS = int(os.getenv("TOKEN_BUDGET_PROMPT_OVERHEAD", "900"))
+EXPECTED_OUTPUT_TOKENS = int(os.getenv("TOKEN_BUDGET_EXPECTED_OUTPUT", "400"))
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the LLM tokens a validation of text will consume"""
+    return PROMPT_OVERHEAD_TOKENS + math.ceil(len(text) / CHARS_PER_TOKEN) + EXPECTED_OUTPUT_TOKENS
+
+@dataclass
+class TokenReservation:
+    """Tokens debited up front for one request, settled once actual usage is known"""
+    user_key: str
+    bucket: int
+    tokens: int
+
+class _Window:
+    """Sliding window of per-bucket token counts"""
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+
+    def used(self, current: int, num_buckets: int) -> int:
+        oldest = current - num_buckets + 1
+        self.buckets = {b: tokens for b, tokens in self.buckets.items() if b >= oldest}
+        return sum(self.buckets.values())
+
+    def first_bucket(self) -> Optional[int]:
+        return min((b for b, tokens in self.buckets.items() if tokens > 0), default=None)
+
+    def add(self, bucket: int, tokens: int):
+        self.buckets[bucket] = max(0, self.buckets.get(bucket, 0) + tokens)
+
+class InMemoryTokenBudgetBackend:
+    """Process-local token windows for single-worker deployments and tests"""
+    def __init__(self):
+        self._users: Dict[str, _Window] = {}
+        self._global = _Window()
+        self._last_seen: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    async def reserve(self, user_key: str, tokens: int, budget: "TokenBudget"):
+        """
+        Returns (bucket, retry_after, tokens debited); retry_after is 0 when
+        the (capped) tokens were debited
+        """
+        with self._lock:
+            now = time.time()
+            current = int(now // budget.bucket_seconds)
+            # Users last seen before the window have no usage left in it: drop their windows too
+            idle = [u for u, seen in self._last_seen.items() if seen <= now - budget.window_seconds]
+            for u in idle:
+                del self._last_seen[u]
+                self._users.pop(u, None)
+            active_users = len(self._last_seen.keys() | {user_key})
+            tokens = budget.capped(tokens, active_users)
+
+            user_window = self._users.get(user_key) or _Window()
+            user_used = user_window.used(current, budget.num_buckets)
+            global_used = self._global.used(current, budget.num_buckets)
+
+            blocking = budget.blocking_window(tokens, user_used, global_used, active_users)
+            if blocking is not None:
+                window = user_window if blocking == "user" else self._global
+                return current, budget.retry_after(window.first_bucket(), now), tokens
+
+            user_window.add(current, tokens)
+            self._users[user_key] = user_window
+            self._global.add(current, tokens)
+            self._last_seen[user_key] = now
+            return current, 0.0, tokens
+
+    async def adjust(self, user_key: str, bucket: int, delta: int, budget: "TokenBudget"):
+        with self._lock:
+            # A pruned user's reservation has already slid out of the window
+            if user_key in self._users:
+                self._users[user_key].add(bucket, delta)
+            self._global.add(bucket, delta)
+
+    def usage(self, budget: "TokenBudget") -> int:
+        with self._lock:
+            return self._global.used(int(time.time() // budget.bucket_seconds), budget.num_buckets)
+
+# Atomic check-and-debit over per-bucket hashes; mirrors TokenBudget.blocking_window
+RESERVE_SCRIPT = """
+local tokens = tonumber(ARGV[1])
+local bucket_seconds = tonumber(ARGV[2])
+local num_buckets = tonumber(ARGV[3])
+local global_limit = tonumber(ARGV[4])
+local user_max = tonumber(ARGV[5])
+local min_share = tonumber(ARGV[6])
+local user_key = ARGV[7]
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local current = math.floor(now / bucket_seconds)
+local window = bucket_seconds * num_buckets
+
+local function used(key)
+    local total, first = 0, nil
+    for b = current - num_buckets + 1, current do
+        local v = tonumber(redis.call('HGET', key, tostring(b)) or '0')
+        if v > 0 then
+            total = total + v
+            if not first then first = b end
+        end
+    end
+    return total, first
+end
+
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now - window)
+local active = redis.call('ZCARD', KEYS[3])
+if not redis.call('ZSCORE', KEYS[3], user_key) then active = active + 1 end
+
+local user_used, user_first = used(KEYS[1])
+local global_used, global_first = used(KEYS[2])
+local share = math.min(user_max, math.max(min_share, math.floor(global_limit / active)))
+tokens = math.min(tokens, share, global_limit)
+
+local first = nil
+if global_used + tokens > global_limit then
+    first = global_first
+elseif user_used + tokens > share then
+    first = user_first
+end
+if first then
+    return {current, tostring((first + num_buckets) * bucket_seconds - now), tokens}
+end
+
+redis.call('HINCRBY', KEYS[1], tostring(current), tokens)
+redis.call('HINCRBY', KEYS[2], tostring(current), tokens)
+redis.call('EXPIRE', KEYS[1], math.ceil(window) + bucket_seconds)
+redis.call('EXPIRE', KEYS[2], math.ceil(window) + bucket_seconds)
+redis.call('ZADD', KEYS[3], now, user_key)
+return {current, '0', tokens}
+"""
+
+class RedisTokenBudgetBackend:
+    """Token windows in a shared Redis-protocol store, so the provider budget is shared across workers"""
+    def __init__(self, client, prefix: str = "tokenbudget"):
+        self.client = client
+        self.prefix = prefix
+        self._reserve = client.register_script(RESERVE_SCRIPT)
+
+    async def reserve(self, user_key: str, tokens: int, budget: "TokenBudget"):
+        bucket, retry_after, debited = await self._reserve(
+            keys=[f"{self.prefix}:user:{user_key}", f"{self.prefix}:global", f"{self.prefix}:active"],
+            args=[tokens, budget.bucket_seconds, budget.num_buckets, budget.global_limit,
+                  budget.user_max, budget.min_share, user_key]
+        )
+        return int(bucket), float(retry_after), int(debited)
+
+    async def adjust(self, user_key: str, bucket: int, delta: int, budget: "TokenBudget"):
+        pipe = self.client.pipeline()
+        pipe.hincrby(f"{self.prefix}:user:{user_key}", str(bucket), delta)
+        pipe.hincrby(f"{self.prefix}:global", str(bucket), delta)
+        await pipe.execute()
+
+class TokenBudget:
+    """
+    Cost-weighted limiter over the LLM provider's tokens-per-minute budget.
+
+    Each request reserves its estimated token cost up front and is settled
+    with the tokens actually consumed, so requests that never reach the LLM
+    cost nothing. Usage is tracked per user and globally over a sliding
+    window split into buckets. A user may use at most an equal share of the
+    global budget among users active in the window (never less than
+    min_share, never more than user_max). A single reservation debits at most
+    that share up front, so one large input can still run in an empty window
+    without locking everyone else out; its real cost is applied on settle.
+    """
+    def __init__(
+        self,
+        backend,
+        global_limit: int = 60000,
+        user_max: int = 20000,
+        min_share: int = 4000,
+        window_seconds: int = 60,
+        bucket_seconds: int = 5
+    ):
+        self.backend = backend
+        self.global_limit = global_limit
+        self.user_max = user_max
+        self.min_share = min_share
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = window_seconds // bucket_seconds
+        self.throttled_count = 0
+
+    @classmethod
+    def from_env(cls) -> "TokenBudget":
+        """Build a budget from TOKEN_BUDGET_* environment variables"""
+        client = get_redis_client()
+        backend = RedisTokenBudgetBackend(client) if client is not None else InMemoryTokenBudgetBackend()
+        return cls(
+            backend,
+            global_limit=int(os.getenv("TOKEN_BUDGET_TPM", "60000")),
+            user_max=int(os.getenv("TOKEN_BUDGET_USER_MAX", "20000")),
+            min_share=int(os.getenv("TOKEN_BUDGET_MIN_SHARE", "4000"))
+        )
+
+    def user_share(self, active_users: int) -> int:
+        return min(self.user_max, max(self.min_share, self.global_limit // max(active_users, 1)))
+
+    def capped(self, tokens: int, active_users: int) -> int:
+        """The part of an estimate one reservation may debit up front"""
+        return min(tokens, self.user_share(active_users), self.global_limit)
+
+    def blocking_window(self, tokens: int, user_used: int, global_used: int, active_users: int) -> Optional[str]:
+        """Which window ('global' or 'user') would be exceeded by debiting tokens, if any"""
+        if global_used + tokens > self.global_limit:
+            return "global"
+        if user_used + tokens > self.user_share(active_users):
+            return "user"
+        return None
+
+    def retry_after(self, first_bucket: Optional[int], now: float) -> float:
+        """Seconds until the oldest bucket holding usage slides out of the window"""
+        if first_bucket is None:
+            return float(self.bucket_seconds)
+        return (first_bucket + self.num_buckets) * self.bucket_seconds - now
+
+    async def reserve(self, request: Request, estimated_tokens: int) -> TokenReservation:
+        """Debit the estimated cost for the request's user, raising UserRateLimitExceeded when over budget"""
+        user = getattr(request.state, "user", None) or {}
+        user_key = user.get("user_id") or get_remote_address(request)
+        bucket, retry_after, tokens = await self.backend.reserve(user_key, estimated_tokens, self)
+        if retry_after > 0:
+            self.throttled_count += 1
+            raise UserRateLimitExceeded(
+                "LLM token budget exceeded",
+                retry_after=max(1, math.ceil(retry_after)),
+                limit=f"{self.global_limit} tokens/{self.window_seconds}s"
+            )
+        return TokenReservation(user_key=user_key, bucket=bucket, tokens=tokens)
+
+    async def settle(self, reservation: TokenReservation, actual_tokens: int):
+        """Replace the estimate with the tokens actually consumed"""
+        delta = actual_tokens - reservation.tokens
+        if delta == 0:
+            return
+        try:
+            await self.backend.adjust(reservation.user_key, reservation.bucket, delta, self)
+        except Exception as e:
+            logging.error("Failed to settle token reservation: %s", e)
+
+    def metrics(self) -> Dict[str, int]:
+        """Current budget state for the metrics endpoint"""
+        metrics = {"global_limit": self.global_limit, "throttled_count": self.throttled_count}
+        if isinstance(self.backend, InMemoryTokenBudgetBackend):
+            metrics["tokens_used_in_window"] = self.backend.usage(self)
+        return metrics
+
+# Initialize token budget
+token_budget = TokenBudget.from_env()
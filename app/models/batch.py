@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from .user_input import UserInput
+from .validation_result import ValidationResult
+
+MAX_BATCH_SIZE = 5000
+
+class BatchValidationRequest(BaseModel):
+    """Request body for validating many stored inputs in one call"""
+    inputs: List[UserInput] = Field(min_length=1, max_length=MAX_BATCH_SIZE, description="Inputs to validate")
+    max_concurrency: Optional[int] = Field(default=None, ge=1, le=64, description="Maximum concurrent LLM calls")
+
+class BatchItemResult(BaseModel):
+    """Validation result for a single item of a batch"""
+    index: int = Field(description="Position of the input in the submitted batch")
+    session_id: Optional[str] = Field(default=None, description="Session the input belongs to")
+    prechecked: bool = Field(description="Whether the result came from local checks without an LLM call")
+    validation_result: ValidationResult
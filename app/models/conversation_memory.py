@@ -1,6 +1,9 @@
-from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Deque, List, Dict, Iterable, Optional
+from collections import deque
 from datetime import datetime
+from itertools import islice
+from .validation_result import ValidationResult
 
 class ConversationTurn(BaseModel):
     """Represents a single turn in the conversation"""
@@ -12,38 +15,97 @@ class ConversationTurn(BaseModel):
     goals: List[str] = Field(default_factory=list)
     context_score: float = 0.0
 
+class _LatestValues:
+    """Merged view of the dicts in a window of turns, the newest value winning per key"""
+    def __init__(self):
+        self.merged: Dict[str, str] = {}
+        self._history: Dict[str, Deque[str]] = {}
+
+    def add(self, values: Dict[str, str]):
+        for key, value in values.items():
+            self._history.setdefault(key, deque()).append(value)
+            self.merged[key] = value
+
+    def evict(self, values: Dict[str, str]):
+        # The evicted turn is the oldest, so its value is the oldest one kept for each key
+        for key in values:
+            history = self._history[key]
+            history.popleft()
+            if not history:
+                del self._history[key]
+                del self.merged[key]
+
+class ConversationAggregates:
+    """Preferences, background and goals of the remembered turns, kept up to date per turn"""
+    def __init__(self):
+        self.preferences = _LatestValues()
+        self.background = _LatestValues()
+        self.goal_counts: Dict[str, int] = {}
+
+    def add(self, turn: ConversationTurn):
+        self.preferences.add(turn.preferences)
+        self.background.add(turn.background_info)
+        for goal in set(turn.goals):
+            self.goal_counts[goal] = self.goal_counts.get(goal, 0) + 1
+
+    def evict(self, turn: ConversationTurn):
+        self.preferences.evict(turn.preferences)
+        self.background.evict(turn.background_info)
+        for goal in set(turn.goals):
+            self.goal_counts[goal] -= 1
+            if not self.goal_counts[goal]:
+                del self.goal_counts[goal]
+
 class ConversationMemory(BaseModel):
     """Stores and manages conversation history"""
-    turns: List[ConversationTurn] = Field(default_factory=list)
-    max_turns: int = 10  # Maximum number of turns to remember
-    
-    def add_turn(self, turn: ConversationTurn):
-        """Add a new conversation turn, maintaining max_turns limit"""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    turns: Deque[ConversationTurn] = Field(default_factory=deque)
+    max_turns: int = 200  # Maximum number of turns to remember
+    last_validation_result: Optional[ValidationResult] = None
+    # Derived from turns and rebuilt on load, so never serialized. A plain field
+    # rather than a private attribute because those are much slower to access.
+    aggregates: ConversationAggregates = Field(default_factory=ConversationAggregates, exclude=True, repr=False)
+
+    def model_post_init(self, __context) -> None:
+        turns: Iterable[ConversationTurn] = self.turns
+        self.turns = deque(maxlen=self.max_turns)
+        self.aggregates = ConversationAggregates()
+        for turn in turns:
+            self._append(turn)
+
+    def add_turn(self, turn: ConversationTurn, validation_result: Optional[ValidationResult] = None):
+        """Add a new conversation turn, evicting the oldest past max_turns"""
+        self._append(turn)
+        if validation_result is not None:
+            self.last_validation_result = validation_result
+
+    def _append(self, turn: ConversationTurn):
+        if not self.turns.maxlen:
+            return
+        if len(self.turns) == self.turns.maxlen:
+            self.aggregates.evict(self.turns[0])
         self.turns.append(turn)
-        if len(self.turns) > self.max_turns:
-            self.turns.pop(0)  # Remove oldest turn
-    
+        self.aggregates.add(turn)
+
+    def get_last_validation_result(self) -> Optional[ValidationResult]:
+        """Get the validation result of the most recent turn, if recorded"""
+        return self.last_validation_result
+
     def get_recent_context(self, num_turns: int = 3) -> List[ConversationTurn]:
         """Get the most recent conversation turns"""
-        return self.turns[-num_turns:] if self.turns else []
-    
+        recent = list(islice(reversed(self.turns), num_turns))
+        recent.reverse()
+        return recent
+
     def get_all_preferences(self) -> Dict[str, str]:
         """Aggregate all preferences from conversation history"""
-        preferences = {}
-        for turn in self.turns:
-            preferences.update(turn.preferences)
-        return preferences
-    
+        return dict(self.aggregates.preferences.merged)
+
     def get_background_info(self) -> Dict[str, str]:
         """Aggregate background information from conversation history"""
-        background = {}
-        for turn in self.turns:
-            background.update(turn.background_info)
-        return background
-    
+        return dict(self.aggregates.background.merged)
+
     def get_goals(self) -> List[str]:
         """Get all unique goals from conversation history"""
-        goals = set()
-        for turn in self.turns:
-            goals.update(turn.goals)
-        return list(goals)
+        return list(self.aggregates.goal_counts)
@@ -1,11 +1,14 @@
 from typing import TypedDict, List, Dict, Optional
 from .user_input import UserInput
 from .validation_result import ValidationResult
+from .preference import PreferenceChange
 
 class GraphState(TypedDict):
     """Type definition for graph state"""
     user_input: UserInput
-    validation_result: ValidationResult
+    validation_result: Optional[ValidationResult]
     messages: List[Dict]
     next_step: str
     token: Optional[str]
+    user_id: Optional[str]
+    preferences: Optional[PreferenceChange]
@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+from datetime import datetime
+from enum import Enum
+
+class JobStatus(str, Enum):
+    """Lifecycle states of a background job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class JobSubmitRequest(BaseModel):
+    """Request body for submitting a background job"""
+    kind: str = Field(description="Registered job kind, e.g. 'example_generation'")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Parameters passed to the job handler")
+
+class Job(BaseModel):
+    """State of a background job, as returned by the poll and SSE endpoints"""
+    job_id: str
+    kind: str
+    status: JobStatus = JobStatus.QUEUED
+    progress: float = Field(default=0.0, description="Completion estimate (0-1)")
+    message: Optional[str] = Field(default=None, description="Human readable progress message")
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    user_id: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, Field, validator
 from typing import List, Optional, Dict, Union
+from datetime import datetime
 from enum import Enum
 
 class PreferenceCategory(str, Enum):
@@ -48,3 +49,18 @@ class PreferenceAnalysisResult(BaseModel):
     confidence_score: float
     needs_clarification: bool
     clarification_questions: List[str] = []
+
+class UserPreferences(BaseModel):
+    """A user's stored preferences, indexed by category"""
+    user_id: str
+    version: int = 0
+    categories: Dict[PreferenceCategory, List[PreferenceValue]] = Field(default_factory=dict)
+    category_versions: Dict[PreferenceCategory, int] = Field(default_factory=dict)
+    updated_at: Optional[datetime] = None
+
+class PreferenceChange(BaseModel):
+    """Outcome of applying a PreferenceUpdate"""
+    operation: PreferenceOperation
+    changed: bool
+    version: int
+    preferences: Dict[PreferenceCategory, List[PreferenceValue]] = Field(default_factory=dict)
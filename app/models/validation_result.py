@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from enum import Enum
+from .preference import PreferenceUpdate
 
 class InputType(str, Enum):
     """Extended enumeration of input types including preferences"""
@@ -33,3 +34,24 @@ class ValidationResult(BaseModel):
     goals: List[str] = Field(default_factory=list, description="Extracted goals")
     validation_details: Dict[str, Any] = Field(default_factory=dict, description="Additional validation details")
     guardrails_result: Dict = Field(default_factory=dict, description="Results from content safety checks")
+    preference_updates: Optional[PreferenceUpdate] = Field(default=None, description="Preference operation to apply to the user's stored preferences")
+    degraded: bool = Field(default=False, description="Whether this is a heuristic answer given because the LLM could not respond in time")
+
+class ResultTemplate:
+    """
+    A ValidationResult the service builds from constant data, validated once.
+
+    The template itself is never handed out: new() returns a shallow
+    model_copy with fresh list and dict fields, so results can be changed
+    without touching the template. Updates are trusted, not validated.
+    """
+    def __init__(self, **values: Any):
+        self._result = ValidationResult(**values)
+        self._containers = tuple(name for name, value in self._result if isinstance(value, (list, dict)))
+
+    def new(self, **update: Any) -> ValidationResult:
+        """A new result from the template, with update applied"""
+        for name in self._containers:
+            if name not in update:
+                update[name] = getattr(self._result, name).copy()
+        return self._result.model_copy(update=update)
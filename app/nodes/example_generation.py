@@ -0,0 +1,142 @@
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin, urlparse
+import asyncio
+import ipaddress
+import json
+import logging
+import socket
+import requests
+from langchain.schema import HumanMessage, SystemMessage
+from app.utils.llm_client import get_llm_client, record_token_usage
+from app.utils.exceptions import LLMError
+from app.utils.job_manager import ProgressCallback
+from app.utils.json_repair import parse_json_object
+
+EXAMPLE_GENERATION_PROMPT = """
+You are Rishi's Example Generation Node. Your role is to provide specific, actionable examples
+within a selected subcategory.
+
+Category: {category}
+Subcategory: {subcategory}
+User Context: {user_context}
+
+Create {count} examples that:
+- Are specific and actionable
+- Match the user's level
+- Provide clear value
+- Include practical steps
+
+Respond with JSON only, in this format:
+{{
+  "examples": [
+    {{"title": "", "focus": "", "compatibility_reason": "", "url": ""}}
+  ],
+  "recommended_starting_point": "",
+  "progression_path": ""
+}}
+"""
+
+MAX_VERIFY_CONCURRENCY = 5
+MAX_REDIRECTS = 5
+
+def _parse_examples(response_text: str) -> Dict[str, Any]:
+    """Parse the example generation response, keeping the complete examples of a truncated one"""
+    data, _ = parse_json_object(response_text)
+    data.setdefault("examples", [])
+    return data
+
+def _unsafe_url_reason(url: str) -> Optional[str]:
+    """
+    Why the server must not fetch url, or None if it is a http(s) link whose
+    host resolves only to public addresses. Links come from the LLM, prompted
+    with user-supplied parameters, so internal and metadata hosts are refused.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        return "Only http and https links are checked"
+    try:
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        addresses = socket.getaddrinfo(parsed.hostname, port, proto=socket.IPPROTO_TCP)
+    except (OSError, UnicodeError, ValueError) as e:
+        return f"Cannot resolve host: {e}"
+    for *_, sockaddr in addresses:
+        address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        address = getattr(address, "ipv4_mapped", None) or address
+        if not address.is_global or address.is_multicast:
+            return "Link points to a non-public address"
+    return None
+
+def _check_url(url: str) -> Dict[str, Any]:
+    """Check that a resource link is reachable, vetting every redirect hop before following it"""
+    try:
+        for _ in range(MAX_REDIRECTS + 1):
+            reason = _unsafe_url_reason(url)
+            if reason is not None:
+                return {"status": "unverified", "error": reason}
+            response = requests.head(url, allow_redirects=False, timeout=10)
+            if response.status_code == 405:
+                response = requests.get(url, allow_redirects=False, stream=True, timeout=10)
+                response.close()
+            if not response.is_redirect:
+                return {"status": "verified" if response.status_code < 400 else "unverified",
+                        "http_status": response.status_code}
+            url = urljoin(url, response.headers["location"])
+        return {"status": "unverified", "error": "Too many redirects"}
+    except requests.RequestException as e:
+        return {"status": "unverified", "error": str(e)}
+
+async def verify_examples(examples: List[Dict[str, Any]], report: Optional[ProgressCallback] = None) -> List[Dict[str, Any]]:
+    """Attach a verification status to each example by checking its resource link"""
+    semaphore = asyncio.Semaphore(MAX_VERIFY_CONCURRENCY)
+    checked = 0
+
+    async def verify(example: Dict[str, Any]):
+        nonlocal checked
+        url = example.get("url")
+        if not url:
+            example["verification"] = {"status": "unverified", "error": "No resource link"}
+        else:
+            async with semaphore:
+                example["verification"] = await asyncio.to_thread(_check_url, url)
+        checked += 1
+        if report:
+            report(0.5 + 0.5 * checked / len(examples), f"Verified {checked}/{len(examples)} examples")
+
+    await asyncio.gather(*(verify(example) for example in examples))
+    return examples
+
+async def generate_examples(params: Dict[str, Any], report: ProgressCallback) -> Dict[str, Any]:
+    """
+    Job handler for the Example Provision node: generate examples for a
+    subcategory and, if params["verify"] is set, check their resource links
+    """
+    subcategory = params.get("subcategory")
+    if not subcategory:
+        raise ValueError("'subcategory' is required")
+
+    report(0.1, "Generating examples")
+    prompt = EXAMPLE_GENERATION_PROMPT.format(
+        category=params.get("category", ""),
+        subcategory=subcategory,
+        user_context=json.dumps(params.get("user_context", {})),
+        count=int(params.get("count", 10))
+    )
+    try:
+        llm = get_llm_client()
+        response = await llm.ainvoke([
+            SystemMessage(content="You are a helpful recommendation assistant."),
+            HumanMessage(content=prompt)
+        ])
+        record_token_usage(response)
+    except Exception as e:
+        logging.error("Example generation failed: %s", e)
+        raise LLMError("Example generation failed", {"error": str(e)})
+
+    result = _parse_examples(response.content)
+    report(0.5, f"Generated {len(result['examples'])} examples")
+
+    if params.get("verify") and result["examples"]:
+        report(0.5, "Verifying examples")
+        result["examples"] = await verify_examples(result["examples"], report)
+
+    return result
@@ -2,11 +2,13 @@ from typing import Dict, List, Optional
 from datetime import datetime
 import json
 import logging
-from langgraph.graph import StateGraph
-from app.models.validation_result import ValidationResult, InputType
+from langgraph.graph import StateGraph, END
+from app.models.validation_result import ResultTemplate, InputType
 from app.models.preference import PreferenceValue, PreferenceUpdate, PreferenceOperation
 from app.models.graph_state import GraphState
-from app.utils.input_validator import InputValidator
+from app.utils.input_validator import get_shared_validator
+from app.utils.exceptions import PreferenceError
+from app.utils.preference_store import PreferenceStore
 
 class ValidationScope:
     """Enhanced scope including preference validation"""
@@ -18,84 +20,130 @@ class ValidationScope:
         self.min_goals_score = 0.7
         self.max_preferences_per_category = 5
 
+# Result for inputs rejected before validation, validated once at import
+INVALID_RESULT = ResultTemplate(
+    is_valid=False,
+    input_type=InputType.INVALID_INPUT,
+    has_background=False,
+    has_goals=False,
+    background_completeness=0.0,
+    goals_clarity=0.0,
+    clarity_score=0.0,
+    safety_score=0.0
+)
+
 class ValidationNode:
     """Enhanced validation node with preference handling"""
     def __init__(self):
-        self.validator = InputValidator()
+        self.validator = get_shared_validator()
 
     async def __call__(self, state: GraphState) -> GraphState:
         """Process the validation node"""
         try:
             # Basic length validation
-            input_length = len(state.user_input.raw_input)
+            input_length = len(state["user_input"].raw_input)
             if input_length < 1:
-                state.validation_result = ValidationResult(
-                    is_valid=False,
-                    input_type=InputType.INVALID_INPUT,
-                    error_message="Input cannot be empty",
-                    has_background=False,
-                    has_goals=False,
-                    background_completeness=0.0,
-                    clarity_score=0.0,
-                    safety_score=0.0
-                )
-                state.next_step = "error"
+                state["validation_result"] = INVALID_RESULT.new(error_message="Input cannot be empty")
+                state["next_step"] = "error"
                 return state
 
             # Perform validation using our custom validator
-            validation_result = await self.validator.validate_input(state.user_input)
-            state.validation_result = validation_result
+            validation_result = await self.validator.validate_input(state["user_input"])
+            state["validation_result"] = validation_result
 
             # Determine next step based on validation result
             if not validation_result.is_valid:
-                state.next_step = "error"
-                state.messages.append({
+                state["next_step"] = "error"
+                state["messages"].append({
                     "role": "system",
                     "content": f"Validation failed: {validation_result.error_message}"
                 })
             elif validation_result.input_type == InputType.PREFERENCE_UPDATE:
-                state.next_step = "update_preferences"
+                state["next_step"] = "update_preferences"
             elif validation_result.input_type == InputType.PREFERENCE_REMOVAL:
-                state.next_step = "remove_preferences"
+                state["next_step"] = "remove_preferences"
             elif validation_result.input_type == InputType.PREFERENCE_QUERY:
-                state.next_step = "query_preferences"
+                state["next_step"] = "query_preferences"
             else:
-                state.next_step = "process"
+                state["next_step"] = "process"
                 
             return state
 
         except Exception as e:
-            logging.error(f"Validation error: {str(e)}")
-            state.validation_result = ValidationResult(
-                is_valid=False,
-                input_type=InputType.INVALID_INPUT,
-                error_message=f"Validation error: {str(e)}",
-                has_background=False,
-                has_goals=False,
-                background_completeness=0.0,
-                clarity_score=0.0,
-                safety_score=0.0
-            )
-            state.next_step = "error"
+            logging.error("Validation error: %s", e)
+            state["validation_result"] = INVALID_RESULT.new(error_message=f"Validation error: {str(e)}")
+            state["next_step"] = "error"
             return state
 
+# Preferences are stored per user, with the scope's per-category limit
+preference_store = PreferenceStore.from_env(ValidationScope().max_preferences_per_category)
+
+class PreferenceNode:
+    """Applies the preference operation found by validation to the user's stored preferences"""
+    def __init__(self, operation: PreferenceOperation, store: Optional[PreferenceStore] = None):
+        self.operation = operation
+        self.store = store or preference_store
+
+    async def __call__(self, state: GraphState) -> GraphState:
+        """Process the preference node"""
+        user_id = state.get("user_id")
+        update = state["validation_result"].preference_updates
+        if update is None:
+            if self.operation != PreferenceOperation.QUERY:
+                state["messages"].append({
+                    "role": "system",
+                    "content": "No preferences were recognized in the input"
+                })
+                return state
+            # Nothing more specific was asked for, so list everything
+            update = PreferenceUpdate(operation=PreferenceOperation.QUERY, preferences=[])
+
+        if user_id is None:
+            state["messages"].append({"role": "system", "content": "Preferences require an authenticated user"})
+            return state
+
+        try:
+            change = await self.store.apply(user_id, update)
+        except PreferenceError as e:
+            logging.warning("Preference update rejected: %s", e.message, extra={"details": e.details})
+            state["messages"].append({"role": "system", "content": e.message})
+            return state
+
+        state["preferences"] = change
+        if change.operation != PreferenceOperation.QUERY:
+            state["messages"].append({
+                "role": "system",
+                "content": f"Preferences {'updated' if change.changed else 'unchanged'} (version {change.version})"
+            })
+        return state
+
+def _route(state: GraphState) -> str:
+    return state["next_step"]
+
 def create_validation_workflow() -> StateGraph:
     """Creates the complete validation workflow"""
     # Create workflow graph
     workflow = StateGraph(GraphState)
     
-    # Add validation node
+    # Add validation and preference nodes
     validation_node = ValidationNode()
     workflow.add_node("validate", validation_node)
+    workflow.add_node("update_preferences", PreferenceNode(PreferenceOperation.UPDATE))
+    workflow.add_node("remove_preferences", PreferenceNode(PreferenceOperation.REMOVE))
+    workflow.add_node("query_preferences", PreferenceNode(PreferenceOperation.QUERY))
     
     # Define edges
     workflow.set_entry_point("validate")
     
-    # Add conditional edges based on next_step
-    workflow.add_edge("validate", "process", lambda x: x["next_step"] == "process")
-    workflow.add_edge("validate", "error", lambda x: x["next_step"] == "error")
-    workflow.add_edge("validate", "update_preferences", lambda x: x["next_step"] == "update_preferences")
-    workflow.add_edge("validate", "remove_preferences", lambda x: x["next_step"] == "remove_preferences")
-    workflow.add_edge("validate", "query_preferences", lambda x: x["next_step"] == "query_preferences")
+    # Route on next_step; processing and errors are handled by the caller
+    workflow.add_conditional_edges("validate", _route, {
+        "process": END,
+        "error": END,
+        "update_preferences": "update_preferences",
+        "remove_preferences": "remove_preferences",
+        "query_preferences": "query_preferences"
+    })
+    for node in ("update_preferences", "remove_preferences", "query_preferences"):
+        workflow.add_edge(node, END)
     
     return workflow
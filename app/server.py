@@ -0,0 +1,75 @@
+"""
+Production entry point: serves the API from several worker processes.
+
+    python -m app.server --workers 4
+
+Uses gunicorn with uvicorn workers when gunicorn is installed (the app is
+imported once and forked, so workers share its memory pages), and uvicorn's
+own process manager otherwise. Cross-worker state lives in Redis (REDIS_URL);
+see the README for what is shared and what stays per-worker.
+"""
+import argparse
+import importlib.util
+import logging
+import os
+from typing import Optional
+import uvicorn
+
+APP_PATH = "app.main:app"
+
+def default_workers() -> int:
+    """WEB_CONCURRENCY if set, otherwise one worker per CPU"""
+    return int(os.getenv("WEB_CONCURRENCY", "0")) or os.cpu_count() or 1
+
+def _has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+def run(host: str = "0.0.0.0", port: int = 8000, workers: Optional[int] = None):
+    """Serve the API with the given number of worker processes"""
+    workers = workers or default_workers()
+    if workers > 1 and not os.getenv("REDIS_URL"):
+        logging.warning(
+            "Running %d workers without REDIS_URL: rate limits, idempotency and job status are per-worker",
+            workers
+        )
+
+    if workers > 1 and _has_module("gunicorn"):
+        _run_gunicorn(host, port, workers)
+        return
+
+    # "auto" picks uvloop and httptools when they are installed
+    uvicorn.run(
+        APP_PATH,
+        host=host,
+        port=port,
+        workers=workers,
+        loop="auto",
+        http="auto",
+        access_log=False
+    )
+
+def _run_gunicorn(host: str, port: int, workers: int):
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("worker_class", "uvicorn.workers.UvicornWorker")
+            self.cfg.set("preload_app", True)
+            self.cfg.set("graceful_timeout", 30)
+            self.cfg.set("timeout", int(os.getenv("WORKER_TIMEOUT", "120")))
+
+        def load(self):
+            from app.main import app
+            return app
+
+    Application().run()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Rishi API with multiple workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    run(args.host, args.port, args.workers)
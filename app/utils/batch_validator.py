@@ -0,0 +1,91 @@
+"""Batch validation with local pre-checks and bounded LLM fan-out"""
+from contextlib import nullcontext
+from typing import AsyncContextManager, AsyncIterator, Callable, List, Optional
+import asyncio
+import logging
+import os
+from ..models.batch import BatchItemResult
+from ..models.user_input import UserInput
+from .deadline import request_deadline
+from .exceptions import OverloadedError, UserRateLimitExceeded
+from .input_validator import InputValidator, get_shared_validator
+
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+
+async def validate_batch(
+    inputs: List[UserInput],
+    validator: Optional[InputValidator] = None,
+    max_concurrency: Optional[int] = None,
+    guard: Optional[Callable[[UserInput], AsyncContextManager]] = None,
+    deadline_seconds: Optional[float] = None
+) -> AsyncIterator[BatchItemResult]:
+    """
+    Validate a batch of inputs, yielding results in completion order.
+
+    Every input first goes through the validator's local pre-checks; rejected
+    inputs are yielded immediately. Only the survivors fan out to the LLM, with
+    at most max_concurrency validations in flight at once. Each LLM-bound
+    validation runs inside guard(user_input) when given (where callers charge
+    budgets and take admission slots) and under its own deadline of
+    deadline_seconds; items the guard turns away get an error result.
+    """
+    validator = validator or get_shared_validator()
+    max_concurrency = max_concurrency or DEFAULT_MAX_CONCURRENCY
+
+    survivors = []
+    for index, user_input in enumerate(inputs):
+        result = validator.precheck(user_input)
+        if result is not None:
+            yield BatchItemResult(
+                index=index,
+                session_id=user_input.session_id,
+                prechecked=True,
+                validation_result=result
+            )
+        else:
+            survivors.append((index, user_input))
+
+    if not survivors:
+        return
+
+    logging.info(
+        "Batch of %d inputs: %d rejected locally, %d sent to LLM",
+        len(inputs), len(inputs) - len(survivors), len(survivors)
+    )
+
+    semaphore = asyncio.BoundedSemaphore(max_concurrency)
+
+    async def run(index: int, user_input: UserInput) -> BatchItemResult:
+        async with semaphore:
+            try:
+                with request_deadline(deadline_seconds):
+                    async with (guard(user_input) if guard is not None else nullcontext()):
+                        result = await validator.validate_input(user_input)
+            except (OverloadedError, UserRateLimitExceeded) as e:
+                result = validator._create_error_result(
+                    error_type=type(e).__name__,
+                    message=f"{e.message}, retry this input later",
+                    details={"retry_after": e.retry_after}
+                )
+            except Exception as e:
+                logging.error("Batch item %d failed: %s", index, e)
+                result = validator._create_error_result(
+                    error_type="UnexpectedError",
+                    message="An unexpected error occurred",
+                    details={"error": str(e)}
+                )
+        return BatchItemResult(
+            index=index,
+            session_id=user_input.session_id,
+            prechecked=False,
+            validation_result=result
+        )
+
+    tasks = [asyncio.create_task(run(index, user_input)) for index, user_input in survivors]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away or the consumer stopped early: don't keep paying for LLM calls
+        for task in tasks:
+            task.cancel()
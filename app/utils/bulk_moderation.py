@@ -0,0 +1,180 @@
+"""
+Offline re-moderation of stored chat messages.
+
+When the safety patterns change, every stored message has to be checked
+again. Messages are streamed from session storage (sessions.json-style files
+holding many sessions, or chat_data/ directories of one JSON file per
+session), batched into chunks and scanned by a pool of worker processes, each
+with its own ContentSafetyChecker. Verdicts are written in input order as one
+tab-separated line per message:
+
+    session_id  message_index  sender  categories
+
+where categories is a comma-separated list, empty for safe messages.
+Sessions without a "messages" list (e.g. validation state records) have
+nothing to moderate; they are skipped with a warning and counted in the
+report.
+
+Usage:
+    python -m app.utils.bulk_moderation sessions.json chat_data -o verdicts.tsv --workers 8
+"""
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import gzip
+import json
+import logging
+import os
+import time
+from .content_safety import ContentSafetyChecker
+
+# (session_id, message_index, sender, content); plain tuples pickle cheaply
+Message = Tuple[str, int, str, str]
+
+def _session_messages(session_id: str, session: Dict) -> Iterator[Message]:
+    for index, message in enumerate(session["messages"]):
+        sender = message.get("sender") or message.get("role") or ""
+        yield session_id, index, sender, message.get("content") or ""
+
+def _file_messages(path: str, skipped: List[str]) -> Iterator[Message]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if "messages" in data:
+        # One session per file (chat_data/<session_id>.json)
+        sessions = {data.get("session_id") or os.path.splitext(os.path.basename(path))[0]: data}
+    else:
+        sessions = data
+
+    missing = 0
+    for session_id, session in sessions.items():
+        if isinstance(session, dict) and isinstance(session.get("messages"), list):
+            yield from _session_messages(session_id, session)
+        else:
+            skipped.append(session_id)
+            missing += 1
+    if missing:
+        logging.warning("%s: skipped %d of %d sessions without a 'messages' list", path, missing, len(sessions))
+
+def iter_messages(paths: Iterable[str], skipped: Optional[List[str]] = None) -> Iterator[Message]:
+    """
+    Stream every stored message from session files and directories of session
+    files; ids of sessions without a messages list are appended to skipped
+    """
+    skipped = [] if skipped is None else skipped
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(".json"):
+                    yield from _file_messages(os.path.join(path, name), skipped)
+        else:
+            yield from _file_messages(path, skipped)
+
+def _chunks(messages: Iterator[Message], size: int) -> Iterator[List[Message]]:
+    chunk = []
+    for message in messages:
+        chunk.append(message)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+_checker: Optional[ContentSafetyChecker] = None
+
+def _init_worker():
+    global _checker
+    _checker = ContentSafetyChecker()
+
+def moderate_chunk(chunk: List[Message]) -> Tuple[str, Counter]:
+    """Scan a chunk of messages; returns its verdict lines and category counts"""
+    if _checker is None:
+        _init_worker()
+    lines = []
+    counts: Counter = Counter()
+    for session_id, index, sender, content in chunk:
+        categories = sorted(_checker.scan(content))
+        counts.update(categories)
+        if categories:
+            counts["flagged"] += 1
+        lines.append(f"{session_id}\t{index}\t{sender}\t{','.join(categories)}\n")
+    return "".join(lines), counts
+
+@dataclass
+class ModerationReport:
+    """Totals of a bulk moderation run"""
+    messages: int = 0
+    flagged: int = 0
+    skipped_sessions: int = 0
+    categories: Dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.seconds if self.seconds else 0.0
+
+def moderate(
+    paths: Iterable[str],
+    output: str,
+    workers: Optional[int] = None,
+    chunk_size: int = 2000
+) -> ModerationReport:
+    """
+    Moderate every stored message under paths and write verdicts to output
+    (gzip-compressed if it ends in .gz). Messages are read lazily and at most
+    two chunks per worker are in flight, so memory stays bounded however much
+    is stored. workers=1 scans in this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    report = ModerationReport()
+    categories: Counter = Counter()
+    skipped: List[str] = []
+    chunks = _chunks(iter_messages(paths, skipped), chunk_size)
+    opener = gzip.open if output.endswith(".gz") else open
+    start = time.perf_counter()
+
+    with opener(output, "wt", encoding="utf-8") as out:
+        def record(chunk_size: int, result: Tuple[str, Counter]):
+            lines, counts = result
+            out.write(lines)
+            report.messages += chunk_size
+            report.flagged += counts.pop("flagged", 0)
+            categories.update(counts)
+
+        if workers == 1:
+            for chunk in chunks:
+                record(len(chunk), moderate_chunk(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append((len(chunk), pool.submit(moderate_chunk, chunk)))
+                    if len(pending) >= 2 * workers:
+                        size, future = pending.popleft()
+                        record(size, future.result())
+                while pending:
+                    size, future = pending.popleft()
+                    record(size, future.result())
+
+    report.seconds = time.perf_counter() - start
+    report.categories = dict(categories)
+    report.skipped_sessions = len(skipped)
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-run content safety checks over stored chat messages")
+    parser.add_argument("paths", nargs="+", help="sessions.json files and/or chat_data directories")
+    parser.add_argument("-o", "--output", default="moderation_verdicts.tsv", help="Verdict file (.gz to compress)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Messages per task sent to a worker")
+    args = parser.parse_args()
+
+    report = moderate(args.paths, args.output, workers=args.workers, chunk_size=args.chunk_size)
+    print(
+        f"{report.messages} messages, {report.flagged} flagged in {report.seconds:.2f}s "
+        f"({report.messages_per_second:,.0f} msgs/s)"
+    )
+    if report.skipped_sessions:
+        print(f"warning: {report.skipped_sessions} sessions had no 'messages' list and were skipped")
+    print(json.dumps(report.categories, indent=2, sort_keys=True))
@@ -1,7 +1,32 @@
 """Content safety checker implementation"""
-from typing import Dict, List, Tuple
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional, Pattern, Tuple
 import re
 import logging
+from .exceptions import GuardrailsError
+
+def compile_matcher(patterns: Dict[str, List[str]]) -> Pattern:
+    """
+    Compile per-category patterns into one case-insensitive alternation with a
+    named group per category, so a single finditer pass finds every hit and
+    match.lastgroup tells which category it belongs to.
+    """
+    all_patterns = [pattern for category_patterns in patterns.values() for pattern in category_patterns]
+    # When every pattern is a whole-word match, test the word boundary once up
+    # front instead of re-trying each alternative at every position
+    whole_words = all(pattern.startswith(r"\b") and pattern.endswith(r"\b") for pattern in all_patterns)
+    if whole_words:
+        patterns = {
+            category: [pattern[2:-2] for pattern in category_patterns]
+            for category, category_patterns in patterns.items()
+        }
+
+    alternatives = "|".join(
+        f"(?P<{category}>" + "|".join(f"(?:{pattern})" for pattern in category_patterns) + ")"
+        for category, category_patterns in patterns.items()
+    )
+    if whole_words:
+        alternatives = rf"(?=\w)\b(?:{alternatives})\b"
+    return re.compile(alternatives, re.IGNORECASE)
 
 class ContentSafetyChecker:
     """Simple pattern-based content safety checker"""
@@ -26,13 +51,16 @@ class ContentSafetyChecker:
             ]
         }
         
-        # Initialize pattern cache
-        self.compiled_patterns = {
-            category: [re.compile(pattern, re.IGNORECASE) 
-                      for pattern in patterns]
-            for category, patterns in self.unsafe_patterns.items()
-        }
-    
+        # All categories are matched in one pass over the text
+        self.matcher = compile_matcher(self.unsafe_patterns)
+
+    def scan(self, text: str) -> Dict[str, List[str]]:
+        """Scan text once and return the matched terms per category"""
+        hits: Dict[str, List[str]] = {}
+        for match in self.matcher.finditer(text):
+            hits.setdefault(match.lastgroup, []).append(match.group())
+        return hits
+
     def check_content(self, text: str) -> Tuple[bool, Dict]:
         """
         Check if content is safe
@@ -41,15 +69,9 @@ class ContentSafetyChecker:
         if not text or not isinstance(text, str):
             return True, {"message": "Empty or invalid input"}
             
-        violations = []
-        categories_found = set()
-        
-        for category, patterns in self.compiled_patterns.items():
-            for pattern in patterns:
-                matches = pattern.findall(text)
-                if matches:
-                    violations.extend(matches)
-                    categories_found.add(category)
+        hits = self.scan(text)
+        categories_found = set(hits)
+        violations = [term for terms in hits.values() for term in terms]
         
         is_safe = len(violations) == 0
         
@@ -63,7 +85,10 @@ class ContentSafetyChecker:
         }
         
         if not is_safe:
-            logging.warning(f"Unsafe content detected: {details}")
+            logging.warning(
+                "Unsafe content detected: %s", ", ".join(details["categories"]),
+                extra={"categories": details["categories"], "violations_found": details["violations_found"]}
+            )
         
         return is_safe, details
     
@@ -85,3 +110,115 @@ class ContentSafetyChecker:
             
         suggestions.append("Try rephrasing your request in a more appropriate way")
         return suggestions
+
+def _trailing_word_start(text: str) -> int:
+    """Index where the word running to the end of text starts (len(text) if it ends in a non-word character)"""
+    start = len(text)
+    while start and (text[start - 1].isalnum() or text[start - 1] == "_"):
+        start -= 1
+    return start
+
+class StreamingSafetyScanner:
+    """
+    Scans a response as it streams, chunk by chunk, with the checker's patterns.
+
+    Only a bounded window of recent text is kept: the trailing partial word,
+    which may still grow into a match, plus `overlap` characters so matches
+    that span chunk boundaries (like "DROP TABLE") are still found; it must
+    be at least as long as the longest match. feed()
+    returns the text that is safe to forward now; everything but the trailing
+    partial word is released immediately, since the checker's patterns are
+    whole-word and a word is only unsafe once complete. After the first
+    violation the scanner is blocked and releases nothing more.
+    """
+    def __init__(self, checker: Optional[ContentSafetyChecker] = None, overlap: int = 32):
+        self.checker = checker or ContentSafetyChecker()
+        self.overlap = overlap
+        self.hits: Dict[str, List[str]] = {}
+        self._window = ""
+        self._released = 0  # length of the window prefix already forwarded
+        self._scan_from = 0  # the character before this is only kept as \b context
+
+    @property
+    def blocked(self) -> bool:
+        return bool(self.hits)
+
+    def feed(self, chunk: str) -> str:
+        """Scan a chunk and return the text that can be forwarded"""
+        if self.blocked:
+            return ""
+        self._window += chunk
+        return self._scan(final=False)
+
+    def finish(self) -> str:
+        """Scan the end of the stream and return the rest of the held-back text"""
+        if self.blocked:
+            return ""
+        return self._scan(final=True)
+
+    def _scan(self, final: bool) -> str:
+        window = self._window
+        release_end = len(window) if final else _trailing_word_start(window)
+        for match in self.checker.matcher.finditer(window, self._scan_from):
+            # A match running to the end of the window may still change (hack -> hacker)
+            if match.end() == len(window) and not final:
+                # Its start may already be out ("DROP" before "\nTABLE"); never release text twice
+                release_end = max(min(release_end, match.start()), self._released)
+                break
+            self.hits.setdefault(match.lastgroup, []).append(match.group())
+        if self.blocked:
+            self._window = ""
+            return ""
+
+        released = window[self._released:release_end]
+        # Keep one character before the window so a word boundary at its start is judged correctly
+        keep_from = max(0, min(release_end, len(window) - self.overlap) - 1)
+        self._window = window[keep_from:]
+        self._released = release_end - keep_from
+        self._scan_from = 1 if keep_from else 0
+        return released
+
+    def details(self) -> Dict:
+        """Violation details in the same shape as ContentSafetyChecker.check_content"""
+        categories = set(self.hits)
+        return {
+            "is_safe": not self.blocked,
+            "blocked": self.blocked,
+            "categories": list(categories),
+            "violations_found": sum(len(terms) for terms in self.hits.values()),
+            "message": "Unsafe content detected" if self.blocked else "Content is safe",
+            "suggestions": self.checker._get_suggestions(categories) if self.blocked else []
+        }
+
+async def guard_stream(
+    chunks: AsyncIterable[str],
+    scanner: Optional[StreamingSafetyScanner] = None
+) -> AsyncIterator[str]:
+    """
+    Forward a streamed response through a StreamingSafetyScanner, stopping the
+    source and raising GuardrailsError as soon as unsafe content is found
+    """
+    scanner = scanner or StreamingSafetyScanner()
+    try:
+        async for chunk in chunks:
+            released = scanner.feed(chunk)
+            if scanner.blocked:
+                break
+            if released:
+                yield released
+        else:
+            released = scanner.finish()
+            if released:
+                yield released
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    if scanner.blocked:
+        details = scanner.details()
+        logging.warning(
+            "Unsafe content in streamed response: %s", ", ".join(details["categories"]),
+            extra={"categories": details["categories"], "violations_found": details["violations_found"]}
+        )
+        raise GuardrailsError("Response stopped by safety checks", details)
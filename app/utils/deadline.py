@@ -0,0 +1,23 @@
+"""Per-request deadlines shared with everything the request awaits"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+import time
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+@contextmanager
+def request_deadline(seconds: Optional[float]):
+    """Set a deadline seconds from now for the block, including child tasks; None means no deadline"""
+    reset_token = _deadline.set(time.monotonic() + seconds if seconds is not None else None)
+    try:
+        yield
+    finally:
+        _deadline.reset(reset_token)
+
+def time_remaining() -> Optional[float]:
+    """Seconds left before the current deadline (never negative), or None without one"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
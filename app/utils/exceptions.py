@@ -12,6 +12,10 @@ class LLMError(ValidationError):
     """Raised when there's an error with LLM operations"""
     pass
 
+class DeadlineExceededError(LLMError):
+    """Raised when the request deadline leaves no time for an LLM call"""
+    pass
+
 class PreferenceError(ValidationError):
     """Raised when there's an error processing preferences"""
     pass
@@ -31,3 +35,25 @@ class ConversationMemoryError(ValidationError):
 class ParsingError(ValidationError):
     """Raised when there's an error parsing responses or data"""
     pass
+
+class OverloadedError(Exception):
+    """Raised when a request is shed because the server is at capacity"""
+    def __init__(self, message: str, retry_after: int = 1):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
+class IdempotencyConflictError(Exception):
+    """Raised when an idempotency key is reused with a different request payload"""
+    def __init__(self, message: str, key: str):
+        self.message = message
+        self.key = key
+        super().__init__(self.message)
+
+class UserRateLimitExceeded(Exception):
+    """Raised when a user has exhausted their rate limit"""
+    def __init__(self, message: str, retry_after: int, limit: str):
+        self.message = message
+        self.retry_after = retry_after
+        self.limit = limit
+        super().__init__(self.message)
@@ -0,0 +1,109 @@
+"""Dictionary-based preference extraction across all preference categories"""
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+import os
+import re
+from ..models.preference import PreferenceCategory, PreferenceValue
+
+DEFAULT_VOCABULARY_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "preference_vocabulary")
+
+_WHITESPACE = re.compile(r"\s+")
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text.lower()).strip()
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """Regex for the terms below a trie node; longer continuations are tried before the term ends"""
+    alternatives = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not alternatives:
+        return ""
+    body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+    if "" in node:
+        # A term ends here; the optional group is greedy, so the longest term still wins
+        return ("(?:" + body + ")" if len(alternatives) == 1 else body) + "?"
+    return body
+
+def compile_terms(terms: Iterable[str]) -> Pattern:
+    """
+    Compile literal terms into one regex shaped like a trie, so matching costs
+    roughly the length of the text rather than the number of terms. Terms only
+    match as whole words, and the longest term at a position wins.
+    """
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    if not trie:
+        return re.compile(r"(?!)")
+    return re.compile(rf"(?<!\w)(?:{_trie_pattern(trie)})(?!\w)")
+
+class Gazetteer:
+    """
+    Finds known preference terms in text, for every category in one pass.
+
+    Each category has a vocabulary of entries; an entry is a canonical value
+    and its aliases (["javascript", "js", "ecmascript"]). All aliases of all
+    categories are compiled into a single matcher, and matches are reported as
+    canonical values, in the order they first appear. Matching ignores case and
+    whitespace differences.
+    """
+    def __init__(self, vocabularies: Dict[PreferenceCategory, List[List[str]]]):
+        self.vocabularies = vocabularies
+        self._terms: Dict[str, List[Tuple[PreferenceCategory, str]]] = {}
+        for category, entries in vocabularies.items():
+            for entry in entries:
+                canonical = entry[0]
+                for alias in entry:
+                    targets = self._terms.setdefault(_normalize(alias), [])
+                    if (category, canonical) not in targets:
+                        targets.append((category, canonical))
+        self.matcher = compile_terms(self._terms)
+
+    @classmethod
+    def from_directory(cls, path: str) -> "Gazetteer":
+        """
+        Load one <category>.txt vocabulary per PreferenceCategory from path.
+        Each line is "canonical | alias | ..."; blank lines and # comments are skipped.
+        """
+        vocabularies = {}
+        for category in PreferenceCategory:
+            file_path = os.path.join(path, f"{category.value}.txt")
+            if not os.path.exists(file_path):
+                continue
+            with open(file_path, encoding="utf-8") as f:
+                entries = [
+                    [term.strip() for term in line.split("|") if term.strip()]
+                    for line in f
+                    if line.strip() and not line.lstrip().startswith("#")
+                ]
+            vocabularies[category] = [entry for entry in entries if entry]
+        return cls(vocabularies)
+
+    @classmethod
+    def from_env(cls) -> "Gazetteer":
+        """Use the vocabularies in PREFERENCE_VOCABULARY_DIR if set, otherwise the bundled ones"""
+        return cls.from_directory(os.getenv("PREFERENCE_VOCABULARY_DIR", DEFAULT_VOCABULARY_DIR))
+
+    def extract(self, text: str) -> Dict[PreferenceCategory, List[str]]:
+        """Canonical values mentioned in text, per category"""
+        found: Dict[PreferenceCategory, List[str]] = {}
+        for match in self.matcher.finditer(_normalize(text)):
+            for category, canonical in self._terms[match.group()]:
+                values = found.setdefault(category, [])
+                if canonical not in values:
+                    values.append(canonical)
+        return found
+
+    def preference_values(self, text: str, categories: Optional[Iterable[PreferenceCategory]] = None) -> List[PreferenceValue]:
+        """The values in text as PreferenceValues, one per category"""
+        found = self.extract(text)
+        wanted = set(categories) if categories is not None else None
+        return [
+            PreferenceValue(category=category, value=values[0] if len(values) == 1 else values)
+            for category, values in found.items()
+            if wanted is None or category in wanted
+        ]
+
+# Initialize the shared gazetteer
+preference_gazetteer = Gazetteer.from_env()
@@ -0,0 +1,144 @@
+"""NeMo Guardrails input rails, kept warm and cached across requests"""
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import logging
+import os
+import time
+from .deadline import time_remaining
+from .result_cache import normalize_input
+
+@dataclass(frozen=True)
+class RailsVerdict:
+    """Outcome of the input rails for one input"""
+    allowed: bool
+    status: str
+    rail: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+class GuardrailsService:
+    """
+    Runs the NeMo Guardrails input rails for user inputs.
+
+    The rails config is loaded and the LLMRails instance built once, then
+    reused by every request. Verdicts are cached per normalized input for
+    cache_ttl seconds, and concurrent checks of the same input share one rails
+    call. If the rails fail or exceed their timeout (or the request deadline)
+    the input is allowed and the verdict is not cached: the local safety rules
+    have already run, and guardrails must not turn an LLM outage into errors.
+    """
+    def __init__(
+        self,
+        rails_factory: Callable[[], Any],
+        cache_ttl: float = 600.0,
+        max_entries: int = 10000,
+        timeout: float = 5.0
+    ):
+        self.rails_factory = rails_factory
+        self.cache_ttl = cache_ttl
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._rails = None
+        self._verdicts: "OrderedDict[str, Tuple[float, RailsVerdict]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.checks = 0
+        self.hits = 0
+        self.blocked = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["GuardrailsService"]:
+        """A service if GUARDRAILS_ENABLED is set and nemoguardrails is installed, otherwise None"""
+        if os.getenv("GUARDRAILS_ENABLED", "").lower() not in ("1", "true", "yes"):
+            return None
+        try:
+            from nemoguardrails import LLMRails
+            from ..config.config import load_nemo_config
+        except ImportError:
+            logging.warning("GUARDRAILS_ENABLED is set but nemoguardrails is not installed")
+            return None
+        from .llm_client import get_llm_client
+
+        return cls(
+            rails_factory=lambda: LLMRails(load_nemo_config(), llm=get_llm_client()),
+            cache_ttl=float(os.getenv("GUARDRAILS_CACHE_TTL", "600")),
+            max_entries=int(os.getenv("GUARDRAILS_CACHE_MAX_ENTRIES", "10000")),
+            timeout=float(os.getenv("GUARDRAILS_TIMEOUT_SECONDS", "5"))
+        )
+
+    @property
+    def rails(self):
+        """The shared LLMRails instance, built on first use"""
+        if self._rails is None:
+            self._rails = self.rails_factory()
+        return self._rails
+
+    def warm(self):
+        """Build the rails ahead of the first request"""
+        _ = self.rails
+
+    async def check_input(self, text: str) -> RailsVerdict:
+        """Run the input rails on text, or return the cached verdict"""
+        key = normalize_input(text)
+        entry = self._verdicts.get(key)
+        if entry is not None:
+            expires_at, verdict = entry
+            if expires_at > time.monotonic():
+                self._verdicts.move_to_end(key)
+                self.hits += 1
+                return verdict
+            del self._verdicts[key]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._check(key, text))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.hits += 1
+        # A caller that stops waiting must not cancel the check for the others
+        return await asyncio.shield(task)
+
+    async def _check(self, key: str, text: str) -> RailsVerdict:
+        from nemoguardrails.rails.llm.options import RailStatus, RailType
+
+        self.checks += 1
+        timeout = self.timeout
+        remaining = time_remaining()
+        if remaining is not None:
+            timeout = min(timeout, max(remaining, 0.0))
+        try:
+            result = await asyncio.wait_for(
+                self.rails.check_async([{"role": "user", "content": text}], rail_types=[RailType.INPUT]),
+                timeout=timeout
+            )
+        except Exception as e:
+            self.errors += 1
+            logging.warning("Input rails failed, allowing input: %s", e or e.__class__.__name__)
+            return RailsVerdict(allowed=True, status="error")
+
+        allowed = result.status != RailStatus.BLOCKED
+        if not allowed:
+            self.blocked += 1
+        verdict = RailsVerdict(allowed=allowed, status=result.status.value, rail=result.rail)
+        if self.cache_ttl > 0 and self.max_entries > 0:
+            self._verdicts[key] = (time.monotonic() + self.cache_ttl, verdict)
+            while len(self._verdicts) > self.max_entries:
+                self._verdicts.popitem(last=False)
+        return verdict
+
+    def metrics(self) -> Dict[str, int]:
+        """Rails activity for the metrics endpoint"""
+        return {
+            "cached_verdicts": len(self._verdicts),
+            "checks": self.checks,
+            "cache_hits": self.hits,
+            "blocked": self.blocked,
+            "errors": self.errors
+        }
+
+# Initialize the shared service (None unless enabled)
+guardrails_service = GuardrailsService.from_env()
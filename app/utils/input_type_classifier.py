@@ -0,0 +1,83 @@
+"""Rule-table input type detection compiled into a single regex scan"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+import json
+import os
+import re
+from ..config.input_type_rules import INPUT_TYPE_RULES
+from ..models.validation_result import InputType
+
+@dataclass(frozen=True)
+class InputTypeRule:
+    """Patterns that identify one input type; requires_previous rules only apply mid-conversation"""
+    input_type: InputType
+    patterns: Tuple[str, ...]
+    requires_previous: bool = False
+
+def _compile_rules(rules: List[Tuple[int, InputTypeRule]]) -> Pattern:
+    if not rules:
+        return re.compile(r"(?!)")
+    # Each rule is a named group inside a lookahead, so finditer visits every
+    # position without consuming text and overlapping matches are not lost
+    alternatives = "|".join(
+        f"(?P<r{index}>" + "|".join(f"(?:{pattern})" for pattern in rule.patterns) + ")"
+        for index, rule in rules
+    )
+    return re.compile(f"(?=(?:{alternatives}))")
+
+class InputTypeClassifier:
+    """
+    Classifies input type from a priority-ordered rule table.
+
+    All rules are compiled into one pattern, so each input is scanned once;
+    the highest-priority rule that matches anywhere in the lowercased input
+    wins, and inputs matching no rule are NEW_QUERY.
+    """
+    def __init__(self, rules: List[Dict[str, Any]]):
+        self.rules = [
+            InputTypeRule(
+                input_type=InputType(rule["input_type"]),
+                patterns=tuple(rule["patterns"]),
+                requires_previous=rule.get("requires_previous", False)
+            )
+            for rule in rules
+        ]
+        indexed = list(enumerate(self.rules))
+        self._with_previous = _compile_rules(indexed)
+        self._without_previous = _compile_rules([(index, rule) for index, rule in indexed if not rule.requires_previous])
+        self._by_type = {
+            input_type: _compile_rules([(index, rule) for index, rule in indexed if rule.input_type == input_type])
+            for input_type in {rule.input_type for rule in self.rules}
+        }
+
+    @classmethod
+    def from_file(cls, path: str) -> "InputTypeClassifier":
+        """Load a rule table from a JSON list with the same structure as INPUT_TYPE_RULES"""
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def from_env(cls) -> "InputTypeClassifier":
+        """Use the rule file at INPUT_TYPE_RULES_PATH if set, otherwise the default table"""
+        path = os.getenv("INPUT_TYPE_RULES_PATH")
+        return cls.from_file(path) if path else cls(INPUT_TYPE_RULES)
+
+    def classify(self, text: str, previous_input: Optional[str] = None) -> InputType:
+        """Return the input type of the highest-priority rule matching text"""
+        matcher = self._with_previous if previous_input else self._without_previous
+        best = len(self.rules)
+        for match in matcher.finditer(text.lower()):
+            index = int(match.lastgroup[1:])
+            if index < best:
+                best = index
+                if best == 0:
+                    break
+        return self.rules[best].input_type if best < len(self.rules) else InputType.NEW_QUERY
+
+    def matches(self, input_type: InputType, text: str) -> bool:
+        """Whether any rule for input_type matches text, regardless of priority"""
+        matcher = self._by_type.get(input_type)
+        return matcher is not None and matcher.search(text.lower()) is not None
+
+# Initialize the shared classifier
+input_type_classifier = InputTypeClassifier.from_env()
@@ -1,30 +1,121 @@
 from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import PydanticOutputParser
 from langchain_groq import ChatGroq
-from langchain.schema import HumanMessage, SystemMessage
-from ..models.validation_result import ValidationResult, InputType
+from langchain.schema import AIMessage, HumanMessage, SystemMessage
+from ..models.validation_result import ResultTemplate, ValidationResult, InputType
 from ..models.user_input import UserInput
 from ..models.conversation_memory import ConversationMemory, ConversationTurn
 from ..models.preference import PreferenceValue, PreferenceUpdate, PreferenceOperation, PreferenceAnalysisResult
-from ..utils.llm_client import get_llm_client
+from ..utils.llm_client import get_llm_client, record_token_usage
 from ..utils.exceptions import (
     ValidationError, LLMError, PreferenceError,
-    InputTypeError, GuardrailsError, ConversationMemoryError, ParsingError
+    InputTypeError, GuardrailsError, ConversationMemoryError, DeadlineExceededError
 )
 from ..utils.content_safety import ContentSafetyChecker
+from ..utils.input_type_classifier import input_type_classifier
+from ..utils.local_classifier import LocalPrediction, local_classifier, log_validation_sample
+from ..utils.deadline import time_remaining
+from ..utils.session_memory import SessionMemoryStore, session_memory_store
+from ..utils.result_cache import ValidationResultCache, validation_result_cache
+from ..utils.guardrails import RailsVerdict, guardrails_service
+from ..utils.gazetteer import preference_gazetteer
+from ..utils.profile_extractor import profile_extractor
+from ..utils.json_repair import fill_defaults, missing_fields_prompt, parse_json_object
+from ..utils.structured_output import StructuredOutput, compact_instructions
+from ..config.logging_config import summarize_details
+import asyncio
 import json
+import os
 import re
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+# Below this many seconds before the request deadline the LLM tier is skipped
+MIN_LLM_SECONDS = float(os.getenv("VALIDATION_MIN_LLM_SECONDS", "1.0"))
+# Score fields that default to 0 when the LLM leaves them out or null
+NUMERIC_FIELDS = ("background_completeness", "goals_clarity", "clarity_score", "safety_score")
+
+# Safety checker hits that override an LLM verdict: every harmful command,
+# but only these adult and security terms (None means the whole category)
+SAFETY_RULE_TERMS = {
+    "harmful_commands": None,
+    "adult_content": {"porn", "xxx", "adult"},
+    "security_risks": {"hack", "crack", "exploit"}
+}
+
+# ValidationResult fields set by the service, never asked of the LLM
+SERVICE_FIELDS = frozenset({"degraded", "preference_updates"})
+
+# Results built from constant data are validated once, at import
+_REJECTED = dict(
+    is_valid=False,
+    has_background=False,
+    has_goals=False,
+    background_completeness=0.0,
+    goals_clarity=0.0,
+    clarity_score=0.0,
+    safety_score=0.0,
+    context_score=0.0,
+    input_type=InputType.INVALID_INPUT
+)
+ERROR_RESULT = ResultTemplate(
+    **_REJECTED,
+    suggestions=[
+        "Please try again with valid input",
+        "If the error persists, try rephrasing your request"
+    ],
+    clarification_questions=[
+        "Could you please provide your input in a different way?"
+    ]
+)
+FALLBACK_ERROR_RESULT = ResultTemplate(**_REJECTED, error_message="Internal validation error")
+BLOCKED_RESULT = ResultTemplate(
+    **_REJECTED,
+    error_message="Content blocked by safety checks",
+    missing_elements=['Blocked by guardrails'],
+    suggestions=[
+        "Please rephrase your query",
+        "Please avoid sensitive or prohibited topics"
+    ],
+    clarification_questions=[
+        "Could you please rephrase your request in a more appropriate way?"
+    ]
+)
+PREFERENCE_CLARIFICATION_RESULT = ResultTemplate(
+    **{**_REJECTED, "safety_score": 1.0, "input_type": InputType.PREFERENCE_UPDATE},
+    error_message="Preference clarification needed",
+    suggestions=[
+        "Please provide more details about your preferences",
+        "Try to be more specific about what you prefer"
+    ]
+)
+
+# Phrasing that turns a preference statement into a removal
+PREFERENCE_REMOVAL_PATTERN = re.compile(r"\b(?:remove|delete|drop|don't\s+(?:want|like|prefer)|no\s+longer|not\s+interested)\b", re.IGNORECASE)
+# Phrasing that replaces what is stored for a category; other statements add to it
+PREFERENCE_REPLACEMENT_PATTERN = re.compile(
+    r"\b(?:instead|rather\s+than|replace|(?:change|switch|update|set)\s+(?:\w+\s+){0,3}?to)\b",
+    re.IGNORECASE
+)
 
 class InputValidator:
     """Custom input validator using LangChain"""
-    def __init__(self):
+    def __init__(
+        self,
+        memory_store: Optional[SessionMemoryStore] = None,
+        result_cache: Optional[ValidationResultCache] = None
+    ):
         self.llm = get_llm_client()
-        self.output_parser = PydanticOutputParser(pydantic_object=ValidationResult)
-        self.conversation_memory = ConversationMemory()
+        self.structured_output = StructuredOutput.from_env(ValidationResult)
+        # Conversation memory is looked up per session, so one validator can serve concurrent sessions
+        self.memory_store = memory_store or session_memory_store
         self.safety_checker = ContentSafetyChecker()
+        self.input_type_classifier = input_type_classifier
+        self.local_classifier = local_classifier
+        self.result_cache = result_cache or validation_result_cache
+        self.guardrails = guardrails_service
+        self.gazetteer = preference_gazetteer
+        self.profile_extractor = profile_extractor
         
         # Enhanced validation prompt that better handles preferences and input types
         self.validation_prompt = """
@@ -57,87 +148,33 @@ class InputValidator:
         
         self.prompt = ChatPromptTemplate.from_template(
             template=self.validation_prompt,
-            partial_variables={"format_instructions": self.output_parser.get_format_instructions()}
+            partial_variables={"format_instructions": compact_instructions(ValidationResult, SERVICE_FIELDS)}
         )
 
     def _detect_input_type(self, current_input: str, previous_input: str = None) -> InputType:
         """Enhanced detection of input type based on content and context"""
-        current_lower = current_input.lower()
-        
-        # Preference-related patterns
-        preference_patterns = {
-            'add': [r'i prefer', r'i like', r'i want', r'i would rather', r'set preference', r'update preference'],
-            'remove': [r'remove preference', r"don't prefer", r"don't like", r'remove', r'delete preference'],
-            'query': [r'what are my preferences', r'show preferences', r'list preferences', r'get preferences']
-        }
-        
-        # Check for preference operations
-        for operation, patterns in preference_patterns.items():
-            if any(re.search(pattern, current_lower) for pattern in patterns):
-                if operation == 'add':
-                    return InputType.PREFERENCE_UPDATE
-                elif operation == 'remove':
-                    return InputType.PREFERENCE_REMOVAL
-                elif operation == 'query':
-                    return InputType.PREFERENCE_QUERY
-        
-        # Check for clarification responses
-        clarification_starters = [
-            r'^yes', r'^no', r'^actually', r'^i meant', r'^to clarify',
-            r'^let me clarify', r'^what i meant'
-        ]
-        if previous_input and any(re.search(pattern, current_lower) for pattern in clarification_starters):
-            return InputType.CLARIFICATION_RESPONSE
-        
-        # Check for rewrite requests
-        rewrite_patterns = [r'rewrite', r'rephrase', r'change', r'modify']
-        if any(re.search(pattern, current_lower) for pattern in rewrite_patterns):
-            return InputType.REWRITE_REQUEST
-        
-        # Check for input enhancements
-        enhancement_patterns = [r'add more', r'enhance', r'elaborate', r'provide more']
-        if any(re.search(pattern, current_lower) for pattern in enhancement_patterns):
-            return InputType.INPUT_ENHANCEMENT
-        
-        # Default to new query if no other type matches
-        return InputType.NEW_QUERY
+        return self.input_type_classifier.classify(current_input, previous_input)
 
     def _is_clarification(self, current_input: str, previous_input: str) -> bool:
         """Check if current input is clarifying a previous input"""
-        # Check if current input starts with clarification indicators
-        clarification_starters = ["yes", "no", "actually", "i meant", "to clarify"]
-        return any(current_input.lower().startswith(start) for start in clarification_starters)
+        return self.input_type_classifier.matches(InputType.CLARIFICATION_RESPONSE, current_input)
 
     def _extract_preferences(self, input_text: str) -> dict:
-        """Extract user preferences from input"""
-        preferences = {}
-        
-        # Movie preferences
-        if "movie" in input_text.lower():
-            genres = ["action", "comedy", "drama", "horror", "fantasy", "sci-fi", "bollywood", "hollywood"]
-            for genre in genres:
-                if genre in input_text.lower():
-                    preferences["movie_genre"] = genre
-                    
-        # Other preferences can be added here
-        
-        return preferences
+        """Extract user preferences from input, as comma-separated values per category"""
+        return {
+            category.value: ", ".join(values)
+            for category, values in self.gazetteer.extract(input_text).items()
+        }
 
     def _apply_safety_rules(self, validation_result: ValidationResult, user_input: UserInput) -> ValidationResult:
         """Apply additional safety rules to the validation result"""
-        # Check for unsafe content using word boundaries
-        unsafe_patterns = [
-            r'\brm\s+-rf\b',  # rm -rf command
-            r'\bsudo\b',      # sudo command
-            r'\bdel\b',       # del command
-            r'\bformat\b',    # format command
-            r'\bDROP\s+TABLE\b',  # SQL DROP TABLE
-            r'\bDELETE\s+FROM\b',  # SQL DELETE FROM
-            r'\b(porn|xxx|adult)\b',  # Adult content
-            r'\b(hack|crack|exploit)\b'  # Security-related
-        ]
-        
-        if any(re.search(pattern, user_input.raw_input, re.IGNORECASE) for pattern in unsafe_patterns):
+        # Reuse the checker's single-pass scan; only some of its terms invalidate the result here
+        hits = self.safety_checker.scan(user_input.raw_input)
+        if any(
+            allowed is None or any(term.lower() in allowed for term in hits[category])
+            for category, allowed in SAFETY_RULE_TERMS.items()
+            if category in hits
+        ):
             return ValidationResult(
                 is_valid=False,
                 input_type=InputType.INVALID_INPUT,
@@ -153,34 +190,47 @@ class InputValidator:
             )
         return validation_result
 
-    def _parse_llm_response(self, response_text: str) -> ValidationResult:
+    def _parse_llm_data(
+        self,
+        response_text: str,
+        prefilled: Optional[Dict[str, Any]] = None,
+        detected_type: Optional[InputType] = None
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Parse the JSON object in an LLM response, tolerating surrounding text,
+        trailing commas and truncation, and fill in schema defaults.
+        prefilled holds the fields decided locally, which the LLM was not asked about.
+        Returns the data and the required fields the response did not contain.
+        """
+        data, repaired = parse_json_object(response_text)
+        if repaired:
+            logging.info("Repaired malformed or truncated LLM response")
+        data.update(prefilled or {})
+        if detected_type is not None:
+            data.setdefault("input_type", detected_type)
+        return data, fill_defaults(data, ValidationResult)
+
+    def _build_result(self, data: Dict[str, Any]) -> ValidationResult:
+        """ValidationResult from parsed data; numeric scores still missing or null count as 0"""
+        for field in NUMERIC_FIELDS:
+            if data.get(field) is None:
+                data[field] = 0.0
+        return ValidationResult(**data)
+
+    def _parse_llm_response(self, response_text: str, prefilled: Optional[Dict[str, Any]] = None) -> ValidationResult:
         """Parse LLM response into ValidationResult, handling nulls and missing fields"""
         try:
-            # Extract JSON from the response if it's wrapped in markdown
-            json_str = response_text
-            if "```json" in response_text:
-                start = response_text.find("```json") + 7
-                end = response_text.find("```", start)
-                json_str = response_text[start:end].strip()
-            
-            # Parse JSON response
-            data = json.loads(json_str)
-            
-            # Ensure all numeric fields have valid values
-            numeric_fields = [
-                'background_completeness', 'goals_clarity', 
-                'clarity_score', 'safety_score'
-            ]
-            for field in numeric_fields:
-                if field not in data or data[field] is None:
-                    data[field] = 0.0
-
-            # Create ValidationResult
-            return ValidationResult(**data)
+            data, _ = self._parse_llm_data(response_text, prefilled)
+            return self._build_result(data)
         except Exception as e:
             raise ValueError(f"Failed to parse LLM response. Raw response: {response_text}")
 
-    def _combine_with_context(self, current_input: str, previous_context: Optional[str]) -> str:
+    def _combine_with_context(
+        self,
+        current_input: str,
+        previous_context: Optional[str],
+        memory: ConversationMemory
+    ) -> str:
         """Combines current input with previous context if relevant"""
         if not previous_context:
             return current_input
@@ -189,7 +239,7 @@ class InputValidator:
         is_short_response = len(current_input.split()) <= 2
         
         # Get previous clarification questions
-        prev_result = self.conversation_memory.get_last_validation_result()
+        prev_result = memory.get_last_validation_result()
         if prev_result and prev_result.clarification_questions:
             last_question = prev_result.clarification_questions[0]
             
@@ -205,32 +255,73 @@ class InputValidator:
         
         return current_input
 
+    def precheck(self, user_input: UserInput) -> Optional[ValidationResult]:
+        """
+        Run the cheap local checks (sanity and content safety) without any LLM call.
+        Returns a final ValidationResult if the input is rejected, otherwise None.
+        """
+        raw_input = user_input.raw_input
+        if not raw_input or not isinstance(raw_input, str) or not raw_input.strip():
+            return self._create_error_result(
+                error_type="ValidationError",
+                message="Invalid input: Text must be a non-empty string",
+                details={}
+            )
+
+        try:
+            is_safe, safety_result = self.safety_checker.check_content(raw_input)
+        except Exception as e:
+            return self._create_error_result(
+                error_type="GuardrailsError",
+                message="Content safety check failed",
+                details={"error": str(e)}
+            )
+        if not is_safe:
+            return self._create_blocked_result(safety_result)
+
+        return None
+
     async def validate_input(self, user_input: UserInput) -> ValidationResult:
-        """Validate user input using LLM-based analysis"""
+        """
+        Validate user input in tiers, cheapest first, where any tier can answer:
+        sanity -> safety -> local heuristics -> cache -> LLM.
+
+        If the request deadline leaves no time for the LLM, or the LLM call
+        fails, the heuristic answer is returned marked degraded=True.
+
+        The guardrails input rails start right after the sanity checks and run
+        alongside the other tiers; their verdict is awaited before a result is
+        returned, so they add max(rails, validation) latency, not the sum.
+        """
+        rails_check: Optional[asyncio.Task] = None
         try:
-            # Input sanity checks
+            # Tier 1: input sanity checks
             if not user_input.raw_input or not isinstance(user_input.raw_input, str):
                 raise ValidationError("Invalid input: Text must be a non-empty string")
             
             if len(user_input.raw_input.strip()) == 0:
                 raise ValidationError("Input contains only whitespace")
 
-            # Get conversation context
+            if self.guardrails is not None:
+                rails_check = asyncio.ensure_future(self.guardrails.check_input(user_input.raw_input))
+
+            # Get this session's conversation context
             try:
-                recent_turns = self.conversation_memory.get_recent_context()
+                memory = await self.memory_store.get(user_input.session_id)
+                recent_turns = memory.get_recent_context()
                 previous_input = recent_turns[-1].user_input if recent_turns else None
                 
                 # Combine with context if needed
-                processed_input = self._combine_with_context(user_input.raw_input, previous_input)
+                processed_input = self._combine_with_context(user_input.raw_input, previous_input, memory)
                 if processed_input != user_input.raw_input:
-                    logging.info(f"Combined input: {processed_input} (original: {user_input.raw_input})")
+                    logging.debug("Combined input: %s (original: %s)", processed_input, user_input.raw_input)
             except Exception as e:
                 raise ConversationMemoryError(
                     "Failed to retrieve conversation context",
                     {"error": str(e)}
                 )
 
-            # Content safety check first
+            # Tier 2: content safety
             try:
                 is_safe, safety_result = self.safety_checker.check_content(processed_input)
                 if not is_safe:
@@ -241,8 +332,8 @@ class InputValidator:
                     {"error": str(e), "input": processed_input}
                 )
 
+            # Tier 3: local heuristics (type rules, preference operations, local classifier)
             try:
-                # Detect input type
                 detected_type = self._detect_input_type(processed_input, previous_input)
             except Exception as e:
                 raise InputTypeError(
@@ -250,150 +341,302 @@ class InputValidator:
                     {"error": str(e), "input": processed_input}
                 )
 
-            # Handle preference-related inputs
             if detected_type in [InputType.PREFERENCE_UPDATE, InputType.PREFERENCE_REMOVAL, InputType.PREFERENCE_QUERY]:
-                try:
-                    preference_analysis = await self.analyze_preferences(processed_input, detected_type)
-                    
-                    if preference_analysis.confidence_score > 0.7:
-                        if preference_analysis.needs_clarification:
-                            return self._create_preference_clarification_result(preference_analysis)
-                        
-                        return ValidationResult(
-                            is_valid=True,
-                            has_background=False,
-                            has_goals=False,
-                            background_completeness=0.0,
-                            goals_clarity=0.0,
-                            input_type=detected_type,
-                            preference_updates=PreferenceUpdate(
-                                operation=preference_analysis.detected_operation,
-                                preferences=preference_analysis.detected_preferences
-                            ),
-                            guardrails_result={}
-                        )
-                except Exception as e:
-                    raise PreferenceError(
-                        "Failed to process preferences",
-                        {"error": str(e), "input": processed_input, "type": detected_type}
-                    )
-
-            # Prepare conversation history
-            conversation_history = "\n".join([
-                f"Turn {i+1}:\n- Input: {turn.user_input}\n- Type: {turn.input_type}"
-                for i, turn in enumerate(recent_turns[-3:])
-            ])
-
-            # LLM validation
+                preference_result = await self._validate_preferences(processed_input, detected_type)
+                if preference_result is not None:
+                    return await self._check_input_rails(rails_check) or preference_result
+
+            local_prediction = None
+            if self.local_classifier is not None:
+                local_prediction = self.local_classifier.predict(processed_input)
+                if self.local_classifier.should_skip_llm(local_prediction):
+                    validation_result = local_prediction.to_validation_result()
+                    return await self._finish(rails_check, memory, user_input.session_id, processed_input, validation_result)
+
+            # Tier 4: results of earlier LLM validations
+            if self.result_cache is not None:
+                validation_result = self.result_cache.get(processed_input, recent_turns, detected_type)
+                if validation_result is not None:
+                    return await self._finish(rails_check, memory, user_input.session_id, processed_input, validation_result)
+
+            # Tier 5: LLM validation of whatever the profile extractor couldn't decide,
+            # degrading to the heuristic answer when it can't finish in time
+            profile = self.profile_extractor.extract(processed_input)
+            prefilled = profile.confident(self.profile_extractor.threshold)
             try:
-                messages = [
-                    SystemMessage(content="You are a helpful input validator."),
-                    HumanMessage(content=self.prompt.format(
-                        input=processed_input,
-                        metadata={"detected_type": detected_type},
-                        conversation_history=conversation_history
-                    ))
-                ]
-                
-                response = await self.llm.ainvoke(messages)
-                validation_result = self._parse_llm_response(response.content)
-            except json.JSONDecodeError as e:
-                raise ParsingError(
-                    "Failed to parse LLM response",
-                    {"error": str(e), "response": response.content}
-                )
-            except Exception as e:
-                raise LLMError(
-                    "LLM validation failed",
-                    {"error": str(e), "input": processed_input}
+                validation_result = await self._validate_with_llm(processed_input, detected_type, recent_turns, prefilled)
+            except LLMError as e:
+                logging.warning(
+                    "Returning degraded validation: %s", e.message,
+                    extra={"error_type": e.__class__.__name__, "details": summarize_details(e.details)}
                 )
+                validation_result = self._create_degraded_result(detected_type, local_prediction, e, prefilled)
+                return await self._finish(rails_check, memory, user_input.session_id, processed_input, validation_result)
+
+            log_validation_sample(processed_input, validation_result)
+            if local_prediction is not None:
+                self.local_classifier.record_llm_result(local_prediction, validation_result)
 
             # Override LLM's input type for preferences
             if detected_type in [InputType.PREFERENCE_UPDATE, InputType.PREFERENCE_REMOVAL, InputType.PREFERENCE_QUERY]:
                 validation_result.input_type = detected_type
 
-            # Store in conversation memory
-            try:
-                turn = ConversationTurn(
-                    user_input=processed_input,
-                    input_type=validation_result.input_type,
-                    preferences=validation_result.detected_preferences,
-                    background_info=validation_result.background_info,
-                    goals=validation_result.goals,
-                    context_score=validation_result.context_score
-                )
-                self.conversation_memory.add_turn(turn)
-            except Exception as e:
-                raise ConversationMemoryError(
-                    "Failed to store conversation turn",
-                    {"error": str(e), "turn": turn.dict()}
-                )
+            if self.result_cache is not None:
+                self.result_cache.put(processed_input, recent_turns, detected_type, validation_result)
 
-            return validation_result
+            return await self._finish(rails_check, memory, user_input.session_id, processed_input, validation_result)
 
         except ValidationError as e:
-            logging.error(f"Validation error: {e.message}", extra={"details": e.details})
+            logging.error(
+                "Validation error: %s", e.message,
+                extra={"error_type": e.__class__.__name__, "details": summarize_details(e.details)}
+            )
             return self._create_error_result(
                 error_type=e.__class__.__name__,
                 message=e.message,
                 details=e.details
             )
         except Exception as e:
-            logging.error(f"Unexpected error: {str(e)}")
+            logging.error("Unexpected error: %s", e)
             return self._create_error_result(
                 error_type="UnexpectedError",
                 message="An unexpected error occurred",
                 details={"error": str(e)}
             )
+        finally:
+            # Answered before the rails were needed (blocked, invalid or failed input)
+            if rails_check is not None:
+                rails_check.cancel()
+
+    async def _check_input_rails(self, rails_check: Optional[asyncio.Task]) -> Optional[ValidationResult]:
+        """Wait for the input rails started with this validation; a blocked result if they refused the input"""
+        if rails_check is None:
+            return None
+        verdict: RailsVerdict = await rails_check
+        if verdict.allowed:
+            return None
+        return self._create_blocked_result({"input_rails": verdict.to_dict()})
+
+    async def _finish(
+        self,
+        rails_check: Optional[asyncio.Task],
+        memory: ConversationMemory,
+        session_id: Optional[str],
+        processed_input: str,
+        validation_result: ValidationResult
+    ) -> ValidationResult:
+        """Return validation_result and remember the turn, unless the input rails blocked the input"""
+        blocked_result = await self._check_input_rails(rails_check)
+        if blocked_result is not None:
+            return blocked_result
+        self._store_turn(memory, session_id, processed_input, validation_result)
+        return validation_result
+
+    async def _validate_preferences(self, processed_input: str, detected_type: InputType) -> Optional[ValidationResult]:
+        """Answer confident preference operations locally; None lets the LLM handle the rest"""
+        if detected_type == InputType.PREFERENCE_QUERY:
+            # Stored preferences answer queries; there is nothing for the LLM to judge
+            return ValidationResult(
+                is_valid=True,
+                has_background=False,
+                has_goals=False,
+                background_completeness=0.0,
+                goals_clarity=0.0,
+                input_type=detected_type,
+                preference_updates=PreferenceUpdate(operation=PreferenceOperation.QUERY, preferences=[]),
+                guardrails_result={}
+            )
+
+        try:
+            preference_analysis = self.analyze_preferences(processed_input, detected_type)
+
+            # Nothing recognisable to store: ask which preference they mean
+            if preference_analysis.needs_clarification:
+                return self._create_preference_clarification_result(preference_analysis)
+
+            if preference_analysis.confidence_score > 0.7:
+                return ValidationResult(
+                    is_valid=True,
+                    has_background=False,
+                    has_goals=False,
+                    background_completeness=0.0,
+                    goals_clarity=0.0,
+                    input_type=detected_type,
+                    detected_preferences=self._extract_preferences(processed_input),
+                    preference_updates=PreferenceUpdate(
+                        operation=preference_analysis.detected_operation,
+                        preferences=preference_analysis.detected_preferences
+                    ),
+                    guardrails_result={}
+                )
+        except Exception as e:
+            raise PreferenceError(
+                "Failed to process preferences",
+                {"error": str(e), "input": processed_input, "type": detected_type}
+            )
+        return None
+
+    async def _validate_with_llm(
+        self,
+        processed_input: str,
+        detected_type: InputType,
+        recent_turns,
+        prefilled: Optional[Dict[str, Any]] = None
+    ) -> ValidationResult:
+        """
+        Run the LLM validation within whatever is left of the request deadline,
+        asking only for the fields that were not prefilled locally
+        """
+        prefilled = prefilled or {}
+        omitted = SERVICE_FIELDS | frozenset(prefilled)
+        remaining = time_remaining()
+        if remaining is not None and remaining < MIN_LLM_SECONDS:
+            raise DeadlineExceededError(
+                "Request deadline leaves no time for LLM validation",
+                {"remaining_seconds": round(remaining, 3)}
+            )
+
+        # Prepare conversation history
+        conversation_history = "\n".join([
+            f"Turn {i+1}:\n- Input: {turn.user_input}\n- Type: {turn.input_type}"
+            for i, turn in enumerate(recent_turns[-3:])
+        ])
+
+        response = None
+        try:
+            messages = [
+                SystemMessage(content="You are a helpful input validator."),
+                HumanMessage(content=self.prompt.format(
+                    input=processed_input,
+                    metadata={"detected_type": detected_type},
+                    conversation_history=conversation_history,
+                    format_instructions=self.structured_output.instructions(self.llm, omitted)
+                ))
+            ]
+            
+            llm = self.structured_output.bind(self.llm, omitted)
+            response = await asyncio.wait_for(llm.ainvoke(messages), timeout=remaining)
+            record_token_usage(response)
+            response_text = self.structured_output.text(response)
+            data, missing = self._parse_llm_data(response_text, prefilled, detected_type)
+            if missing:
+                data.update(await self._request_missing_fields(messages, response_text, data, missing))
+            return self._build_result(data)
+        except asyncio.TimeoutError:
+            raise DeadlineExceededError(
+                "LLM validation did not finish before the request deadline",
+                {"timeout_seconds": round(remaining, 3)}
+            )
+        except Exception as e:
+            raise LLMError(
+                "LLM validation failed",
+                {"error": str(e), "input": processed_input, "response": getattr(response, "content", None)}
+            )
+
+    async def _request_missing_fields(
+        self,
+        messages: List,
+        response_text: str,
+        partial: Dict[str, Any],
+        missing: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Ask the LLM for just the fields its response left out (usually because
+        it was cut off), instead of repeating the whole validation. Returns
+        what it answered, or nothing if there is no time left or it fails.
+        """
+        remaining = time_remaining()
+        if remaining is not None and remaining < MIN_LLM_SECONDS:
+            return {}
+        follow_up = messages + [
+            AIMessage(content=response_text),
+            HumanMessage(content=missing_fields_prompt(ValidationResult, partial, missing))
+        ]
+        try:
+            response = await asyncio.wait_for(self.llm.ainvoke(follow_up), timeout=remaining)
+            record_token_usage(response)
+            data, _ = parse_json_object(self.structured_output.text(response))
+        except Exception as e:
+            logging.warning("Follow-up for missing fields %s failed: %s", missing, e)
+            return {}
+        return {name: data[name] for name in missing if name in data}
+
+    def _create_degraded_result(
+        self,
+        detected_type: InputType,
+        local_prediction: Optional[LocalPrediction],
+        error: LLMError,
+        prefilled: Optional[Dict[str, Any]] = None
+    ) -> ValidationResult:
+        """Best local answer when the LLM tier is unavailable; marked degraded so callers can tell"""
+        if local_prediction is not None:
+            result = local_prediction.to_validation_result()
+        else:
+            result = ValidationResult(
+                is_valid=True,
+                input_type=detected_type,
+                has_background=False,
+                has_goals=False,
+                background_completeness=0.0,
+                goals_clarity=0.0,
+                safety_score=1.0
+            )
+        if detected_type != InputType.NEW_QUERY:
+            result.input_type = detected_type
+        # Background and goals the profile extractor was sure about
+        for name, value in (prefilled or {}).items():
+            setattr(result, name, value)
+        result.degraded = True
+        result.validation_details["degraded_reason"] = error.__class__.__name__
+        return result
+
+    def _store_turn(
+        self,
+        memory: ConversationMemory,
+        session_id: Optional[str],
+        processed_input: str,
+        validation_result: ValidationResult
+    ):
+        """Record a validated turn in the session's conversation memory"""
+        try:
+            turn = ConversationTurn(
+                user_input=processed_input,
+                input_type=validation_result.input_type,
+                preferences=validation_result.detected_preferences,
+                background_info=validation_result.background_info,
+                goals=validation_result.goals,
+                context_score=validation_result.context_score
+            )
+            memory.add_turn(turn, validation_result)
+            self.memory_store.save(session_id)
+        except Exception as e:
+            raise ConversationMemoryError(
+                "Failed to store conversation turn",
+                {"error": str(e), "turn": turn.dict()}
+            )
 
     def analyze_preferences(self, text: str, input_type: InputType) -> PreferenceAnalysisResult:
         """Analyze text for preferences"""
         try:
-            # Simple pattern matching for now
-            preference_patterns = {
-                'want': r'(?:i\s+)?want\s+to\s+(.*)',
-                'goal': r'(?:my\s+)?goal\s+is\s+to\s+(.*)',
-                'like': r'(?:i\s+)?(?:would\s+)?like\s+to\s+(.*)',
-                'prefer': r'(?:i\s+)?prefer\s+(.*)',
-                'remove': r'(?:remove|delete|don\'t\s+want)\s+(.*)'
-            }
-            
-            detected_prefs = []
-            operation = PreferenceOperation.UPDATE
-            confidence = 0.0
-            needs_clarification = False
+            # Known terms of every preference category, found in one pass
+            detected_prefs = self.gazetteer.preference_values(text)
+            if input_type == InputType.PREFERENCE_REMOVAL or PREFERENCE_REMOVAL_PATTERN.search(text):
+                operation = PreferenceOperation.REMOVE
+            elif PREFERENCE_REPLACEMENT_PATTERN.search(text):
+                operation = PreferenceOperation.UPDATE
+            else:
+                operation = PreferenceOperation.ADD
+
             questions = []
-            
-            # Check for removal patterns first
-            for pattern in preference_patterns.values():
-                matches = re.finditer(pattern, text, re.IGNORECASE)
-                for match in matches:
-                    pref_text = match.group(1).strip()
-                    if 'remove' in pattern or 'don\'t want' in text.lower():
-                        operation = PreferenceOperation.REMOVE
-                    detected_prefs.append(
-                        PreferenceValue(
-                            value=pref_text,
-                            confidence=0.8,
-                            source="user_input"
-                        )
-                    )
-                    
-            # Set confidence based on clarity
             if detected_prefs:
-                confidence = 0.8
-                # Add clarification questions for vague preferences
-                if any(len(p.value.split()) < 2 for p in detected_prefs):
-                    needs_clarification = True
-                    questions.append("Could you be more specific about your preference?")
-                if operation == PreferenceOperation.REMOVE and not any('remove' in p.value.lower() for p in detected_prefs):
-                    questions.append("Are you sure you want to remove this preference?")
+                confidence = 0.9
+                needs_clarification = False
             else:
-                # No clear preferences found
+                # Nothing we recognise; ask the user
                 confidence = 0.3
                 needs_clarification = True
-                questions.append("Could you rephrase that with 'I want' or 'I prefer'?")
-            
+                questions.append("Which preference would you like to change? For example a technology, role, location or learning style.")
+
             return PreferenceAnalysisResult(
                 detected_operation=operation,
                 detected_preferences=detected_prefs,
@@ -403,7 +646,7 @@ class InputValidator:
             )
             
         except Exception as e:
-            logging.error(f"Error analyzing preferences: {str(e)}")
+            logging.error("Error analyzing preferences: %s", e)
             raise PreferenceError(
                 "Failed to analyze preferences",
                 {"error": str(e), "input": text}
@@ -412,86 +655,32 @@ class InputValidator:
     def _create_error_result(self, error_type: str, message: str, details: Dict[str, Any]) -> ValidationResult:
         """Creates a detailed error result"""
         try:
-            return ValidationResult(
-                is_valid=False,
-                has_background=False,
-                has_goals=False,
-                background_completeness=0.0,
-                goals_clarity=0.0,
-                clarity_score=0.0,
-                safety_score=0.0,
-                context_score=0.0,
-                input_type=InputType.INVALID_INPUT,
+            return ERROR_RESULT.new(
                 error_message=message,
                 validation_details={
                     "error_type": error_type,
                     "details": details,
                     "timestamp": datetime.now().isoformat()
-                },
-                suggestions=[
-                    "Please try again with valid input",
-                    "If the error persists, try rephrasing your request"
-                ],
-                clarification_questions=[
-                    "Could you please provide your input in a different way?"
-                ]
+                }
             )
         except Exception as e:
-            logging.error(f"Error creating error result: {str(e)}")
+            logging.error("Error creating error result: %s", e)
             # Fallback error result with minimal fields
-            return ValidationResult(
-                is_valid=False,
-                has_background=False,
-                has_goals=False,
-                background_completeness=0.0,
-                goals_clarity=0.0,
-                clarity_score=0.0,
-                safety_score=0.0,
-                context_score=0.0,
-                input_type=InputType.INVALID_INPUT,
-                error_message="Internal validation error"
-            )
+            return FALLBACK_ERROR_RESULT.new()
 
     def _create_blocked_result(self, guardrails_result: Dict) -> ValidationResult:
         """Creates a result for blocked content"""
-        return ValidationResult(
-            is_valid=False,
-            has_background=False,
-            has_goals=False,
-            background_completeness=0.0,
-            goals_clarity=0.0,
-            clarity_score=0.0,
-            safety_score=0.0,
-            context_score=0.0,
-            input_type=InputType.INVALID_INPUT,
-            error_message="Content blocked by safety checks",
-            missing_elements=['Blocked by guardrails'],
-            suggestions=[
-                "Please rephrase your query",
-                "Please avoid sensitive or prohibited topics"
-            ],
-            clarification_questions=[
-                "Could you please rephrase your request in a more appropriate way?"
-            ],
-            guardrails_result=guardrails_result
-        )
+        return BLOCKED_RESULT.new(guardrails_result=guardrails_result)
 
     def _create_preference_clarification_result(self, analysis: PreferenceAnalysisResult) -> ValidationResult:
         """Creates result for preference clarification needed"""
-        return ValidationResult(
-            is_valid=False,
-            has_background=False,
-            has_goals=False,
-            background_completeness=0.0,
-            goals_clarity=0.0,
-            clarity_score=0.0,
-            safety_score=1.0,
-            context_score=0.0,
-            input_type=InputType.PREFERENCE_UPDATE,
-            error_message="Preference clarification needed",
-            clarification_questions=analysis.clarification_questions,
-            suggestions=[
-                "Please provide more details about your preferences",
-                "Try to be more specific about what you prefer"
-            ]
-        )
+        return PREFERENCE_CLARIFICATION_RESULT.new(clarification_questions=list(analysis.clarification_questions))
+
+_shared_validator: Optional[InputValidator] = None
+
+def get_shared_validator() -> InputValidator:
+    """Process-wide validator; safe to share because memory is partitioned by session"""
+    global _shared_validator
+    if _shared_validator is None:
+        _shared_validator = InputValidator()
+    return _shared_validator
@@ -0,0 +1,298 @@
+"""Background job subsystem with a bounded asyncio worker pool"""
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+from datetime import datetime, timedelta
+from uuid import uuid4
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from ..models.job import Job, JobStatus
+from .exceptions import OverloadedError
+from .llm_client import track_token_usage
+from .shared_state import get_redis_client
+
+ProgressCallback = Callable[[float, Optional[str]], None]
+JobHandler = Callable[[Dict[str, Any], ProgressCallback], Awaitable[Dict[str, Any]]]
+# Awaited with the LLM tokens a job consumed once it finishes
+FinishCallback = Callable[[int], Awaitable[None]]
+
+class JobManager:
+    """
+    Runs long jobs outside the request path.
+
+    Submitted jobs go into a bounded queue drained by max_workers asyncio
+    workers, so background concurrency is capped independently of interactive
+    traffic. Finished jobs (and their results) are kept for result_ttl seconds;
+    resubmitting identical parameters within that window returns the existing
+    job instead of running it again. LLM tokens used by a job's handler are
+    tracked and handed to the on_finish callback given at submit, so callers
+    can settle what they reserved for it.
+
+    Jobs run on the worker process that accepted them. With a shared Redis
+    client every status change is also mirrored to the store, so status and
+    event requests served by any other worker can follow the job.
+    """
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_queue: int = 100,
+        result_ttl: float = 600.0,
+        job_timeout: float = 300.0,
+        redis=None,
+        poll_interval: float = 1.0
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.result_ttl = result_ttl
+        self.job_timeout = job_timeout
+        self.redis = redis
+        self.poll_interval = poll_interval
+
+        self._handlers: Dict[str, JobHandler] = {}
+        self._jobs: Dict[str, Job] = {}
+        self._job_keys: Dict[str, str] = {}
+        self._params: Dict[str, Dict[str, Any]] = {}
+        self._on_finish: Dict[str, FinishCallback] = {}
+        self._changed: Dict[str, asyncio.Event] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._pending_tasks: Set[asyncio.Task] = set()
+
+    @classmethod
+    def from_env(cls) -> "JobManager":
+        """Build a job manager from JOB_* environment variables"""
+        return cls(
+            max_workers=int(os.getenv("JOB_MAX_WORKERS", "4")),
+            max_queue=int(os.getenv("JOB_MAX_QUEUE", "100")),
+            result_ttl=float(os.getenv("JOB_RESULT_TTL", "600")),
+            job_timeout=float(os.getenv("JOB_TIMEOUT", "300")),
+            redis=get_redis_client()
+        )
+
+    def register(self, kind: str, handler: JobHandler):
+        """Register the coroutine that runs jobs of the given kind"""
+        self._handlers[kind] = handler
+
+    def start(self):
+        """Start the worker pool; called lazily on first submit"""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.max_workers)
+        ]
+
+    async def stop(self):
+        """Cancel the worker pool"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def submit(
+        self,
+        kind: str,
+        params: Dict[str, Any],
+        user_id: Optional[str] = None,
+        on_finish: Optional[FinishCallback] = None
+    ) -> Job:
+        """
+        Queue a job, or return the live/cached job for identical parameters.
+        on_finish is awaited with the tokens the job used, or with 0 right away
+        when an existing job is returned.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        self._purge_expired()
+        self.start()
+
+        key = self._job_key(kind, params, user_id)
+        existing_id = self._job_keys.get(key)
+        if existing_id in self._jobs and self._jobs[existing_id].status != JobStatus.FAILED:
+            if on_finish is not None:
+                self._spawn(on_finish(0))
+            return self._jobs[existing_id]
+
+        if self._queue.full():
+            raise OverloadedError("Job queue is full", retry_after=30)
+
+        job = Job(job_id=str(uuid4()), kind=kind, user_id=user_id)
+        self._jobs[job.job_id] = job
+        self._job_keys[key] = job.job_id
+        self._params[job.job_id] = params
+        if on_finish is not None:
+            self._on_finish[job.job_id] = on_finish
+        self._changed[job.job_id] = asyncio.Event()
+        self._queue.put_nowait(job.job_id)
+        self._mirror(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get the current state of a job, if it exists and has not expired"""
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    async def fetch(self, job_id: str) -> Optional[Job]:
+        """Like get, but also finds jobs running on other workers via the shared store"""
+        job = self.get(job_id)
+        if job is not None or self.redis is None:
+            return job
+        try:
+            stored = await self.redis.get(self._state_key(job_id))
+        except Exception as e:
+            logging.error("Failed to read job %s from shared store: %s", job_id, e)
+            return None
+        return Job.model_validate_json(stored) if stored is not None else None
+
+    async def watch(self, job_id: str, heartbeat: float = 15.0) -> AsyncIterator[Optional[Job]]:
+        """
+        Yield the job on every change until it finishes.
+        Yields None after heartbeat seconds without changes so callers can keep connections alive.
+        """
+        if job_id not in self._jobs:
+            async for job in self._watch_shared(job_id, heartbeat):
+                yield job
+            return
+
+        while True:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            changed = self._changed[job_id]
+            yield job.model_copy()
+            if job.is_finished:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+
+    async def _watch_shared(self, job_id: str, heartbeat: float) -> AsyncIterator[Optional[Job]]:
+        # Owned by another worker: poll the mirrored state instead of waiting on an event
+        last_update = None
+        quiet_since = asyncio.get_running_loop().time()
+        while True:
+            job = await self.fetch(job_id)
+            if job is None:
+                return
+            now = asyncio.get_running_loop().time()
+            if job.updated_at != last_update:
+                last_update = job.updated_at
+                quiet_since = now
+                yield job
+                if job.is_finished:
+                    return
+            elif now - quiet_since >= heartbeat:
+                quiet_since = now
+                yield None
+            await asyncio.sleep(self.poll_interval)
+
+    def metrics(self) -> Dict[str, int]:
+        """Current job subsystem state for the metrics endpoint"""
+        statuses = [job.status for job in self._jobs.values()]
+        return {
+            "workers": len(self._workers),
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "running": statuses.count(JobStatus.RUNNING),
+            "cached_results": statuses.count(JobStatus.SUCCEEDED)
+        }
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        handler = self._handlers[job.kind]
+        params = self._params.pop(job_id, {})
+
+        def report(progress: float, message: Optional[str] = None):
+            self._update(job_id, progress=min(max(progress, 0.0), 1.0), message=message)
+
+        self._update(job_id, status=JobStatus.RUNNING, message="Started")
+        with track_token_usage() as usage:
+            try:
+                result = await asyncio.wait_for(handler(params, report), timeout=self.job_timeout)
+                self._update(
+                    job_id, status=JobStatus.SUCCEEDED, progress=1.0, message="Completed",
+                    result=result, finished_at=datetime.now()
+                )
+            except asyncio.CancelledError:
+                self._update(job_id, status=JobStatus.FAILED, error="Job cancelled", finished_at=datetime.now())
+                raise
+            except asyncio.TimeoutError:
+                self._update(job_id, status=JobStatus.FAILED, error="Job timed out", finished_at=datetime.now())
+            except Exception as e:
+                logging.error("Job %s (%s) failed: %s", job_id, job.kind, e)
+                self._update(job_id, status=JobStatus.FAILED, error=str(e), finished_at=datetime.now())
+            finally:
+                on_finish = self._on_finish.pop(job_id, None)
+                if on_finish is not None:
+                    self._spawn(on_finish(usage.total_tokens))
+
+    def _update(self, job_id: str, **changes):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        for field, value in changes.items():
+            setattr(job, field, value)
+        job.updated_at = datetime.now()
+        # Wake watchers and arm a fresh event for the next change
+        self._changed[job_id].set()
+        self._changed[job_id] = asyncio.Event()
+        self._mirror(job)
+
+    def _mirror(self, job: Job):
+        if self.redis is None:
+            return
+        # Fire and forget: progress reporting must not wait on the store
+        ttl = int(self.job_timeout + self.result_ttl)
+        self._spawn(self._write_state(job.job_id, job.model_dump_json(), ttl))
+
+    def _spawn(self, coro: Awaitable):
+        task = asyncio.ensure_future(self._guarded(coro))
+        self._pending_tasks.add(task)
+        task.add_done_callback(self._pending_tasks.discard)
+
+    @staticmethod
+    async def _guarded(coro: Awaitable):
+        try:
+            await coro
+        except Exception as e:
+            logging.error("Job bookkeeping task failed: %s", e)
+
+    async def _write_state(self, job_id: str, state: str, ttl: int):
+        try:
+            await self.redis.set(self._state_key(job_id), state, ex=ttl)
+        except Exception as e:
+            logging.error("Failed to mirror job %s to shared store: %s", job_id, e)
+
+    def _purge_expired(self):
+        cutoff = datetime.now() - timedelta(seconds=self.result_ttl)
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+            self._changed.pop(job_id, None)
+        if expired:
+            self._job_keys = {key: job_id for key, job_id in self._job_keys.items() if job_id in self._jobs}
+
+    @staticmethod
+    def _state_key(job_id: str) -> str:
+        return f"job:{job_id}"
+
+    @staticmethod
+    def _job_key(kind: str, params: Dict[str, Any], user_id: Optional[str]) -> str:
+        payload = json.dumps([kind, user_id, params], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
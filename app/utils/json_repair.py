@@ -0,0 +1,204 @@
+"""Tolerant parsing of JSON objects in LLM output"""
+from typing import Any, Dict, List, Optional, Tuple, Type
+import json
+from pydantic import BaseModel
+from .exceptions import ParsingError
+from .structured_output import compact_instructions
+
+_CLOSERS = {"{": "}", "[": "]"}
+# Python literals models sometimes write instead of JSON ones
+_LITERALS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null"}
+
+def _literal(token: str) -> Optional[str]:
+    """token as a JSON literal or number, or None if it is not one"""
+    if token in _LITERALS:
+        return _LITERALS[token]
+    try:
+        json.loads(token)
+        return token
+    except ValueError:
+        return None
+
+def _is_high_surrogate(digits: str) -> bool:
+    """Whether the hex digits of a \\u escape are the first half of a surrogate pair"""
+    try:
+        return 0xD800 <= int(digits, 16) <= 0xDBFF
+    except ValueError:
+        return False
+
+def repair_json(text: str) -> Tuple[str, bool]:
+    """
+    The first JSON object in text, repaired so it parses, and whether it
+    needed repair. Surrounding prose and markdown fences are ignored, trailing
+    commas dropped and Python literals converted; an object cut off mid-way
+    (a truncated response) is closed after its last complete value, closing
+    an unterminated string value first (minus any escape cut off inside it).
+    """
+    start = text.find("{")
+    if start < 0:
+        raise ParsingError("No JSON object in response", {"response": text[:200]})
+
+    out: List[str] = []
+    stack: List[str] = []            # open containers
+    expecting: List[str] = []        # per container: "key", "colon", "value" or "comma"
+    safe = (0, 0)                    # (len(out), len(stack)) where the object can be cut and closed
+    string_start = None              # index in out of the open string's quote
+    string_is_key = False
+    escape = False
+    hex_left = 0                     # hex digits still to read of a \u escape
+    partial_escape = None            # index in out of an unfinished \u escape or unpaired high surrogate
+    token_start = None               # index in out of a number or literal being read
+    repaired = False
+
+    def value_done():
+        nonlocal safe
+        expecting[-1] = "comma"
+        safe = (len(out), len(stack))
+
+    def end_token() -> bool:
+        nonlocal token_start, repaired
+        token = "".join(out[token_start:])
+        literal = _literal(token)
+        if literal is None:
+            return False
+        if literal != token:
+            del out[token_start:]
+            out.extend(literal)
+            repaired = True
+        token_start = None
+        value_done()
+        return True
+
+    index = start
+    while index < len(text):
+        char = text[index]
+        index += 1
+        if string_start is not None:
+            out.append(char)
+            if hex_left:
+                hex_left -= 1
+                if not hex_left and not _is_high_surrogate("".join(out[-4:])):
+                    partial_escape = None
+            elif escape:
+                escape = False
+                if char == "u":
+                    hex_left = 4
+                    if partial_escape is None:
+                        partial_escape = len(out) - 2
+                else:
+                    partial_escape = None
+            elif char == "\\":
+                escape = True
+            else:
+                partial_escape = None
+                if char == '"':
+                    string_start = None
+                    if string_is_key:
+                        expecting[-1] = "colon"
+                    else:
+                        value_done()
+            continue
+
+        if token_start is not None:
+            if char.isalnum() or char in "+-.":
+                out.append(char)
+                continue
+            if not end_token():
+                break
+
+        if char in " \t\r\n":
+            out.append(char)
+        elif char in "{[":
+            out.append(char)
+            stack.append(char)
+            expecting.append("key" if char == "{" else "value")
+            safe = (len(out), len(stack))
+        elif char in "}]":
+            if not stack or _CLOSERS[stack[-1]] != char:
+                break
+            # Drop a trailing comma before the closer
+            position = len(out) - 1
+            while position >= 0 and out[position] in " \t\r\n":
+                position -= 1
+            if position >= 0 and out[position] == ",":
+                del out[position]
+                repaired = True
+            out.append(char)
+            stack.pop()
+            expecting.pop()
+            if not stack:
+                return "".join(out), repaired
+            value_done()
+        elif char == ",":
+            if not stack:
+                break
+            out.append(char)
+            expecting[-1] = "key" if stack[-1] == "{" else "value"
+        elif char == ":":
+            out.append(char)
+            expecting[-1] = "value"
+        elif char == '"':
+            string_start = len(out)
+            string_is_key = stack[-1] == "{" and expecting[-1] == "key"
+            out.append(char)
+        else:
+            token_start = len(out)
+            out.append(char)
+
+    # Truncated: finish what can be finished, then close at the last complete value
+    repaired = True
+    if string_start is not None and not string_is_key:
+        if partial_escape is not None:
+            del out[partial_escape:]
+        elif escape:
+            out.pop()
+        out.append('"')
+        value_done()
+    elif token_start is not None and "".join(out[token_start:]) in _LITERALS:
+        # A cut-off number may be missing digits, so only whole literals are kept
+        end_token()
+    length, depth = safe
+    closed = "".join(out[:length]).rstrip()
+    if closed.endswith(","):
+        closed = closed[:-1]
+    return closed + "".join(_CLOSERS[opener] for opener in reversed(stack[:depth])), repaired
+
+def parse_json_object(text: str) -> Tuple[Dict[str, Any], bool]:
+    """Parse the first JSON object in text, repairing it if needed; returns (data, repaired)"""
+    candidate, repaired = repair_json(text)
+    try:
+        data = json.loads(candidate)
+    except ValueError as e:
+        raise ParsingError("Failed to parse JSON in response", {"error": str(e), "response": text[:200]})
+    if not isinstance(data, dict):
+        raise ParsingError("Response JSON is not an object", {"response": text[:200]})
+    return data, repaired
+
+def fill_defaults(data: Dict[str, Any], model: Type[BaseModel]) -> List[str]:
+    """
+    Set missing fields of model that have defaults, recursing into nested
+    models, and return the required fields still missing (a nested model
+    with missing required fields counts as missing as a whole)
+    """
+    missing = []
+    for name, field in model.model_fields.items():
+        if name not in data:
+            if field.is_required():
+                missing.append(name)
+            else:
+                data[name] = field.get_default(call_default_factory=True)
+            continue
+        annotation = field.annotation
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel) and isinstance(data[name], dict):
+            if fill_defaults(data[name], annotation):
+                missing.append(name)
+    return missing
+
+def missing_fields_prompt(model: Type[BaseModel], partial: Dict[str, Any], missing: List[str]) -> str:
+    """Follow-up request for just the missing fields of an incomplete response"""
+    others = frozenset(model.model_fields) - frozenset(missing)
+    return (
+        "Your previous answer was incomplete. These fields were received:\n"
+        f"{json.dumps(partial, ensure_ascii=False, default=str)}\n\n"
+        f"Now give only the missing fields {', '.join(missing)}. {compact_instructions(model, others)}"
+    )
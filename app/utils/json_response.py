@@ -0,0 +1,13 @@
+"""JSON responses that serialize pydantic models without converting them to dicts first"""
+from typing import Any
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+class ModelJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered by pydantic-core. Content may hold models, enums and
+    datetimes anywhere; they are written straight to JSON in one pass instead
+    of being dumped to dicts and encoded again with the json module.
+    """
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
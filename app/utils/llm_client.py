@@ -1,13 +1,47 @@
 import os
 import json
 import logging
-from typing import Dict, Any
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
 from langchain_groq import ChatGroq
 from langchain.schema import HumanMessage
 from dotenv import load_dotenv
 
 load_dotenv()
 
+@dataclass
+class TokenUsage:
+    """LLM tokens consumed while handling one request"""
+    total_tokens: int = 0
+    calls: int = 0
+
+_token_usage: ContextVar[Optional[TokenUsage]] = ContextVar("token_usage", default=None)
+
+@contextmanager
+def track_token_usage():
+    """Collect token usage of every LLM call made inside the block, including in child tasks"""
+    usage = TokenUsage()
+    reset_token = _token_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _token_usage.reset(reset_token)
+
+def record_token_usage(response) -> int:
+    """Add the tokens reported on an LLM response to the current tracker, if any"""
+    usage_metadata = getattr(response, "usage_metadata", None) or {}
+    tokens = usage_metadata.get("total_tokens")
+    if tokens is None:
+        token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage", {})
+        tokens = token_usage.get("total_tokens", 0)
+    usage = _token_usage.get()
+    if usage is not None:
+        usage.total_tokens += tokens
+        usage.calls += 1
+    return tokens
+
 def get_llm_client():
     """Get an instance of the LLM client"""
     api_key = os.getenv("GROQ_API_KEY")
@@ -25,7 +59,8 @@ async def run_llm_call(prompt: str) -> str:
     try:
         llm = get_llm_client()
         response = await llm.ainvoke([HumanMessage(content=prompt)])
+        record_token_usage(response)
         return response.content
     except Exception as e:
-        logging.error(f"Error during LLM call: {str(e)}")
+        logging.error("Error during LLM call: %s", e)
         return ""
@@ -0,0 +1,405 @@
+"""
+Local CPU classifier for input_type, has_background and has_goals.
+
+Hashed word and character n-gram features feed three logistic-regression
+heads (softmax over input types, sigmoid for the two flags), trained with
+NumPy from logged LLM validation results. Confidences are calibrated with
+per-head temperature scaling on a held-out split, so the validator can skip
+the LLM when the prediction is confident and fall back to it otherwise.
+
+Train and evaluate from a JSONL log of validation samples:
+
+    python -m app.utils.local_classifier train samples.jsonl models/input_classifier.npz
+    python -m app.utils.local_classifier evaluate samples.jsonl models/input_classifier.npz
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import zlib
+import numpy as np
+from ..models.validation_result import InputType, ValidationResult
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+_TEMPERATURES = np.geomspace(0.25, 8.0, 41)
+FIELDS = ("input_type", "has_background", "has_goals")
+
+sample_logger = logging.getLogger("validation_samples")
+
+def log_validation_sample(text: str, result: ValidationResult):
+    """Log an LLM-labelled input as training data when LOG_VALIDATION_SAMPLES is set"""
+    if os.getenv("LOG_VALIDATION_SAMPLES", "").lower() not in ("1", "true", "yes"):
+        return
+    sample_logger.info(
+        "validation_sample",
+        extra={"input": text, "validation_result": result.model_dump(mode="json", include={"is_valid", *FIELDS})}
+    )
+
+def load_samples(path: str) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """Read (input, validation_result) pairs from JSONL, skipping lines without both"""
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(entry, dict) and "input" in entry and "validation_result" in entry:
+                texts.append(entry["input"])
+                labels.append(entry["validation_result"])
+    return texts, labels
+
+def featurize(text: str, n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Hashed, L2-normalized counts of words, word bigrams and character 3/4-grams"""
+    text = " ".join(text.lower().split())
+    words = _WORD_RE.findall(text)
+    tokens = [f"w:{word}" for word in words]
+    tokens += [f"b:{first} {second}" for first, second in zip(words, words[1:])]
+    padded = f" {text} "
+    for n in (3, 4):
+        tokens += [f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1)]
+    if not tokens:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    hashed = np.fromiter((zlib.crc32(token.encode("utf-8")) % n_features for token in tokens), dtype=np.int64)
+    indices, counts = np.unique(hashed, return_counts=True)
+    values = counts.astype(np.float32)
+    return indices, values / np.linalg.norm(values)
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+def _sigmoid(logits: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-logits))
+
+@dataclass
+class LocalPrediction:
+    """Predicted fields with per-field calibrated confidence"""
+    input_type: InputType
+    has_background: bool
+    has_goals: bool
+    background_probability: float
+    goals_probability: float
+    confidences: Dict[str, float]
+    confident: bool
+
+    @property
+    def confidence(self) -> float:
+        return min(self.confidences.values())
+
+    def to_validation_result(self) -> ValidationResult:
+        """ValidationResult for inputs answered locally; safety was already checked upstream"""
+        return ValidationResult(
+            is_valid=self.input_type != InputType.INVALID_INPUT,
+            input_type=self.input_type,
+            has_background=self.has_background,
+            has_goals=self.has_goals,
+            background_completeness=self.background_probability,
+            goals_clarity=self.goals_probability,
+            clarity_score=self.confidence,
+            safety_score=1.0,
+            validation_details={"source": "local_classifier", "confidences": self.confidences}
+        )
+
+    def agrees_with(self, result: ValidationResult) -> bool:
+        return all(getattr(self, name) == getattr(result, name) for name in FIELDS)
+
+@dataclass
+class _AgreementStats:
+    compared: int = 0
+    agreed: int = 0
+
+    def rate(self) -> Optional[float]:
+        return self.agreed / self.compared if self.compared else None
+
+@dataclass
+class LocalClassifierStats:
+    """Skip rate and agreement with the LLM, split by whether the prediction was confident"""
+    predictions: int = 0
+    skipped_llm: int = 0
+    confident: _AgreementStats = field(default_factory=_AgreementStats)
+    uncertain: _AgreementStats = field(default_factory=_AgreementStats)
+
+class LocalInputClassifier:
+    """
+    Hashed n-gram logistic regression over input_type, has_background and has_goals.
+
+    Predictions with every field's calibrated confidence at or above threshold
+    are answered locally; a shadow_rate fraction of those still goes to the LLM
+    so agreement on skipped inputs keeps being measured.
+    """
+    def __init__(
+        self,
+        classes: Sequence[str],
+        type_weights: np.ndarray,
+        type_bias: np.ndarray,
+        flag_weights: np.ndarray,
+        flag_bias: np.ndarray,
+        temperatures: np.ndarray,
+        threshold: float = 0.9,
+        shadow_rate: float = 0.05
+    ):
+        self.classes = [InputType(name) for name in classes]
+        self.type_weights = type_weights
+        self.type_bias = type_bias
+        self.flag_weights = flag_weights
+        self.flag_bias = flag_bias
+        self.temperatures = temperatures
+        self.threshold = threshold
+        self.shadow_rate = shadow_rate
+        self.n_features = type_weights.shape[0]
+        self.stats = LocalClassifierStats()
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "LocalInputClassifier":
+        with np.load(path, allow_pickle=False) as model:
+            return cls(
+                classes=[str(name) for name in model["classes"]],
+                type_weights=model["type_weights"],
+                type_bias=model["type_bias"],
+                flag_weights=model["flag_weights"],
+                flag_bias=model["flag_bias"],
+                temperatures=model["temperatures"],
+                **kwargs
+            )
+
+    @classmethod
+    def from_env(cls) -> Optional["LocalInputClassifier"]:
+        """Load the model at LOCAL_CLASSIFIER_PATH, or None when there is no trained model"""
+        path = os.getenv("LOCAL_CLASSIFIER_PATH", "models/input_classifier.npz")
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls.load(
+                path,
+                threshold=float(os.getenv("LOCAL_CLASSIFIER_THRESHOLD", "0.9")),
+                shadow_rate=float(os.getenv("LOCAL_CLASSIFIER_SHADOW_RATE", "0.05"))
+            )
+        except Exception as e:
+            logging.error("Failed to load local classifier from %s: %s", path, e)
+            return None
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                classes=np.array([input_type.value for input_type in self.classes]),
+                type_weights=self.type_weights,
+                type_bias=self.type_bias,
+                flag_weights=self.flag_weights,
+                flag_bias=self.flag_bias,
+                temperatures=self.temperatures
+            )
+
+    @classmethod
+    def train(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[Dict[str, Any]],
+        n_features: int = 2 ** 16,
+        epochs: int = 300,
+        learning_rate: float = 0.05,
+        l2: float = 1e-4,
+        holdout: float = 0.2,
+        seed: int = 0,
+        **kwargs
+    ) -> "LocalInputClassifier":
+        """Fit all heads with full-batch Adam, then calibrate temperatures on a held-out split"""
+        classes = sorted({label["input_type"] for label in labels})
+        class_index = {name: i for i, name in enumerate(classes)}
+        y_type = np.array([class_index[label["input_type"]] for label in labels])
+        y_flags = np.array([[label["has_background"], label["has_goals"]] for label in labels], dtype=np.float32)
+
+        order = np.random.default_rng(seed).permutation(len(texts))
+        n_holdout = int(len(texts) * holdout) if len(texts) >= 50 else 0
+        train_idx, holdout_idx = order[n_holdout:], order[:n_holdout]
+        features = [featurize(text, n_features) for text in texts]
+
+        rows, cols, vals = _stack([features[i] for i in train_idx])
+        n = len(train_idx)
+        type_targets = np.eye(len(classes), dtype=np.float32)[y_type[train_idx]]
+        flag_targets = y_flags[train_idx]
+
+        params = [
+            np.zeros((n_features, len(classes)), dtype=np.float32),
+            np.zeros(len(classes), dtype=np.float32),
+            np.zeros((n_features, 2), dtype=np.float32),
+            np.zeros(2, dtype=np.float32)
+        ]
+        optimizer = _Adam(params, learning_rate)
+        for _ in range(epochs):
+            type_weights, type_bias, flag_weights, flag_bias = params
+            type_error = (_softmax(_sparse_dot(rows, cols, vals, n, type_weights) + type_bias) - type_targets) / n
+            flag_error = (_sigmoid(_sparse_dot(rows, cols, vals, n, flag_weights) + flag_bias) - flag_targets) / n
+            optimizer.step([
+                _sparse_grad(rows, cols, vals, type_error, n_features) + l2 * type_weights,
+                type_error.sum(axis=0),
+                _sparse_grad(rows, cols, vals, flag_error, n_features) + l2 * flag_weights,
+                flag_error.sum(axis=0)
+            ])
+
+        classifier = cls(classes, *params, temperatures=np.ones(3, dtype=np.float32), **kwargs)
+        calibration_idx = holdout_idx if n_holdout else train_idx
+        classifier.temperatures = classifier._fit_temperatures(
+            [features[i] for i in calibration_idx], y_type[calibration_idx], y_flags[calibration_idx]
+        )
+        return classifier
+
+    def _logits(self, features: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+        rows, cols, vals = _stack(features)
+        n = len(features)
+        type_logits = _sparse_dot(rows, cols, vals, n, self.type_weights) + self.type_bias
+        flag_logits = _sparse_dot(rows, cols, vals, n, self.flag_weights) + self.flag_bias
+        return type_logits, flag_logits
+
+    def _fit_temperatures(self, features, y_type: np.ndarray, y_flags: np.ndarray) -> np.ndarray:
+        type_logits, flag_logits = self._logits(features)
+        eps = 1e-7
+
+        def type_nll(t):
+            return -np.log(_softmax(type_logits / t)[np.arange(len(y_type)), y_type] + eps).mean()
+
+        def flag_nll(t, column):
+            p = _sigmoid(flag_logits[:, column] / t)
+            y = y_flags[:, column]
+            return -(y * np.log(p + eps) + (1 - y) * np.log(1 - p + eps)).mean()
+
+        return np.array([
+            min(_TEMPERATURES, key=type_nll),
+            min(_TEMPERATURES, key=lambda t: flag_nll(t, 0)),
+            min(_TEMPERATURES, key=lambda t: flag_nll(t, 1))
+        ], dtype=np.float32)
+
+    def predict(self, text: str) -> LocalPrediction:
+        """Predict fields for one input and count it towards the skip rate"""
+        prediction = self.predict_many([text])[0]
+        self.stats.predictions += 1
+        return prediction
+
+    def predict_many(self, texts: Sequence[str]) -> List[LocalPrediction]:
+        type_logits, flag_logits = self._logits([featurize(text, self.n_features) for text in texts])
+        type_probs = _softmax(type_logits / self.temperatures[0])
+        flag_probs = _sigmoid(flag_logits / self.temperatures[1:])
+
+        predictions = []
+        for type_row, (background, goals) in zip(type_probs, flag_probs):
+            best = int(type_row.argmax())
+            confidences = {
+                "input_type": float(type_row[best]),
+                "has_background": float(max(background, 1 - background)),
+                "has_goals": float(max(goals, 1 - goals))
+            }
+            predictions.append(LocalPrediction(
+                input_type=self.classes[best],
+                has_background=bool(background >= 0.5),
+                has_goals=bool(goals >= 0.5),
+                background_probability=float(background),
+                goals_probability=float(goals),
+                confidences=confidences,
+                confident=min(confidences.values()) >= self.threshold
+            ))
+        return predictions
+
+    def should_skip_llm(self, prediction: LocalPrediction) -> bool:
+        """Answer locally unless uncertain or picked for a shadow comparison"""
+        if not prediction.confident or random.random() < self.shadow_rate:
+            return False
+        self.stats.skipped_llm += 1
+        return True
+
+    def record_llm_result(self, prediction: LocalPrediction, result: ValidationResult):
+        """Compare a local prediction with the LLM's answer for the same input"""
+        stats = self.stats.confident if prediction.confident else self.stats.uncertain
+        stats.compared += 1
+        stats.agreed += prediction.agrees_with(result)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Skip rate and LLM agreement for the metrics endpoint"""
+        return {
+            "predictions": self.stats.predictions,
+            "skipped_llm": self.stats.skipped_llm,
+            "skip_rate": self.stats.skipped_llm / self.stats.predictions if self.stats.predictions else None,
+            "confident_agreement": self.stats.confident.rate(),
+            "uncertain_agreement": self.stats.uncertain.rate(),
+            "threshold": self.threshold
+        }
+
+class _Adam:
+    def __init__(self, params: List[np.ndarray], learning_rate: float, beta1: float = 0.9, beta2: float = 0.999):
+        self.params = params
+        self.learning_rate = learning_rate
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.m = [np.zeros_like(p) for p in params]
+        self.v = [np.zeros_like(p) for p in params]
+        self.t = 0
+
+    def step(self, grads: List[np.ndarray]):
+        self.t += 1
+        correction = np.sqrt(1 - self.beta2 ** self.t) / (1 - self.beta1 ** self.t)
+        for param, grad, m, v in zip(self.params, grads, self.m, self.v):
+            m *= self.beta1
+            m += (1 - self.beta1) * grad
+            v *= self.beta2
+            v += (1 - self.beta2) * grad * grad
+            param -= self.learning_rate * correction * m / (np.sqrt(v) + 1e-8)
+
+def _stack(features: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rows = np.concatenate([np.full(len(indices), i) for i, (indices, _) in enumerate(features)] or [np.zeros(0, np.int64)])
+    cols = np.concatenate([indices for indices, _ in features] or [np.zeros(0, np.int64)])
+    vals = np.concatenate([values for _, values in features] or [np.zeros(0, np.float32)])
+    return rows.astype(np.int64), cols, vals
+
+def _sparse_dot(rows: np.ndarray, cols: np.ndarray, vals: np.ndarray, n: int, weights: np.ndarray) -> np.ndarray:
+    out = np.zeros((n, weights.shape[1]), dtype=np.float32)
+    np.add.at(out, rows, weights[cols] * vals[:, None])
+    return out
+
+def _sparse_grad(rows: np.ndarray, cols: np.ndarray, vals: np.ndarray, error: np.ndarray, n_features: int) -> np.ndarray:
+    grad = np.zeros((n_features, error.shape[1]), dtype=np.float32)
+    np.add.at(grad, cols, error[rows] * vals[:, None])
+    return grad
+
+def evaluate(classifier: LocalInputClassifier, texts: Sequence[str], labels: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Offline skip rate and agreement with logged LLM labels"""
+    predictions = classifier.predict_many(texts)
+    confident = [(p, label) for p, label in zip(predictions, labels) if p.confident]
+
+    def agreement(pairs):
+        agreed = sum(all(
+            (getattr(p, name).value if name == "input_type" else getattr(p, name)) == label[name]
+            for name in FIELDS
+        ) for p, label in pairs)
+        return agreed / len(pairs) if pairs else None
+
+    return {
+        "samples": len(texts),
+        "skip_rate": len(confident) / len(texts) if texts else None,
+        "agreement_when_skipped": agreement(confident),
+        "agreement_overall": agreement(list(zip(predictions, labels)))
+    }
+
+# Initialize the shared classifier (None until a model has been trained)
+local_classifier = LocalInputClassifier.from_env()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train or evaluate the local input classifier")
+    parser.add_argument("command", choices=["train", "evaluate"])
+    parser.add_argument("samples", help="JSONL with input and validation_result fields")
+    parser.add_argument("model", help="Path of the .npz model")
+    parser.add_argument("--threshold", type=float, default=0.9)
+    args = parser.parse_args()
+
+    texts, labels = load_samples(args.samples)
+    if args.command == "train":
+        model = LocalInputClassifier.train(texts, labels, threshold=args.threshold)
+        model.save(args.model)
+        print(f"Trained on {len(texts)} samples, temperatures {model.temperatures.round(2).tolist()}")
+    else:
+        model = LocalInputClassifier.load(args.model, threshold=args.threshold)
+        print(json.dumps(evaluate(model, texts, labels), indent=2))
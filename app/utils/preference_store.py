@@ -0,0 +1,242 @@
+"""Per-user preference storage with atomic, versioned updates"""
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+import os
+from ..models.preference import (
+    PreferenceCategory, PreferenceChange, PreferenceOperation,
+    PreferenceUpdate, PreferenceValue, UserPreferences
+)
+from .exceptions import PreferenceError
+from .shared_state import get_redis_client
+
+def _expand(preferences: List[PreferenceValue]) -> List[PreferenceValue]:
+    """One PreferenceValue per value, so list values are stored and matched individually"""
+    expanded = []
+    for preference in preferences:
+        values = preference.value if isinstance(preference.value, list) else [preference.value]
+        for value in values:
+            value = value.strip()
+            if value:
+                expanded.append(preference.model_copy(update={"value": value}))
+    return expanded
+
+def _key(preference: PreferenceValue) -> str:
+    return preference.value.casefold()
+
+class PreferenceStore:
+    """
+    Preferences indexed by (user, category).
+
+    Each update is computed against a copy of the user's preferences and only
+    swapped in when it succeeds as a whole, so an update that would leave a
+    category over max_per_category changes nothing. Every change bumps the
+    user's version, and the changed categories record that version, so callers
+    can detect changes by comparing integers. QUERY is answered from the store
+    without calling the LLM.
+
+    Without Redis preferences live in process (LRU, at most max_users users);
+    with Redis they are stored per user and updated with WATCH/MULTI so
+    concurrent updates from several workers are never lost.
+    """
+    def __init__(
+        self,
+        max_per_category: int = 5,
+        max_users: int = 10000,
+        redis=None,
+        max_retries: int = 5
+    ):
+        self.max_per_category = max_per_category
+        self.max_users = max_users
+        self.redis = redis
+        self.max_retries = max_retries
+        self._users: "OrderedDict[str, UserPreferences]" = OrderedDict()
+        self.updates = 0
+        self.queries = 0
+        self.rejected = 0
+        self.conflicts = 0
+
+    @classmethod
+    def from_env(cls, max_per_category: int = 5) -> "PreferenceStore":
+        """Build a store from PREFERENCE_STORE_* environment variables"""
+        return cls(
+            max_per_category=max_per_category,
+            max_users=int(os.getenv("PREFERENCE_STORE_MAX_USERS", "10000")),
+            redis=get_redis_client()
+        )
+
+    async def get(self, user_id: str) -> UserPreferences:
+        """Current preferences of a user (empty, version 0, if none are stored)"""
+        if self.redis is not None:
+            stored = await self.redis.get(self._key(user_id))
+            return self._parse(user_id, stored)
+        preferences = self._users.get(user_id)
+        if preferences is None:
+            return UserPreferences(user_id=user_id)
+        self._users.move_to_end(user_id)
+        return preferences
+
+    async def version(self, user_id: str) -> int:
+        """Version of a user's preferences; changes whenever any of them change"""
+        return (await self.get(user_id)).version
+
+    async def apply(self, user_id: str, update: PreferenceUpdate) -> PreferenceChange:
+        """Apply an ADD/REMOVE/UPDATE/QUERY operation; all of it or none of it"""
+        if update.operation == PreferenceOperation.QUERY:
+            self.queries += 1
+            current = await self.get(user_id)
+            return PreferenceChange(
+                operation=update.operation,
+                changed=False,
+                version=current.version,
+                preferences=self._select(current, update.preferences)
+            )
+
+        if self.redis is not None:
+            updated, changed = await self._apply_shared(user_id, update)
+        else:
+            updated, changed = self._compute(await self.get(user_id), update)
+            if changed:
+                self._users[user_id] = updated
+                self._users.move_to_end(user_id)
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+
+        self.updates += 1
+        return PreferenceChange(
+            operation=update.operation,
+            changed=changed,
+            version=updated.version,
+            preferences=self._select(updated, update.preferences)
+        )
+
+    async def _apply_shared(self, user_id: str, update: PreferenceUpdate):
+        from redis.exceptions import WatchError
+
+        key = self._key(user_id)
+        for _ in range(self.max_retries):
+            async with self.redis.pipeline(transaction=True) as pipe:
+                try:
+                    await pipe.watch(key)
+                    current = self._parse(user_id, await pipe.get(key))
+                    updated, changed = self._compute(current, update)
+                    if not changed:
+                        await pipe.unwatch()
+                        return updated, False
+                    pipe.multi()
+                    pipe.set(key, updated.model_dump_json())
+                    await pipe.execute()
+                    return updated, True
+                except WatchError:
+                    # Another worker changed this user's preferences first; recompute
+                    self.conflicts += 1
+        raise PreferenceError(
+            "Preferences are being changed concurrently, try again",
+            {"user_id": user_id, "retries": self.max_retries}
+        )
+
+    def _compute(self, current: UserPreferences, update: PreferenceUpdate):
+        """The preferences after update, and whether anything changed; current is not modified"""
+        categories = {category: list(values) for category, values in current.categories.items()}
+        incoming: Dict[PreferenceCategory, List[PreferenceValue]] = {}
+        for preference in _expand(update.preferences):
+            incoming.setdefault(preference.category, []).append(preference)
+
+        changed_categories = []
+        for category, values in incoming.items():
+            existing = categories.get(category, [])
+            if update.operation == PreferenceOperation.ADD:
+                result = self._merge(existing, values)
+            elif update.operation == PreferenceOperation.UPDATE:
+                result = self._merge([], values)
+            else:
+                removed = {_key(value) for value in values}
+                result = [value for value in existing if _key(value) not in removed]
+
+            if result != existing:
+                changed_categories.append(category)
+                if result:
+                    categories[category] = result
+                else:
+                    categories.pop(category, None)
+
+        over_limit = {
+            category.value: len(categories[category])
+            for category in changed_categories
+            if len(categories.get(category, [])) > self.max_per_category
+        }
+        if over_limit:
+            self.rejected += 1
+            raise PreferenceError(
+                f"At most {self.max_per_category} preferences are allowed per category",
+                {"user_id": current.user_id, "categories": over_limit}
+            )
+        if not changed_categories:
+            return current, False
+
+        version = current.version + 1
+        category_versions = {
+            category: category_version
+            for category, category_version in current.category_versions.items()
+            if category in categories
+        }
+        category_versions.update({category: version for category in changed_categories})
+        return UserPreferences(
+            user_id=current.user_id,
+            version=version,
+            categories=categories,
+            category_versions=category_versions,
+            updated_at=datetime.now()
+        ), True
+
+    @staticmethod
+    def _merge(existing: List[PreferenceValue], values: List[PreferenceValue]) -> List[PreferenceValue]:
+        """existing plus values, a repeated value (case-insensitive) replacing the earlier one in place"""
+        merged = list(existing)
+        positions = {_key(value): index for index, value in enumerate(merged)}
+        for value in values:
+            index = positions.get(_key(value))
+            if index is None:
+                positions[_key(value)] = len(merged)
+                merged.append(value)
+            else:
+                merged[index] = value
+        return merged
+
+    @staticmethod
+    def _select(
+        preferences: UserPreferences,
+        requested: List[PreferenceValue]
+    ) -> Dict[PreferenceCategory, List[PreferenceValue]]:
+        """The requested categories of preferences, or all of them if none were named"""
+        if not requested:
+            return dict(preferences.categories)
+        return {
+            preference.category: preferences.categories.get(preference.category, [])
+            for preference in requested
+        }
+
+    @staticmethod
+    def _parse(user_id: str, stored: Optional[str]) -> UserPreferences:
+        if stored is None:
+            return UserPreferences(user_id=user_id)
+        try:
+            return UserPreferences.model_validate_json(stored)
+        except Exception as e:
+            logging.error("Discarding unreadable preferences for %s: %s", user_id, e)
+            return UserPreferences(user_id=user_id)
+
+    def metrics(self) -> Dict[str, int]:
+        """Store activity for the metrics endpoint"""
+        return {
+            "users": len(self._users),
+            "updates": self.updates,
+            "queries": self.queries,
+            "rejected": self.rejected,
+            "conflicts": self.conflicts
+        }
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"preferences:{user_id}"
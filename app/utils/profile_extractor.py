@@ -0,0 +1,203 @@
+"""Rule-based extraction of background information and goals from user input"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+import os
+import re
+from ..models.preference import PreferenceCategory
+from .gazetteer import Gazetteer, preference_gazetteer
+
+# Fields of ValidationResult this extractor can fill
+PROFILE_FIELDS = ("has_background", "has_goals", "background_completeness", "goals_clarity", "background_info", "goals")
+
+_BACKGROUND_HEADER = r"background|about\s+me|profile|experience|current\s+situation"
+_GOALS_HEADER = r"goals?|objectives?|aspirations?|what\s+i\s+want"
+_SECTION = re.compile(
+    rf"^[ \t]*(?:(?P<background>{_BACKGROUND_HEADER})|(?P<goals>{_GOALS_HEADER}))[ \t]*:[ \t]*",
+    re.IGNORECASE | re.MULTILINE
+)
+
+_GOAL = re.compile(
+    r"\b(?:i\s+(?:really\s+)?(?:want|would\s+like|hope|plan|aim|intend|aspire|need)\s+to"
+    r"|i'd\s+like\s+to|my\s+(?:main\s+)?(?:goal|aim|objective|dream)\s+is\s+to"
+    r"|i(?:'m|\s+am)\s+(?:looking|hoping|planning|trying)\s+to"
+    r"|i(?:'m|\s+am)\s+looking\s+for)\s+(?P<goal>[^.!?\n]+)",
+    re.IGNORECASE
+)
+# Years only count as experience when the sentence says so ("5 years of Java experience"),
+# not in "a 5 year plan"
+_EXPERIENCE = re.compile(
+    r"\b(?P<years>\d+(?:\.\d+)?)\+?\s*(?:years?|yrs?)'?\s+(?:of\s+)?(?:[\w+#.-]+\s+){0,3}?(?:experience|exp)\b"
+    r"(?:\s+(?:in|with|as|at|doing)\s+(?P<area>[^.,;!?\n]+))?"
+    r"|\b(?:experience|exp)\s+of\s+(?P<years_after>\d+(?:\.\d+)?)\+?\s*(?:years?|yrs?)\b",
+    re.IGNORECASE
+)
+_EDUCATION = re.compile(
+    r"\b(?P<education>(?:bachelor'?s|master'?s|bachelors|masters|ph\.?d|doctorate|b\.?tech|m\.?tech|b\.?sc|m\.?sc|mba|diploma|degree)"
+    r"(?:\s+degree)?(?:\s+(?:in|of)\s+(?P<field>[^.,;!?\n]+))?)",
+    re.IGNORECASE
+)
+# A degree is stated, rather than just mentioned, when the user says they have or pursue it
+_EDUCATION_STATED = re.compile(
+    r"\b(?:i\s+(?:have|hold|earned|completed|got|did|finished)|i(?:'m|\s+am)\s+(?:doing|pursuing|studying\s+for)"
+    r"|my|graduated\s+with)\s+(?:an?\s+|the\s+)?$",
+    re.IGNORECASE
+)
+_ROLE = re.compile(
+    r"\b(?:(?P<stated>i\s+work(?:ed)?\s+as|i(?:'m|\s+am)\s+(?:currently\s+)?working\s+as|my\s+(?:current\s+)?(?:role|job|title)\s+is)\s+(?:an?\s+)?"
+    r"|(?:i(?:'m|\s+am)\s+(?:currently\s+)?|as\s+)an?\s+)(?P<role>[^.,;!?\n]+)",
+    re.IGNORECASE
+)
+# "I'm a ..." and "as a ..." only name a role when an occupation follows ("I'm a bit lost" does not)
+_OCCUPATION = re.compile(
+    r"\b(?:developer|engineer|programmer|analyst|scientist|manager|designer|architect|consultant|researcher"
+    r"|teacher|professor|lecturer|nurse|doctor|physician|student|administrator|admin|lead|specialist|technician"
+    r"|writer|founder|intern|accountant|lawyer|marketer|officer|director|graduate|freelancer|tester|coordinator"
+    r"|cto|ceo|swe|sre|devops)s?\b",
+    re.IGNORECASE
+)
+_STUDENT = re.compile(r"\b(?:i(?:'m|\s+am)\s+(?:a\s+)?(?:student|studying)|final[- ]year|undergrad)", re.IGNORECASE)
+_SKILLS = re.compile(
+    r"\b(?:proficient|skilled|experienced|fluent)\s+(?:in|with)\s+(?P<skills>[^.;!?\n]+)"
+    r"|\b(?:i\s+know|i\s+use|familiar\s+with|worked\s+with)\s+(?P<known>[^.;!?\n]+)",
+    re.IGNORECASE
+)
+# A role or degree description ends where the next clause of the sentence starts
+_CLAUSE_END = re.compile(r"\s+(?:and|but|who|with|where|looking|wanting|trying)\b.*$", re.IGNORECASE)
+
+# Background aspects counted towards completeness
+_ASPECTS = ("role", "experience", "education", "skills")
+
+@dataclass
+class ProfileExtraction:
+    """Profile fields found locally, each with a confidence in [0, 1]"""
+    values: Dict[str, Any] = field(default_factory=dict)
+    confidence: Dict[str, float] = field(default_factory=dict)
+
+    def confident(self, threshold: float) -> Dict[str, Any]:
+        """Values of the fields at least threshold confident"""
+        return {name: self.values[name] for name in PROFILE_FIELDS if self.confidence.get(name, 0.0) >= threshold}
+
+    def uncertain(self, threshold: float) -> List[str]:
+        """Names of the fields below threshold confidence, for the LLM to decide"""
+        return [name for name in PROFILE_FIELDS if self.confidence.get(name, 0.0) < threshold]
+
+def _clean(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip(" -,:;")
+
+class ProfileExtractor:
+    """
+    Finds background information and goals with section headers
+    ("Background:", "Goals:"), intent phrases ("I want to ...") and
+    background patterns (years of experience, degrees, roles, skills).
+
+    Explicit sections and multiple independent signals give high confidence;
+    a single weak signal, or no signal in a long input, stays below the
+    threshold so the LLM decides those fields.
+    """
+    def __init__(self, gazetteer: Optional[Gazetteer] = None, threshold: float = 0.8):
+        self.gazetteer = gazetteer or preference_gazetteer
+        self.threshold = threshold
+
+    @classmethod
+    def from_env(cls) -> "ProfileExtractor":
+        """Build an extractor with PROFILE_EXTRACTION_THRESHOLD (default 0.8)"""
+        return cls(threshold=float(os.getenv("PROFILE_EXTRACTION_THRESHOLD", "0.8")))
+
+    def _sections(self, text: str) -> Dict[str, str]:
+        sections: Dict[str, str] = {}
+        headers = list(_SECTION.finditer(text))
+        for index, header in enumerate(headers):
+            end = headers[index + 1].start() if index + 1 < len(headers) else len(text)
+            body = _clean(text[header.end():end])
+            if body:
+                sections[header.lastgroup] = f"{sections[header.lastgroup]} {body}" if header.lastgroup in sections else body
+        return sections
+
+    def _background(self, text: str, in_section: bool) -> Tuple[Dict[str, str], Set[str]]:
+        """Background details found in text, and the aspects the user stated explicitly"""
+        info: Dict[str, str] = {}
+        stated: Set[str] = set()
+        for match in _ROLE.finditer(text):
+            role = _clean(_CLAUSE_END.sub("", match.group("role")))
+            if role and len(role.split()) <= 6 and (match.group("stated") or _OCCUPATION.search(role)):
+                info["role"] = role
+                stated.add("role")
+                break
+        if "role" not in info and _STUDENT.search(text):
+            info["role"] = "student"
+            stated.add("role")
+        match = _EXPERIENCE.search(text)
+        if match:
+            info["experience_years"] = match.group("years") or match.group("years_after")
+            if match.group("area"):
+                info["experience_area"] = _clean(match.group("area"))
+            stated.add("experience")
+        match = _EDUCATION.search(text)
+        if match:
+            info["education"] = _clean(_CLAUSE_END.sub("", match.group("education")))
+            if match.group("field") or _EDUCATION_STATED.search(text[max(0, match.start() - 30):match.start()]):
+                stated.add("education")
+        # Technologies only count as skills where the text says they are, not when they are a goal
+        match = _SKILLS.search(text)
+        if match or in_section:
+            skills_text = text if in_section else match.group()
+            technologies = self.gazetteer.extract(skills_text).get(PreferenceCategory.TECHNOLOGY)
+            if technologies:
+                info["skills"] = ", ".join(technologies)
+            elif match:
+                info["skills"] = _clean(match.group("skills") or match.group("known"))
+            if "skills" in info:
+                stated.add("skills")
+        return info, stated
+
+    def extract(self, text: str) -> ProfileExtraction:
+        """Extract background and goals from text, with per-field confidences"""
+        sections = self._sections(text)
+        extraction = ProfileExtraction()
+        values, confidence = extraction.values, extraction.confidence
+        short_input = len(text.split()) < 8
+
+        # Background: explicit section, or independent aspects found anywhere
+        background_text = sections.get("background", text)
+        info, stated = self._background(background_text, "background" in sections)
+        aspects = {aspect for aspect in _ASPECTS if any(key.startswith(aspect) for key in info)}
+        if "background" in sections:
+            info["summary"] = sections["background"]
+        has_background = bool(info)
+        values["has_background"] = has_background
+        values["background_info"] = info
+        values["background_completeness"] = round(min(1.0, len(aspects) / len(_ASPECTS) + (0.25 if "background" in sections else 0.0)), 2)
+        if "background" in sections or len(stated) >= 2:
+            background_confidence = 0.95
+        elif aspects:
+            background_confidence = 0.75
+        else:
+            # Nothing found: believable for a short input, a guess for a long one
+            background_confidence = 0.85 if short_input else 0.6
+        confidence["has_background"] = confidence["background_info"] = background_confidence
+        if not has_background:
+            confidence["background_completeness"] = background_confidence
+        else:
+            confidence["background_completeness"] = 0.85 if background_confidence >= 0.95 else background_confidence - 0.1
+
+        # Goals: explicit section, or intent phrases
+        goals = [_clean(match.group("goal")) for match in _GOAL.finditer(text)]
+        if "goals" in sections and not goals:
+            goals = [sections["goals"]]
+        goals = list(dict.fromkeys(goal for goal in goals if goal))
+        values["has_goals"] = bool(goals)
+        values["goals"] = goals
+        specific = [goal for goal in goals if len(goal.split()) >= 4]
+        values["goals_clarity"] = round(min(1.0, 0.4 + 0.3 * len(specific)), 2) if goals else 0.0
+        if "goals" in sections or goals:
+            goals_confidence = 0.9
+        else:
+            goals_confidence = 0.85 if short_input else 0.6
+        confidence["has_goals"] = confidence["goals"] = goals_confidence
+        # How clear a goal is, is a judgement call; only obvious cases are decided locally
+        confidence["goals_clarity"] = 0.85 if (len(specific) >= 2 or not goals and short_input) else 0.6
+
+        return extraction
+
+# Initialize the shared extractor
+profile_extractor = ProfileExtractor.from_env()
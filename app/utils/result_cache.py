@@ -0,0 +1,114 @@
+"""Cache of LLM validation results keyed by normalized input and recent context"""
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import os
+import re
+import time
+import unicodedata
+from ..models.conversation_memory import ConversationTurn
+from ..models.validation_result import InputType, ValidationResult
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_input(text: str) -> str:
+    """NFKC-normalize and collapse whitespace, so trivially different spellings share an entry"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+def context_fingerprint(recent_turns: List[ConversationTurn], num_turns: int = 3) -> str:
+    """Hash of what the validation prompt shows of the conversation: the last num_turns inputs and types"""
+    digest = hashlib.blake2b(digest_size=16)
+    for turn in recent_turns[-num_turns:]:
+        digest.update(normalize_input(turn.user_input).encode("utf-8"))
+        digest.update(b"\x1f")
+        digest.update(turn.input_type.encode("utf-8"))
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+class ValidationResultCache:
+    """
+    Bounded LRU of validation results with a TTL.
+
+    Validation depends on the input, the last few conversation turns and the
+    detected input type, so entries are keyed on all three; first-turn inputs
+    (empty context) are the common hit. Error and degraded results are never
+    cached so a transient failure is not replayed. Results are copied on the
+    way in and out so callers can't change a cached entry.
+    """
+    def __init__(self, max_entries: int = 10000, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, ValidationResult]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.skipped = 0
+
+    @classmethod
+    def from_env(cls) -> "ValidationResultCache":
+        """Build a cache from VALIDATION_CACHE_* environment variables"""
+        return cls(
+            max_entries=int(os.getenv("VALIDATION_CACHE_MAX_ENTRIES", "10000")),
+            ttl=float(os.getenv("VALIDATION_CACHE_TTL", "3600"))
+        )
+
+    @staticmethod
+    def key(text: str, recent_turns: List[ConversationTurn], input_type: InputType) -> Tuple[str, str, str]:
+        return normalize_input(text), context_fingerprint(recent_turns), input_type.value
+
+    def get(
+        self,
+        text: str,
+        recent_turns: List[ConversationTurn],
+        input_type: InputType
+    ) -> Optional[ValidationResult]:
+        """A cached result for this input in this context, or None"""
+        key = self.key(text, recent_turns, input_type)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result.model_copy(deep=True)
+            del self._entries[key]
+            self.expirations += 1
+        self.misses += 1
+        return None
+
+    def put(
+        self,
+        text: str,
+        recent_turns: List[ConversationTurn],
+        input_type: InputType,
+        result: ValidationResult
+    ):
+        """Cache a result unless it reports an error or a degraded answer"""
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        if result.degraded or "error_type" in result.validation_details:
+            self.skipped += 1
+            return
+        key = self.key(text, recent_turns, input_type)
+        self._entries[key] = (time.monotonic() + self.ttl, result.model_copy(deep=True))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def metrics(self) -> Dict[str, float]:
+        """Hit ratio and cache state for the metrics endpoint"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "skipped": self.skipped
+        }
+
+# Initialize the shared result cache
+validation_result_cache = ValidationResultCache.from_env()
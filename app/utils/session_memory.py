@@ -0,0 +1,144 @@
+"""Conversation memory partitioned by session"""
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+import asyncio
+import logging
+import os
+from ..models.conversation_memory import ConversationMemory, ConversationTurn
+from ..models.validation_result import ValidationResult
+from .shared_state import get_redis_client
+
+class SessionMemoryStore:
+    """
+    One ConversationMemory per session id, so a single validator can serve
+    concurrent requests from different sessions without mixing their context.
+
+    Each session keeps at most max_turns turns; past max_sessions the least
+    recently used session is dropped. Inputs without a session id get a fresh
+    memory that is not stored.
+
+    With a Redis client, Redis holds each session's turns as a list that every
+    worker appends to (RPUSH/LTRIM), with a counter of turns ever written, so
+    sessions survive restarts and follow users across workers without one
+    worker overwriting another's turns. The local copy is reused while the
+    counter shows no turns written elsewhere and reloaded otherwise. Sessions
+    expire after ttl seconds of inactivity.
+    """
+    def __init__(
+        self,
+        max_sessions: int = 10000,
+        max_turns: int = 200,
+        ttl: float = 86400.0,
+        redis=None
+    ):
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self.ttl = ttl
+        self.redis = redis
+        self._sessions: "OrderedDict[str, ConversationMemory]" = OrderedDict()
+        # Turns written to Redis that the local copy of each session includes
+        self._synced: Dict[str, int] = {}
+        self._pending_writes: Set[asyncio.Task] = set()
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "SessionMemoryStore":
+        """Build a store from SESSION_MEMORY_* environment variables"""
+        return cls(
+            max_sessions=int(os.getenv("SESSION_MEMORY_MAX_SESSIONS", "10000")),
+            max_turns=int(os.getenv("SESSION_MEMORY_MAX_TURNS", "200")),
+            ttl=float(os.getenv("SESSION_MEMORY_TTL", "86400")),
+            redis=get_redis_client()
+        )
+
+    async def get(self, session_id: Optional[str]) -> ConversationMemory:
+        """Get the memory for a session, loading or creating it as needed"""
+        if session_id is None:
+            return ConversationMemory(max_turns=self.max_turns)
+
+        memory = self._sessions.get(session_id)
+        if self.redis is not None:
+            memory = await self._sync(session_id, memory)
+        elif memory is None:
+            memory = ConversationMemory(max_turns=self.max_turns)
+
+        self._sessions[session_id] = memory
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            evicted, _ = self._sessions.popitem(last=False)
+            self._synced.pop(evicted, None)
+            self.evictions += 1
+        return memory
+
+    def save(self, session_id: Optional[str]):
+        """Persist the turn just added to a session's memory; fire and forget"""
+        if session_id is None or self.redis is None or session_id not in self._sessions:
+            return
+        memory = self._sessions[session_id]
+        if not memory.turns:
+            return
+        last_result = memory.last_validation_result
+        task = asyncio.ensure_future(self._write(
+            session_id,
+            memory.turns[-1].model_dump_json(),
+            last_result.model_dump_json() if last_result is not None else None
+        ))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+    async def _sync(self, session_id: str, memory: Optional[ConversationMemory]) -> ConversationMemory:
+        """The local memory if no other worker has written to the session since, else a reload"""
+        turns_key, count_key, last_key = self._keys(session_id)
+        try:
+            count = int(await self.redis.get(count_key) or 0)
+            if memory is not None and self._synced.get(session_id) == count:
+                return memory
+            # Read the turns and their count together so they match
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.get(count_key)
+            pipe.lrange(turns_key, 0, -1)
+            pipe.get(last_key)
+            count, turns, last_result = await pipe.execute()
+            reloaded = ConversationMemory(
+                max_turns=self.max_turns,
+                turns=[ConversationTurn.model_validate_json(turn) for turn in turns],
+                last_validation_result=ValidationResult.model_validate_json(last_result) if last_result else None
+            )
+            self._synced[session_id] = int(count or 0)
+            return reloaded
+        except Exception as e:
+            logging.error("Failed to load session memory %s: %s", session_id, e)
+            return memory if memory is not None else ConversationMemory(max_turns=self.max_turns)
+
+    async def _write(self, session_id: str, turn: str, last_result: Optional[str]):
+        turns_key, count_key, last_key = self._keys(session_id)
+        ttl = int(self.ttl)
+        try:
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.rpush(turns_key, turn)
+            pipe.ltrim(turns_key, -self.max_turns, -1)
+            pipe.incr(count_key)
+            pipe.expire(turns_key, ttl)
+            pipe.expire(count_key, ttl)
+            if last_result is not None:
+                pipe.set(last_key, last_result, ex=ttl)
+            count = (await pipe.execute())[2]
+        except Exception as e:
+            logging.error("Failed to persist session memory %s: %s", session_id, e)
+            return
+        # If another worker wrote in between, the local copy misses its turns
+        # and is reloaded on the next get
+        if self._synced.get(session_id) == count - 1:
+            self._synced[session_id] = count
+
+    def metrics(self) -> Dict[str, int]:
+        """Current session cache state for the metrics endpoint"""
+        return {"sessions": len(self._sessions), "evictions": self.evictions}
+
+    @staticmethod
+    def _keys(session_id: str) -> Tuple[str, str, str]:
+        key = f"session_memory:{session_id}"
+        return f"{key}:turns", f"{key}:count", f"{key}:last"
+
+# Initialize the shared session store
+session_memory_store = SessionMemoryStore.from_env()
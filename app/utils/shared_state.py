@@ -0,0 +1,22 @@
+"""Access to the shared store used for cross-worker state"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+_client = None
+
+def get_redis_client():
+    """
+    Process-wide asyncio Redis client, or None when REDIS_URL is not set.
+    Connections are opened lazily, so it is safe to create before workers fork.
+    """
+    global _client
+    if REDIS_URL is None:
+        return None
+    if _client is None:
+        import redis.asyncio as redis
+        _client = redis.from_url(REDIS_URL)
+    return _client
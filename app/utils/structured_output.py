@@ -0,0 +1,156 @@
+"""Compact output schemas for LLM structured responses"""
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Optional, Type, Union, get_args, get_origin
+import json
+import os
+import re
+from langchain.output_parsers import PydanticOutputParser
+from pydantic import BaseModel, create_model
+
+class OutputMode(str, Enum):
+    """How a response schema is given to the LLM"""
+    NATIVE = "native"      # provider tool calling, falling back to COMPACT when unsupported
+    COMPACT = "compact"    # key-only schema in the prompt
+    VERBOSE = "verbose"    # full JSON schema from PydanticOutputParser
+
+# Value constraints worth keeping from a field description: ranges ("0-1") and choices ("a|b|c")
+_RANGE = re.compile(r"\b\d+(?:\.\d+)?\s*-\s*\d+(?:\.\d+)?\b")
+_CHOICES = re.compile(r"\b\w+(?:\|\w+)+\b")
+
+def _hint(description: Optional[str]) -> Optional[str]:
+    """The range or choices stated in a field description, if any"""
+    match = _CHOICES.search(description or "") or _RANGE.search(description or "")
+    return match.group().replace(" ", "") if match else None
+
+def _type_hint(annotation: Any) -> str:
+    """Short type notation: bool, float, "a"|"b", [str], {str: str}, nested objects as key maps"""
+    if annotation is Any:
+        return "any"
+    origin = get_origin(annotation)
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        hint = " | ".join(_type_hint(arg) for arg in args)
+        return f"{hint} | null" if len(args) < len(get_args(annotation)) else hint
+    if origin in (list, set, tuple):
+        args = get_args(annotation)
+        return f"[{_type_hint(args[0]) if args else 'any'}]"
+    if origin is dict or annotation is dict:
+        args = get_args(annotation)
+        return f"{{{_type_hint(args[0])}: {_type_hint(args[1])}}}" if args else "{}"
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return "|".join(json.dumps(member.value) for member in annotation)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _key_map(annotation)
+    return getattr(annotation, "__name__", "any")
+
+def _key_map(model: Type[BaseModel], omitted: FrozenSet[str] = frozenset()) -> str:
+    keys = []
+    for name, field in model.model_fields.items():
+        if name in omitted:
+            continue
+        hint = _hint(field.description)
+        value = _type_hint(field.annotation)
+        if hint and "|" in hint:
+            value = "|".join(json.dumps(choice) for choice in hint.split("|"))
+        elif hint:
+            value = f"{value} {hint}"
+        keys.append(f"{json.dumps(name)}{'' if field.is_required() else '?'}: {value}")
+    return "{" + ", ".join(keys) + "}"
+
+def _subset(model: Type[BaseModel], omitted: FrozenSet[str]) -> Type[BaseModel]:
+    """model without the omitted fields (the model itself when nothing is omitted)"""
+    if not omitted:
+        return model
+    fields = {
+        name: (field.annotation, field)
+        for name, field in model.model_fields.items()
+        if name not in omitted
+    }
+    return create_model(model.__name__, **fields)
+
+def _strip_schema(schema: Any) -> Any:
+    """
+    JSON schema without titles, and with descriptions cut down to their
+    range or choices; the provider counts the schema as prompt tokens too
+    """
+    if isinstance(schema, dict):
+        stripped = {
+            key: _strip_schema(value)
+            for key, value in schema.items()
+            if key not in ("title", "description") or not isinstance(value, str)
+        }
+        hint = _hint(schema.get("description")) if isinstance(schema.get("description"), str) else None
+        if hint:
+            stripped["description"] = hint
+        return stripped
+    if isinstance(schema, list):
+        return [_strip_schema(value) for value in schema]
+    return schema
+
+@lru_cache(maxsize=None)
+def compact_instructions(model: Type[BaseModel], omitted: FrozenSet[str] = frozenset()) -> str:
+    """Key-only format instructions for model without the omitted fields"""
+    return (
+        "Respond with one JSON object only, no other text. Keys and types "
+        "(? marks optional keys):\n" + _key_map(model, omitted)
+    )
+
+@lru_cache(maxsize=None)
+def verbose_instructions(model: Type[BaseModel], omitted: FrozenSet[str] = frozenset()) -> str:
+    """PydanticOutputParser format instructions for model without the omitted fields"""
+    return PydanticOutputParser(pydantic_object=_subset(model, omitted)).get_format_instructions()
+
+@lru_cache(maxsize=None)
+def tool_schema(model: Type[BaseModel], omitted: FrozenSet[str] = frozenset()) -> Dict[str, Any]:
+    """Minified OpenAI-style function definition for model without the omitted fields"""
+    return {
+        "type": "function",
+        "function": {
+            "name": model.__name__,
+            "description": f"Return the {model.__name__}",
+            "parameters": _strip_schema(_subset(model, omitted).model_json_schema())
+        }
+    }
+
+class StructuredOutput:
+    """
+    Gives the LLM the response schema of one model class in the configured
+    mode. In native mode the schema is sent as a forced tool call, so the
+    prompt itself only asks for the call; clients without tool calling get
+    the compact key-only schema instead. Schemas are built once per model
+    class and set of omitted fields.
+    """
+    def __init__(self, model: Type[BaseModel], mode: OutputMode = OutputMode.NATIVE):
+        self.model = model
+        self.mode = OutputMode(mode)
+
+    @classmethod
+    def from_env(cls, model: Type[BaseModel]) -> "StructuredOutput":
+        """Use STRUCTURED_OUTPUT_MODE (native, compact or verbose; default native)"""
+        return cls(model, OutputMode(os.getenv("STRUCTURED_OUTPUT_MODE", OutputMode.NATIVE.value)))
+
+    def _native(self, llm) -> bool:
+        return self.mode == OutputMode.NATIVE and hasattr(llm, "bind_tools")
+
+    def instructions(self, llm, omitted: FrozenSet[str] = frozenset()) -> str:
+        """Format instructions to put in the prompt when calling llm"""
+        if self._native(llm):
+            return f"Call the {self.model.__name__} function with your answer."
+        if self.mode == OutputMode.VERBOSE:
+            return verbose_instructions(self.model, omitted)
+        return compact_instructions(self.model, omitted)
+
+    def bind(self, llm, omitted: FrozenSet[str] = frozenset()):
+        """llm, set up to answer with the schema if it is given as a tool"""
+        if self._native(llm):
+            return llm.bind_tools([tool_schema(self.model, omitted)], tool_choice=self.model.__name__)
+        return llm
+
+    @staticmethod
+    def text(response) -> str:
+        """The JSON answer in a response, from its tool call or its content"""
+        tool_calls = getattr(response, "tool_calls", None)
+        if tool_calls:
+            return json.dumps(tool_calls[0]["args"])
+        return response.content
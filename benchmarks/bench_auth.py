@@ -0,0 +1,59 @@
+"""
+Benchmark per-request overhead of auth_middleware with and without the verified-token cache.
+
+Simulates high RPS from a pool of active users, each reusing their token across requests.
+
+Usage: python benchmarks/bench_auth.py [requests] [users]
+"""
+import os
+import sys
+import time
+import logging
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET", "benchmark-secret-" * 4)
+
+import jwt
+from app.middleware import auth
+
+def make_requests(num_users: int):
+    exp = int(time.time()) + 3600
+    tokens = [
+        jwt.encode({"user_id": f"user-{i}", "tier": "free", "exp": exp}, os.environ["JWT_SECRET"], algorithm="HS256")
+        for i in range(num_users)
+    ]
+    return [
+        SimpleNamespace(headers={"Authorization": f"Bearer {token}"}, state=SimpleNamespace())
+        for token in tokens
+    ]
+
+def run(requests, total: int) -> float:
+    start = time.perf_counter()
+    for i in range(total):
+        auth.auth_middleware(requests[i % len(requests)])
+    return time.perf_counter() - start
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    num_users = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    logging.disable(logging.WARNING)
+    auth.reload_jwt_secret()
+    requests = make_requests(num_users)
+
+    # Uncached: a cache that never holds anything forces full verification every time
+    cache = auth.token_cache
+    auth.token_cache = auth.VerifiedTokenCache(max_size=0)
+    uncached = run(requests, total)
+
+    auth.token_cache = cache
+    cache.clear()
+    cached = run(requests, total)
+
+    print(f"{total} requests from {num_users} users")
+    print(f"  jwt.decode every request: {uncached / total * 1e6:8.2f} us/request  ({total / uncached:,.0f} req/s)")
+    print(f"  verified-token cache:     {cached / total * 1e6:8.2f} us/request  ({total / cached:,.0f} req/s)")
+    print(f"  cache hit ratio: {cache.hits / max(cache.hits + cache.misses, 1):.3f}")
+
+if __name__ == "__main__":
+    main()
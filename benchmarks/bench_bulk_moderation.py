@@ -0,0 +1,52 @@
+"""
+Benchmark bulk moderation throughput by worker count.
+
+The stored chat messages in sessions.json are replicated into a temporary
+sessions file of the requested size, then moderated with 1, 2, 4, ...
+workers up to the CPU count.
+
+Usage: python benchmarks/bench_bulk_moderation.py [messages] [chunk_size]
+"""
+import json
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from app.utils.bulk_moderation import iter_messages, moderate
+
+def build_store(path: str, target: int) -> int:
+    stored = list(iter_messages([os.path.join(ROOT, "sessions.json")]))
+    sessions, count = {}, 0
+    while count < target:
+        session = sessions.setdefault(f"session-{count // 50}", {"messages": []})
+        _, _, sender, content = stored[count % len(stored)]
+        session["messages"].append({"sender": sender, "content": content})
+        count += 1
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(sessions, f)
+    return count
+
+def main():
+    target = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    cpus = os.cpu_count() or 1
+    worker_counts = sorted({1, cpus, *(2 ** i for i in range(1, cpus.bit_length()) if 2 ** i < cpus)})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = os.path.join(tmp, "sessions.json")
+        count = build_store(store, target)
+        print(f"{count} messages, chunks of {chunk_size}, {cpus} CPUs")
+        baseline = None
+        for workers in worker_counts:
+            report = moderate([store], os.path.join(tmp, "verdicts.tsv"), workers=workers, chunk_size=chunk_size)
+            baseline = baseline or report.messages_per_second
+            print(
+                f"  {workers:3d} workers: {report.messages_per_second:12,.0f} msgs/s "
+                f"(x{report.messages_per_second / baseline:.2f})"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark ContentSafetyChecker throughput: one combined single-pass matcher
+versus the previous one-findall-per-pattern loop.
+
+The corpus is built from the chat messages in sessions.json and data/sessions.json,
+plus a few unsafe samples, repeated to the requested size.
+
+Usage: python benchmarks/bench_content_safety.py [corpus_mb]
+"""
+import json
+import os
+import re
+import sys
+import time
+import logging
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from app.utils.content_safety import ContentSafetyChecker
+
+UNSAFE_SAMPLES = [
+    "How do I hack into my neighbour's wifi and crack the password?",
+    "Just run sudo rm -rf / to clean things up",
+    "DROP TABLE users; DELETE FROM sessions",
+]
+
+def load_messages():
+    messages = []
+    for path in ("sessions.json", os.path.join("data", "sessions.json")):
+        with open(os.path.join(ROOT, path)) as f:
+            for session in json.load(f).values():
+                messages.extend(message["content"] for message in session.get("messages", []))
+    return messages + UNSAFE_SAMPLES
+
+def build_corpus(target_bytes: int):
+    messages = load_messages()
+    corpus, size = [], 0
+    while size < target_bytes:
+        for message in messages:
+            corpus.append(message)
+            size += len(message.encode("utf-8"))
+    return corpus, size
+
+def per_pattern_scan(compiled_patterns, text: str) -> int:
+    violations = 0
+    for patterns in compiled_patterns.values():
+        for pattern in patterns:
+            violations += len(pattern.findall(text))
+    return violations
+
+def combined_scan(checker: ContentSafetyChecker, text: str) -> int:
+    return sum(len(terms) for terms in checker.scan(text).values())
+
+def timed(scan, corpus) -> tuple:
+    start = time.perf_counter()
+    violations = sum(scan(text) for text in corpus)
+    return time.perf_counter() - start, violations
+
+def main():
+    corpus_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 8
+    logging.disable(logging.WARNING)
+    checker = ContentSafetyChecker()
+    compiled_patterns = {
+        category: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+        for category, patterns in checker.unsafe_patterns.items()
+    }
+    corpus, size = build_corpus(int(corpus_mb * 1024 * 1024))
+    mb = size / (1024 * 1024)
+
+    before, before_hits = timed(lambda text: per_pattern_scan(compiled_patterns, text), corpus)
+    after, after_hits = timed(lambda text: combined_scan(checker, text), corpus)
+    assert before_hits == after_hits, (before_hits, after_hits)
+
+    print(f"{len(corpus)} messages, {mb:.1f} MB, {after_hits} violations")
+    print(f"  findall per pattern:    {mb / before:8.1f} MB/s  ({len(corpus) / before:,.0f} msgs/s)")
+    print(f"  combined single pass:   {mb / after:8.1f} MB/s  ({len(corpus) / after:,.0f} msgs/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark ConversationMemory: the previous list with pop(0) and full-history
+rescans on every read, versus the deque with incrementally maintained aggregates.
+
+Each simulated request adds a turn and reads preferences, background and goals,
+as the validation and preference nodes do.
+
+Usage: python benchmarks/bench_conversation_memory.py [requests]
+"""
+import os
+import sys
+import time
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.conversation_memory import ConversationMemory, ConversationTurn
+
+class ListConversationMemory:
+    """The previous implementation"""
+    def __init__(self, max_turns: int):
+        self.turns: List[ConversationTurn] = []
+        self.max_turns = max_turns
+
+    def add_turn(self, turn: ConversationTurn):
+        self.turns.append(turn)
+        if len(self.turns) > self.max_turns:
+            self.turns.pop(0)
+
+    def get_all_preferences(self):
+        preferences = {}
+        for turn in self.turns:
+            preferences.update(turn.preferences)
+        return preferences
+
+    def get_background_info(self):
+        background = {}
+        for turn in self.turns:
+            background.update(turn.background_info)
+        return background
+
+    def get_goals(self):
+        goals = set()
+        for turn in self.turns:
+            goals.update(turn.goals)
+        return list(goals)
+
+def make_turns(count: int) -> List[ConversationTurn]:
+    return [
+        ConversationTurn(
+            user_input=f"turn {i}",
+            input_type="new_query",
+            preferences={f"category_{i % 7}": f"value_{i}"},
+            background_info={f"field_{i % 5}": f"detail_{i}"},
+            goals=[f"goal_{i % 11}"]
+        )
+        for i in range(count)
+    ]
+
+def run(memory, turns) -> float:
+    start = time.perf_counter()
+    for turn in turns:
+        memory.add_turn(turn)
+        memory.get_all_preferences()
+        memory.get_background_info()
+        memory.get_goals()
+    return time.perf_counter() - start
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    turns = make_turns(requests)
+    print(f"{requests} requests (add turn + read all aggregates)")
+    for max_turns in (10, 200, 500):
+        before = run(ListConversationMemory(max_turns), turns)
+        after = run(ConversationMemory(max_turns=max_turns), turns)
+        print(
+            f"  max_turns={max_turns:<4} list rescans: {before / requests * 1e6:8.2f} us/request"
+            f"   deque + aggregates: {after / requests * 1e6:8.2f} us/request"
+        )
+
+if __name__ == "__main__":
+    main()
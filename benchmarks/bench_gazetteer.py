@@ -0,0 +1,84 @@
+"""
+Benchmark gazetteer preference extraction as vocabularies grow: the compiled
+trie matcher versus checking every term with a substring test (the approach
+of the old hardcoded genre list).
+
+The bundled vocabularies are padded with synthetic terms up to the requested
+size; inputs are the user messages in sessions.json plus typical preference
+statements.
+
+Usage: python benchmarks/bench_gazetteer.py [vocabulary_sizes...]
+"""
+import json
+import os
+import random
+import string
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from app.models.preference import PreferenceCategory
+from app.utils.gazetteer import DEFAULT_VOCABULARY_DIR, Gazetteer
+
+SAMPLE_INPUTS = [
+    "I prefer remote backend roles in Berlin using Python and Kubernetes",
+    "Please update my preferences: visual learning, intermediate level, machine learning and deep learning",
+    "I am a junior data analyst at a fintech startup and want to move into data engineering",
+    "Remove Java from my preferences, I no longer want enterprise companies",
+]
+
+def load_inputs():
+    inputs = list(SAMPLE_INPUTS)
+    with open(os.path.join(ROOT, "sessions.json")) as f:
+        for session in json.load(f).values():
+            inputs.extend(m["content"] for m in session.get("messages", []) if m["sender"] == "user")
+    return inputs
+
+def padded_vocabularies(size: int):
+    vocabularies = Gazetteer.from_directory(DEFAULT_VOCABULARY_DIR).vocabularies
+    vocabularies = {category: list(entries) for category, entries in vocabularies.items()}
+    categories = list(PreferenceCategory)
+    rng = random.Random(0)
+    count = sum(len(entry) for entries in vocabularies.values() for entry in entries)
+    while count < size:
+        words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10))) for _ in range(rng.randint(1, 3))]
+        vocabularies[categories[count % len(categories)]].append([" ".join(words)])
+        count += 1
+    return vocabularies
+
+def substring_extract(terms, text: str):
+    lowered = text.lower()
+    return [term for term in terms if term in lowered]
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or [500, 5000, 50000]
+    inputs = load_inputs()
+    for size in sizes:
+        vocabularies = padded_vocabularies(size)
+        start = time.perf_counter()
+        gazetteer = Gazetteer(vocabularies)
+        compile_seconds = time.perf_counter() - start
+        terms = list(gazetteer._terms)
+
+        repeats = max(1, 20000 // size)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for text in inputs:
+                substring_extract(terms, text)
+        before = (time.perf_counter() - start) / (repeats * len(inputs))
+
+        repeats *= 20
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for text in inputs:
+                gazetteer.extract(text)
+        after = (time.perf_counter() - start) / (repeats * len(inputs))
+
+        print(f"{len(terms)} terms (compiled in {compile_seconds:.2f}s), {len(inputs)} inputs")
+        print(f"  substring test per term:  {before * 1e6:10.1f} us/input")
+        print(f"  gazetteer single pass:    {after * 1e6:10.1f} us/input")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark input type detection: the compiled rule table versus the previous
+per-call dict of patterns searched one re.search at a time.
+
+The corpus is the user messages in sessions.json plus typical validation inputs.
+
+Usage: python benchmarks/bench_input_type.py [repeats]
+"""
+import json
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from app.utils.input_type_classifier import input_type_classifier
+
+SAMPLE_INPUTS = [
+    "I am a backend developer with 5 years of Java experience and I want to move into machine learning",
+    "Can you rephrase my question about career paths in data engineering?",
+    "Actually I meant distributed systems, not databases",
+    "What are my preferences?",
+    "Please elaborate on the learning resources for Kubernetes and add more beginner material",
+    "I'm a student studying computer science. My goal is to get an internship at a large tech company.",
+]
+
+def per_pattern_detect(current_input: str, previous_input: str = None) -> str:
+    current_lower = current_input.lower()
+    preference_patterns = {
+        'preference_update': [r'i prefer', r'i like', r'i want', r'i would rather', r'set preference', r'update preference'],
+        'preference_removal': [r'remove preference', r"don't prefer", r"don't like", r'remove', r'delete preference'],
+        'preference_query': [r'what are my preferences', r'show preferences', r'list preferences', r'get preferences']
+    }
+    for input_type, patterns in preference_patterns.items():
+        if any(re.search(pattern, current_lower) for pattern in patterns):
+            return input_type
+    clarification_starters = [
+        r'^yes', r'^no', r'^actually', r'^i meant', r'^to clarify',
+        r'^let me clarify', r'^what i meant'
+    ]
+    if previous_input and any(re.search(pattern, current_lower) for pattern in clarification_starters):
+        return 'clarification_response'
+    if any(re.search(pattern, current_lower) for pattern in [r'rewrite', r'rephrase', r'change', r'modify']):
+        return 'rewrite_request'
+    if any(re.search(pattern, current_lower) for pattern in [r'add more', r'enhance', r'elaborate', r'provide more']):
+        return 'input_enhancement'
+    return 'new_query'
+
+def load_inputs():
+    inputs = list(SAMPLE_INPUTS)
+    with open(os.path.join(ROOT, "sessions.json")) as f:
+        for session in json.load(f).values():
+            inputs.extend(m["content"] for m in session.get("messages", []) if m["sender"] == "user")
+    return inputs
+
+def timed(detect, inputs, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for text in inputs:
+            detect(text, "previous question")
+    return time.perf_counter() - start
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    inputs = load_inputs()
+    for text in inputs:
+        assert input_type_classifier.classify(text, "previous question").value == per_pattern_detect(text, "previous question")
+
+    total = len(inputs) * repeats
+    before = timed(per_pattern_detect, inputs, repeats)
+    after = timed(input_type_classifier.classify, inputs, repeats)
+
+    print(f"{total} classifications over {len(inputs)} distinct inputs")
+    print(f"  re.search per pattern:  {before / total * 1e6:8.2f} us/input")
+    print(f"  compiled rule table:    {after / total * 1e6:8.2f} us/input")
+
+if __name__ == "__main__":
+    main()
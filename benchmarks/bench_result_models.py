@@ -0,0 +1,76 @@
+"""
+Benchmark per-request ValidationResult overhead: building internal results
+(error, blocked, preference clarification) by full validation versus copying
+prebuilt templates, and rendering the /api/process_input response with
+.dict() + JSONResponse versus ModelJSONResponse (pydantic-core, one pass).
+
+Usage: python benchmarks/bench_result_models.py [iterations]
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from fastapi.responses import JSONResponse
+from app.models.validation_result import InputType, ValidationResult
+from app.utils.input_validator import BLOCKED_RESULT
+from app.utils.json_response import ModelJSONResponse
+
+def build_blocked():
+    return ValidationResult(
+        is_valid=False,
+        has_background=False,
+        has_goals=False,
+        background_completeness=0.0,
+        goals_clarity=0.0,
+        clarity_score=0.0,
+        safety_score=0.0,
+        context_score=0.0,
+        input_type=InputType.INVALID_INPUT,
+        error_message="Content blocked by safety checks",
+        missing_elements=['Blocked by guardrails'],
+        suggestions=["Please rephrase your query", "Please avoid sensitive or prohibited topics"],
+        clarification_questions=["Could you please rephrase your request in a more appropriate way?"],
+        guardrails_result={"input_rails": {"allowed": False}}
+    )
+
+def per_call(function, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    result = ValidationResult(
+        is_valid=True, has_background=True, has_goals=True, background_completeness=0.8,
+        goals_clarity=0.7, input_type=InputType.NEW_QUERY, goals=["learn machine learning"],
+        background_info={"role": "developer", "experience_years": "5"}
+    )
+    messages = [{"role": "system", "content": "Validation passed"}]
+
+    def old_response():
+        return JSONResponse({"is_valid": True, "next_step": "process", "messages": messages,
+                             "validation_result": result.dict(), "preferences": None})
+
+    def new_response():
+        return ModelJSONResponse({"is_valid": True, "next_step": "process", "messages": messages,
+                                  "validation_result": result, "preferences": None})
+
+    rows = [
+        ("blocked result, validated", lambda: build_blocked()),
+        ("blocked result, template", lambda: BLOCKED_RESULT.new(guardrails_result={"input_rails": {"allowed": False}})),
+        ("response, dict + JSONResponse", old_response),
+        ("response, ModelJSONResponse", new_response),
+    ]
+    for name, function in rows:
+        function()
+        print(f"  {name:32s} {per_call(function, iterations):7.2f} us")
+
+if __name__ == "__main__":
+    import warnings
+    warnings.simplefilter("ignore")
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark per-chunk overhead of scanning a streamed response for unsafe content:
+the incremental StreamingSafetyScanner versus re-scanning the accumulated
+response on every chunk, with one scan of the complete response as the floor
+(which would need the whole response buffered before the first token is sent).
+
+Responses are the bot messages in sessions.json and data/sessions.json, split
+into token-sized chunks.
+
+Usage: python benchmarks/bench_stream_safety.py [chunk_chars] [repeats]
+"""
+import json
+import os
+import sys
+import time
+import logging
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from app.utils.content_safety import ContentSafetyChecker, StreamingSafetyScanner
+
+def load_responses():
+    responses = []
+    for path in ("sessions.json", os.path.join("data", "sessions.json")):
+        with open(os.path.join(ROOT, path)) as f:
+            for session in json.load(f).values():
+                responses.extend(m["content"] for m in session.get("messages", []) if m["sender"] != "user")
+    # Long answers are where re-scanning hurts; make sure some are present
+    responses.append(" ".join(responses[:20]) or "A long career answer. " * 200)
+    return responses
+
+def chunked(text: str, size: int):
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+def incremental(checker, chunks) -> bool:
+    scanner = StreamingSafetyScanner(checker)
+    for chunk in chunks:
+        scanner.feed(chunk)
+        if scanner.blocked:
+            return True
+    scanner.finish()
+    return scanner.blocked
+
+def rescan(checker, chunks) -> bool:
+    text = ""
+    for chunk in chunks:
+        text += chunk
+        if checker.scan(text):
+            return True
+    return False
+
+def whole(checker, chunks) -> bool:
+    return bool(checker.scan("".join(chunks)))
+
+def timed(scan, checker, streams, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for chunks in streams:
+            scan(checker, chunks)
+    return time.perf_counter() - start
+
+def main():
+    chunk_chars = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    logging.disable(logging.WARNING)
+    checker = ContentSafetyChecker()
+    streams = [chunked(text, chunk_chars) for text in load_responses()]
+    for chunks in streams:
+        assert incremental(checker, chunks) == whole(checker, chunks)
+
+    total_chunks = sum(len(chunks) for chunks in streams) * repeats
+    print(f"{len(streams)} responses, {total_chunks // repeats} chunks of {chunk_chars} chars, x{repeats}")
+    for name, scan in (("re-scan accumulated text:", rescan), ("incremental scanner:", incremental), ("single scan at end:", whole)):
+        elapsed = timed(scan, checker, streams, repeats)
+        print(f"  {name:26s} {elapsed / total_chunks * 1e6:8.2f} us/chunk")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark structured-output prompting: prompt size of the verbose
+PydanticOutputParser format instructions versus the compact key-only schema
+and the minified tool schema sent in native mode, for ValidationResult and
+InputAnalysisOutput.
+
+Offline, token counts are estimated at 4 characters per token. With --live
+(needs GROQ_API_KEY), each mode validates the sample inputs against the real
+model and reports the prompt tokens the provider counted and the share of
+responses that parsed into a valid result without a follow-up request.
+
+Usage: python benchmarks/bench_structured_output.py [--live] [repeats]
+"""
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from langchain.schema import HumanMessage, SystemMessage
+from app.models.validation_result import InputType, ValidationResult
+from app.utils.input_validator import SERVICE_FIELDS, InputValidator
+from app.utils.json_repair import fill_defaults, parse_json_object
+from app.utils.structured_output import OutputMode, StructuredOutput, compact_instructions, tool_schema, verbose_instructions
+from input_analysis_node import InputAnalysisOutput
+
+SAMPLE_INPUTS = [
+    "I'm a software developer with 5 years of experience, primarily working with Python. I want to learn machine learning to build AI applications.",
+    "Background: final-year mechanical engineering student. Goals: move into robotics software.",
+    "What should I learn next?",
+    "I am a junior data analyst at a fintech startup and want to move into data engineering",
+]
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+def offline():
+    for model, omitted in ((ValidationResult, SERVICE_FIELDS), (InputAnalysisOutput, frozenset())):
+        verbose = verbose_instructions(model, omitted)
+        compact = compact_instructions(model, omitted)
+        native = json.dumps(tool_schema(model, omitted), separators=(",", ":"))
+        print(f"{model.__name__}")
+        for name, text in (("verbose", verbose), ("compact", compact), ("native tool", native)):
+            print(f"  {name:12s} {len(text):6d} chars  ~{estimate_tokens(text):5d} tokens  ({len(text) / len(verbose):.0%})")
+
+        start = time.perf_counter()
+        for _ in range(10000):
+            compact_instructions(model, omitted)
+        print(f"  precomputed lookup: {(time.perf_counter() - start) / 10000 * 1e6:.2f} us/call")
+
+def live(repeats: int):
+    validator = InputValidator()
+    for mode in OutputMode:
+        output = StructuredOutput(ValidationResult, mode)
+        prompt_tokens = parsed = calls = 0
+        for _ in range(repeats):
+            for text in SAMPLE_INPUTS:
+                messages = [
+                    SystemMessage(content="You are a helpful input validator."),
+                    HumanMessage(content=validator.prompt.format(
+                        input=text,
+                        metadata={"detected_type": InputType.NEW_QUERY},
+                        conversation_history="",
+                        format_instructions=output.instructions(validator.llm, SERVICE_FIELDS)
+                    ))
+                ]
+                response = output.bind(validator.llm, SERVICE_FIELDS).invoke(messages)
+                calls += 1
+                prompt_tokens += (response.usage_metadata or {}).get("input_tokens", 0)
+                try:
+                    data, _ = parse_json_object(output.text(response))
+                    if not fill_defaults(data, ValidationResult):
+                        ValidationResult(**data)
+                        parsed += 1
+                except Exception:
+                    pass
+        print(f"  {mode.value:8s} {prompt_tokens / calls:7.0f} prompt tokens/call  {parsed / calls:6.0%} parsed ({calls} calls)")
+
+def main():
+    offline()
+    if "--live" in sys.argv:
+        args = [arg for arg in sys.argv[1:] if arg != "--live"]
+        live(int(args[0]) if args else 5)
+
+if __name__ == "__main__":
+    main()
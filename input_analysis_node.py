@@ -1,11 +1,12 @@
 from typing import Dict, List, Optional
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage
 from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
-from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
 from langgraph.graph import StateGraph, START, END
 from dotenv import load_dotenv
+from app.utils.json_repair import fill_defaults, missing_fields_prompt, parse_json_object
+from app.utils.structured_output import StructuredOutput
 import os
 
 # Load environment variables
@@ -30,7 +31,7 @@ class InputAnalysisNode:
             api_key=os.getenv("GROQ_API_KEY"),
             model_name="mixtral-8x7b-32768"
         )
-        self.parser = PydanticOutputParser(pydantic_object=InputAnalysisOutput)
+        self.structured_output = StructuredOutput.from_env(InputAnalysisOutput)
         
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """You are an Input Analysis Node responsible for analyzing user input and determining next steps.
@@ -60,16 +61,26 @@ class InputAnalysisNode:
     def analyze(self, user_input: str, conversation_history: Optional[List[Dict]] = None) -> InputAnalysisOutput:
         formatted_prompt = self.prompt.format_messages(
             input=user_input,
-            format_instructions=self.parser.get_format_instructions()
+            format_instructions=self.structured_output.instructions(self.llm)
         )
         
         # Get response from LLM
-        response = self.llm.invoke(formatted_prompt)
+        response = self.structured_output.bind(self.llm).invoke(formatted_prompt)
+        response_text = self.structured_output.text(response)
         
-        # Parse the response into our Pydantic model
+        # Parse the response into our Pydantic model, repairing truncated JSON
         try:
-            parsed_response = self.parser.parse(response.content)
-            return parsed_response
+            data, _ = parse_json_object(response_text)
+            missing = fill_defaults(data, InputAnalysisOutput)
+            if missing:
+                # Ask for just the fields the response left out rather than analyzing again
+                follow_up = formatted_prompt + [
+                    AIMessage(content=response_text),
+                    HumanMessage(content=missing_fields_prompt(InputAnalysisOutput, data, missing))
+                ]
+                answered, _ = parse_json_object(self.structured_output.text(self.llm.invoke(follow_up)))
+                data.update({name: answered[name] for name in missing if name in answered})
+            return InputAnalysisOutput(**data)
         except Exception as e:
             raise Exception(f"Failed to parse LLM response: {str(e)}")
 
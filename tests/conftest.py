@@ -0,0 +1,58 @@
+import sys
+import os
+import json
+import asyncio
+import pytest
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from app.utils.input_validator import InputValidator
+from app.utils.session_memory import SessionMemoryStore
+from app.utils.result_cache import ValidationResultCache
+
+VALID_LLM_RESPONSE = {
+    "is_valid": True,
+    "has_background": True,
+    "has_goals": True,
+    "background_completeness": 0.8,
+    "goals_clarity": 0.8,
+    "clarity_score": 0.8,
+    "safety_score": 1.0,
+    "input_type": "new_query"
+}
+
+class FakeMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+class FakeLLM:
+    """Stand-in for ChatGroq that records calls and returns a canned response"""
+    def __init__(self, response: dict = None, delay: float = 0.0):
+        self.response = response or VALID_LLM_RESPONSE
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def ainvoke(self, messages, **kwargs):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            return FakeMessage(json.dumps(self.response))
+        finally:
+            self.in_flight -= 1
+
+@pytest.fixture
+def fake_llm():
+    return FakeLLM()
+
+@pytest.fixture
+def validator(fake_llm):
+    validator = InputValidator(memory_store=SessionMemoryStore(), result_cache=ValidationResultCache())
+    validator.llm = fake_llm
+    return validator
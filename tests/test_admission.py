@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+
+from app.middleware.admission import AdmissionController
+from app.utils.exceptions import OverloadedError
+
+@pytest.mark.asyncio
+async def test_sheds_when_queue_is_full():
+    controller = AdmissionController(initial_limit=1, max_queue=1, queue_timeout=1.0)
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.admit():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    queued = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    assert controller.in_flight == 1
+    assert controller.queue_depth == 1
+
+    with pytest.raises(OverloadedError) as exc_info:
+        async with controller.admit():
+            pass
+    assert exc_info.value.retry_after >= 1
+    assert controller.metrics()["shed_count"] == 1
+
+    release.set()
+    await asyncio.gather(holder, queued)
+    assert controller.in_flight == 0
+    assert controller.queue_depth == 0
+
+@pytest.mark.asyncio
+async def test_queue_timeout_sheds_and_frees_waiter():
+    controller = AdmissionController(initial_limit=1, max_queue=4, queue_timeout=0.01)
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.admit():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    with pytest.raises(OverloadedError):
+        async with controller.admit():
+            pass
+    assert controller.queue_depth == 0
+
+    release.set()
+    await holder
+    assert controller.in_flight == 0
+
+def test_limit_adapts_to_latency():
+    controller = AdmissionController(initial_limit=10, max_limit=20)
+    controller.in_flight = 10
+    for _ in range(20):
+        controller._record_sample(0.1, failed=False)
+    grown = controller.limit
+    assert grown > 10
+
+    controller._last_decrease = 0.0
+    controller._record_sample(5.0, failed=False)
+    assert controller.limit < grown
+
+    controller._last_decrease = 0.0
+    before = controller.limit
+    controller._record_sample(0.1, failed=True)
+    assert controller.limit < before
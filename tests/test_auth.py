@@ -0,0 +1,65 @@
+import time
+import jwt
+import pytest
+from types import SimpleNamespace
+from fastapi import HTTPException
+
+from app.middleware import auth
+
+SECRET = "test-secret-" * 4
+NEW_SECRET = "rotated-secret-" * 4
+
+@pytest.fixture(autouse=True)
+def secrets(monkeypatch):
+    monkeypatch.setenv("JWT_SECRET", SECRET)
+    monkeypatch.delenv("JWT_SECRET_PREVIOUS", raising=False)
+    auth.reload_jwt_secret()
+    yield
+    auth.token_cache.clear()
+
+def make_request(token):
+    return SimpleNamespace(headers={"Authorization": f"Bearer {token}"}, state=SimpleNamespace())
+
+def test_verified_tokens_are_cached():
+    token = jwt.encode({"user_id": "u1", "exp": int(time.time()) + 60}, SECRET, algorithm="HS256")
+    auth.auth_middleware(make_request(token))
+    hits = auth.token_cache.hits
+
+    request = make_request(token)
+    auth.auth_middleware(request)
+    assert request.state.user["user_id"] == "u1"
+    assert auth.token_cache.hits == hits + 1
+
+def test_cached_token_expires_with_exp():
+    token = jwt.encode({"user_id": "u1", "exp": int(time.time()) - 1}, SECRET, algorithm="HS256")
+    auth.token_cache.put(token, {"user_id": "u1", "exp": int(time.time()) - 1})
+    assert auth.token_cache.get(token) is None
+
+    with pytest.raises(HTTPException) as exc_info:
+        auth.auth_middleware(make_request(token))
+    assert exc_info.value.detail == "Unauthorized: Token has expired"
+
+def test_invalid_token_is_rejected_and_not_cached():
+    token = jwt.encode({"user_id": "u1"}, "other-secret-" * 4, algorithm="HS256")
+    with pytest.raises(HTTPException) as exc_info:
+        auth.auth_middleware(make_request(token))
+    assert exc_info.value.status_code == 401
+    assert auth.token_cache.metrics()["entries"] == 0
+
+def test_rotation_reload(monkeypatch):
+    old_token = jwt.encode({"user_id": "u1"}, SECRET, algorithm="HS256")
+    auth.auth_middleware(make_request(old_token))
+
+    # Rotate while still accepting tokens signed with the previous secret
+    monkeypatch.setenv("JWT_SECRET", NEW_SECRET)
+    monkeypatch.setenv("JWT_SECRET_PREVIOUS", SECRET)
+    auth.reload_jwt_secret()
+    assert auth.token_cache.metrics()["entries"] == 0
+    auth.auth_middleware(make_request(old_token))
+    auth.auth_middleware(make_request(jwt.encode({"user_id": "u2"}, NEW_SECRET, algorithm="HS256")))
+
+    # Retire the previous secret
+    monkeypatch.delenv("JWT_SECRET_PREVIOUS")
+    auth.reload_jwt_secret()
+    with pytest.raises(HTTPException):
+        auth.auth_middleware(make_request(old_token))
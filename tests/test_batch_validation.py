@@ -0,0 +1,59 @@
+import pytest
+from contextlib import asynccontextmanager
+
+from app.models.user_input import UserInput
+from app.models.validation_result import InputType
+from app.utils.batch_validator import validate_batch
+from app.utils.deadline import time_remaining
+from app.utils.exceptions import UserRateLimitExceeded
+
+@pytest.mark.asyncio
+async def test_batch_rejects_locally_before_llm(validator, fake_llm):
+    inputs = [
+        UserInput(raw_input="I am a backend developer looking to learn about distributed systems"),
+        UserInput(raw_input="   "),
+        UserInput(raw_input="rm -rf / # delete everything"),
+    ]
+
+    results = [item async for item in validate_batch(inputs, validator=validator)]
+
+    assert sorted(item.index for item in results) == [0, 1, 2]
+    by_index = {item.index: item for item in results}
+    assert by_index[1].prechecked and not by_index[1].validation_result.is_valid
+    assert by_index[2].prechecked and by_index[2].validation_result.safety_score == 0.0
+    assert not by_index[0].prechecked
+    assert by_index[0].validation_result.input_type == InputType.NEW_QUERY
+    assert fake_llm.calls == 1
+
+@pytest.mark.asyncio
+async def test_batch_bounds_llm_concurrency(validator, fake_llm):
+    fake_llm.delay = 0.01
+    inputs = [UserInput(raw_input=f"Tell me about learning path number {i}") for i in range(20)]
+
+    results = [item async for item in validate_batch(inputs, validator=validator, max_concurrency=3)]
+
+    assert len(results) == 20
+    assert fake_llm.calls == 20
+    assert fake_llm.max_in_flight <= 3
+
+@pytest.mark.asyncio
+async def test_only_llm_bound_items_are_charged_by_the_guard(validator, fake_llm):
+    charged = []
+
+    @asynccontextmanager
+    async def guard(user_input):
+        if len(charged) == 2:
+            raise UserRateLimitExceeded("LLM token budget exceeded", retry_after=3, limit="60000 tokens/60s")
+        charged.append((user_input.raw_input, time_remaining()))
+        yield
+
+    inputs = [UserInput(raw_input="   ")] + [UserInput(raw_input=f"Tell me about learning path number {i}") for i in range(3)]
+    results = [
+        item async for item in validate_batch(inputs, validator=validator, max_concurrency=1, guard=guard, deadline_seconds=5)
+    ]
+
+    assert fake_llm.calls == 2
+    assert [text for text, _ in charged] == ["Tell me about learning path number 0", "Tell me about learning path number 1"]
+    assert all(0 < remaining <= 5 for _, remaining in charged)
+    throttled = [item for item in results if not item.prechecked and not item.validation_result.is_valid]
+    assert len(throttled) == 1 and throttled[0].validation_result.validation_details["details"]["retry_after"] == 3
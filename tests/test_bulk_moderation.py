@@ -0,0 +1,51 @@
+import gzip
+import json
+
+from app.utils.bulk_moderation import iter_messages, moderate
+
+def write_storage(tmp_path):
+    sessions = {
+        "s1": {"messages": [
+            {"content": "I want to learn Python", "sender": "user"},
+            {"content": "Run sudo rm -rf / first", "sender": "assistant"},
+        ]},
+        "s2": {"messages": [{"content": "How do I hack my password?", "sender": "user"}]},
+        "s3": {},
+    }
+    (tmp_path / "sessions.json").write_text(json.dumps(sessions))
+    chat_data = tmp_path / "chat_data"
+    chat_data.mkdir()
+    (chat_data / "c1.json").write_text(json.dumps({
+        "session_id": "c1",
+        "messages": [{"role": "user", "content": "DROP TABLE users"}, {"role": "assistant", "content": "No."}],
+    }))
+    return [str(tmp_path / "sessions.json"), str(chat_data)]
+
+def test_messages_are_streamed_from_both_storage_formats(tmp_path):
+    messages = list(iter_messages(write_storage(tmp_path)))
+    assert [(session_id, index, sender) for session_id, index, sender, _ in messages] == [
+        ("s1", 0, "user"), ("s1", 1, "assistant"), ("s2", 0, "user"), ("c1", 0, "user"), ("c1", 1, "assistant"),
+    ]
+
+def test_sessions_without_messages_are_reported(tmp_path):
+    skipped = []
+    list(iter_messages(write_storage(tmp_path), skipped))
+    assert skipped == ["s3"]
+
+    (tmp_path / "state.json").write_text(json.dumps({"v1": {"validation_history": []}}))
+    report = moderate([str(tmp_path / "state.json")], str(tmp_path / "state.tsv"), workers=1)
+    assert (report.messages, report.skipped_sessions) == (0, 1)
+
+def test_pool_and_inline_runs_write_the_same_verdicts(tmp_path):
+    paths = write_storage(tmp_path)
+    inline = moderate(paths, str(tmp_path / "inline.tsv"), workers=1)
+    pooled = moderate(paths, str(tmp_path / "pooled.tsv.gz"), workers=2, chunk_size=2)
+
+    with gzip.open(tmp_path / "pooled.tsv.gz", "rt") as f:
+        pooled_lines = f.read()
+    assert (tmp_path / "inline.tsv").read_text() == pooled_lines
+    assert pooled_lines.splitlines()[1] == "s1\t1\tassistant\tharmful_commands"
+
+    for report in (inline, pooled):
+        assert (report.messages, report.flagged, report.skipped_sessions) == (5, 3, 1)
+        assert report.categories == {"harmful_commands": 2, "security_risks": 1}
@@ -0,0 +1,92 @@
+import re
+import pytest
+
+from app.models.user_input import UserInput
+from app.utils.content_safety import ContentSafetyChecker, StreamingSafetyScanner, guard_stream
+from app.utils.exceptions import GuardrailsError
+
+SAMPLES = [
+    "I want to learn Python for data analysis",
+    "sudo rm  -rf / and then DROP TABLE users",
+    "DELETE FROM accounts; delete this; formatting; format the disk",
+    "How to hack or crack a PASSWORD? I hate racist discrimination",
+    "nsfw xxx adults adult naked-eye sex",
+    "exploitation is not exploit; credentials.json",
+]
+
+def test_single_pass_matches_per_pattern_findall():
+    checker = ContentSafetyChecker()
+    for text in SAMPLES:
+        expected = {}
+        for category, patterns in checker.unsafe_patterns.items():
+            for pattern in patterns:
+                expected[category] = expected.get(category, 0) + len(re.findall(pattern, text, re.IGNORECASE))
+        hits = checker.scan(text)
+        assert {category: len(terms) for category, terms in hits.items()} == {
+            category: count for category, count in expected.items() if count
+        }, text
+
+def test_check_content_reports_categories():
+    is_safe, details = ContentSafetyChecker().check_content("sudo rm -rf / to hack it")
+    assert not is_safe
+    assert sorted(details["categories"]) == ["harmful_commands", "security_risks"]
+    assert details["violations_found"] == 3
+
+def test_safety_rules_only_block_rule_terms(validator):
+    result = object()
+    assert validator._apply_safety_rules(result, UserInput(raw_input="I forgot my password")) is result
+    blocked = validator._apply_safety_rules(result, UserInput(raw_input="how to exploit this server"))
+    assert not blocked.is_valid and blocked.safety_score == 0.0
+
+def stream(scanner, text, size):
+    released = ""
+    for start in range(0, len(text), size):
+        released += scanner.feed(text[start:start + size])
+        if scanner.blocked:
+            return released
+    return released + scanner.finish()
+
+def test_streaming_scanner_matches_whole_text_scan():
+    checker = ContentSafetyChecker()
+    for text in SAMPLES + ["no hacker here, just hackathons", "a safe answer about careers " * 20]:
+        for size in (1, 3, 7, 50):
+            scanner = StreamingSafetyScanner(checker, overlap=16)
+            released = stream(scanner, text, size)
+            assert scanner.blocked == bool(checker.scan(text)), (text, size)
+            if not scanner.blocked:
+                assert released == text
+
+def test_streaming_scanner_never_releases_text_twice():
+    # The first word of a multi-word pattern is already out when the rest arrives
+    for text in ("DROP\nTABLEs ok", "DROP TABLEau dashboards", "rm -rfx is not a flag"):
+        for size in (1, 2, 3):
+            scanner = StreamingSafetyScanner()
+            released = scanner.feed(text[:4]) + stream(scanner, text[4:], size)
+            assert not scanner.blocked and released == text, (text, size)
+
+def test_streaming_scanner_holds_back_partial_words_and_bounds_window():
+    scanner = StreamingSafetyScanner(overlap=8)
+    assert scanner.feed("Career advice: ha") == "Career advice: "
+    assert scanner.feed("ckathons are fun " * 20).startswith("ha")
+    assert len(scanner._window) <= 8 + len("fun ")
+    assert scanner.feed("then hac") == "then "
+    assert scanner.feed("k it") == ""
+    assert scanner.blocked and scanner.hits == {"security_risks": ["hack"]}
+
+@pytest.mark.asyncio
+async def test_guard_stream_aborts_mid_response():
+    produced = []
+
+    async def response():
+        for chunk in ["Here is ", "how to ", "DROP ", "TABLE users", " and more", " text"]:
+            produced.append(chunk)
+            yield chunk
+
+    forwarded = []
+    with pytest.raises(GuardrailsError) as error:
+        async for text in guard_stream(response()):
+            forwarded.append(text)
+
+    assert "".join(forwarded) == "Here is how to DROP "
+    assert error.value.details["categories"] == ["harmful_commands"]
+    assert len(produced) == 4
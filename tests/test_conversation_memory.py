@@ -0,0 +1,47 @@
+import random
+
+from app.models.conversation_memory import ConversationMemory, ConversationTurn
+
+def random_turn(rng, i):
+    keys = ["language", "level", "format", "pace"]
+    return ConversationTurn(
+        user_input=f"turn {i}",
+        input_type="new_query",
+        preferences={key: f"{key}-{rng.randint(0, 3)}" for key in rng.sample(keys, rng.randint(0, 2))},
+        background_info={key: f"{key}-{rng.randint(0, 3)}" for key in rng.sample(["role", "years"], rng.randint(0, 2))},
+        goals=rng.sample(["learn go", "get promoted", "switch teams", "ship faster"], rng.randint(0, 2))
+    )
+
+def rescan(turns):
+    preferences, background, goals = {}, {}, set()
+    for turn in turns:
+        preferences.update(turn.preferences)
+        background.update(turn.background_info)
+        goals.update(turn.goals)
+    return preferences, background, goals
+
+def test_aggregates_track_evictions():
+    rng = random.Random(7)
+    memory = ConversationMemory(max_turns=5)
+    for i in range(200):
+        memory.add_turn(random_turn(rng, i))
+        preferences, background, goals = rescan(memory.turns)
+        assert memory.get_all_preferences() == preferences
+        assert memory.get_background_info() == background
+        assert set(memory.get_goals()) == goals
+    assert len(memory.turns) == 5
+    assert [turn.user_input for turn in memory.get_recent_context(2)] == ["turn 198", "turn 199"]
+
+def test_round_trip_rebuilds_aggregates():
+    rng = random.Random(3)
+    memory = ConversationMemory(max_turns=50)
+    for i in range(20):
+        memory.add_turn(random_turn(rng, i))
+
+    restored = ConversationMemory.model_validate_json(memory.model_dump_json())
+    assert restored.get_all_preferences() == memory.get_all_preferences()
+    assert set(restored.get_goals()) == set(memory.get_goals())
+
+    shrunk = ConversationMemory.model_validate({**memory.model_dump(), "max_turns": 4})
+    assert [turn.user_input for turn in shrunk.turns] == [f"turn {i}" for i in range(16, 20)]
+    assert shrunk.get_all_preferences() == rescan(shrunk.turns)[0]
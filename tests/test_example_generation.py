@@ -0,0 +1,36 @@
+import socket
+import pytest
+from types import SimpleNamespace
+
+from app.nodes import example_generation
+from app.nodes.example_generation import verify_examples
+
+def resolve(addresses):
+    def getaddrinfo(host, port, *args, **kwargs):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (addresses[host], port))]
+    return getaddrinfo
+
+@pytest.mark.asyncio
+async def test_internal_links_are_never_fetched(monkeypatch):
+    fetched = []
+
+    def head(url, **kwargs):
+        fetched.append(url)
+        # The public docs site redirects to the cloud metadata service
+        return SimpleNamespace(status_code=302, is_redirect=True, headers={"location": "http://metadata.internal/latest"})
+
+    monkeypatch.setattr(example_generation.socket, "getaddrinfo", resolve({
+        "docs.example.com": "93.184.216.34", "metadata.internal": "169.254.169.254", "localhost": "127.0.0.1"
+    }))
+    monkeypatch.setattr(example_generation.requests, "head", head)
+
+    examples = await verify_examples([
+        {"url": "http://localhost:8000/api/metrics"},
+        {"url": "file:///etc/passwd"},
+        {"url": "https://docs.example.com/tutorial"},
+    ])
+
+    assert fetched == ["https://docs.example.com/tutorial"]
+    assert all(example["verification"]["status"] == "unverified" for example in examples)
+    assert examples[0]["verification"]["error"] == "Link points to a non-public address"
+    assert examples[2]["verification"]["error"] == "Link points to a non-public address"
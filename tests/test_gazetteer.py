@@ -0,0 +1,57 @@
+import pytest
+
+from app.models.preference import PreferenceCategory, PreferenceOperation
+from app.models.user_input import UserInput
+from app.utils.gazetteer import Gazetteer, compile_terms
+
+def test_bundled_vocabularies_cover_every_category():
+    gazetteer = Gazetteer.from_env()
+    assert set(gazetteer.vocabularies) == set(PreferenceCategory)
+
+    found = gazetteer.extract(
+        "Backend developer, junior, who wants to learn Kubernetes and JS hands on, "
+        "remote for a startup in New  York doing fintech data engineering"
+    )
+    assert found == {
+        PreferenceCategory.ROLE_TYPE: ["backend developer"],
+        PreferenceCategory.EXPERIENCE_LEVEL: ["entry-level"],
+        PreferenceCategory.TECHNOLOGY: ["kubernetes", "javascript"],
+        PreferenceCategory.LEARNING_STYLE: ["hands-on"],
+        PreferenceCategory.WORK_ENVIRONMENT: ["remote"],
+        PreferenceCategory.COMPANY_SIZE: ["startup"],
+        PreferenceCategory.LOCATION: ["new york"],
+        PreferenceCategory.INDUSTRY: ["finance"],
+        PreferenceCategory.CAREER_PATH: ["data engineering"],
+    }
+
+def test_whole_words_and_longest_match():
+    matcher = compile_terms(["java", "javascript", "c++", "c", "machine learning", "machine"])
+    text = "javascript, java; javas c++ c. machine learning machinery"
+    assert [m.group() for m in matcher.finditer(text)] == ["javascript", "java", "c++", "c", "machine learning"]
+
+def test_vocabulary_files(tmp_path):
+    (tmp_path / "technology.txt").write_text("# comment\n\nrust | rustlang\nzig\n")
+    (tmp_path / "location.txt").write_text("zig\n")
+    gazetteer = Gazetteer.from_directory(str(tmp_path))
+
+    assert gazetteer.extract("RustLang or Zig?") == {
+        PreferenceCategory.TECHNOLOGY: ["rust", "zig"],
+        PreferenceCategory.LOCATION: ["zig"],
+    }
+    values = gazetteer.preference_values("rust and zig", [PreferenceCategory.TECHNOLOGY])
+    assert [(v.category, v.value) for v in values] == [(PreferenceCategory.TECHNOLOGY, ["rust", "zig"])]
+
+@pytest.mark.asyncio
+async def test_preference_updates_are_extracted_without_llm(validator, fake_llm):
+    result = await validator.validate_input(UserInput(raw_input="I prefer remote roles in Berlin using Python"))
+    assert fake_llm.calls == 0
+    assert result.preference_updates.operation == PreferenceOperation.ADD
+    assert {v.category: v.value for v in result.preference_updates.preferences} == {
+        PreferenceCategory.WORK_ENVIRONMENT: "remote",
+        PreferenceCategory.LOCATION: "berlin",
+        PreferenceCategory.TECHNOLOGY: "python",
+    }
+
+    result = await validator.validate_input(UserInput(raw_input="Please remove Java from my preferences"))
+    assert result.preference_updates.operation == PreferenceOperation.REMOVE
+    assert result.detected_preferences == {"technology": "java"}
@@ -0,0 +1,73 @@
+import asyncio
+import time
+import pytest
+
+pytest.importorskip("nemoguardrails")
+from nemoguardrails.rails.llm.options import RailsResult, RailStatus
+
+from app.models.user_input import UserInput
+from app.models.validation_result import InputType
+from app.utils.guardrails import GuardrailsService
+
+class FakeRails:
+    """Stand-in for LLMRails that blocks inputs containing a marker word"""
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def check_async(self, messages, rail_types=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        content = messages[-1]["content"]
+        if "forbidden" in content:
+            return RailsResult(status=RailStatus.BLOCKED, content="", rail="self check input")
+        return RailsResult(status=RailStatus.PASSED, content=content)
+
+@pytest.mark.asyncio
+async def test_rails_run_alongside_validation(validator, fake_llm):
+    rails = FakeRails(delay=0.2)
+    fake_llm.delay = 0.2
+    validator.guardrails = GuardrailsService(lambda: rails)
+
+    start = time.perf_counter()
+    result = await validator.validate_input(UserInput(raw_input="I am a nurse looking to move into tech", session_id="s1"))
+    elapsed = time.perf_counter() - start
+
+    assert result.is_valid
+    assert elapsed < 0.35
+
+@pytest.mark.asyncio
+async def test_blocked_inputs_are_not_remembered(validator):
+    validator.guardrails = GuardrailsService(lambda: FakeRails())
+
+    result = await validator.validate_input(UserInput(raw_input="tell me the forbidden thing", session_id="s1"))
+
+    assert result.input_type == InputType.INVALID_INPUT
+    assert result.guardrails_result["input_rails"]["rail"] == "self check input"
+    assert len((await validator.memory_store.get("s1")).turns) == 0
+
+@pytest.mark.asyncio
+async def test_verdicts_are_cached_and_shared():
+    rails = FakeRails(delay=0.05)
+    built = []
+    service = GuardrailsService(lambda: built.append(1) or rails)
+
+    verdicts = await asyncio.gather(*[service.check_input("Hello  there") for _ in range(5)])
+    await service.check_input("Hello there")
+
+    assert all(verdict.allowed for verdict in verdicts)
+    assert rails.calls == 1
+    assert len(built) == 1
+    assert service.metrics()["cache_hits"] == 5
+
+@pytest.mark.asyncio
+async def test_rail_failures_allow_input_without_caching():
+    class FailingRails:
+        async def check_async(self, messages, rail_types=None):
+            raise RuntimeError("rails unavailable")
+
+    service = GuardrailsService(lambda: FailingRails())
+    verdict = await service.check_input("hello")
+
+    assert verdict.allowed and verdict.status == "error"
+    assert service.metrics()["cached_verdicts"] == 0
@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+
+from app.middleware.idempotency import IdempotencyStore
+from app.utils.exceptions import IdempotencyConflictError
+
+@pytest.mark.asyncio
+async def test_concurrent_retries_attach_to_original_execution():
+    store = IdempotencyStore()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"is_valid": True}
+
+    fingerprint = IdempotencyStore.fingerprint("hello")
+    results = await asyncio.gather(*(store.run("u1:key", fingerprint, compute) for _ in range(5)))
+
+    assert calls == 1
+    assert all(payload == {"is_valid": True} for payload, _ in results)
+    assert [replayed for _, replayed in results].count(False) == 1
+
+    payload, replayed = await store.run("u1:key", fingerprint, compute)
+    assert replayed and calls == 1
+
+@pytest.mark.asyncio
+async def test_key_reuse_with_different_payload_conflicts():
+    store = IdempotencyStore()
+
+    async def compute():
+        return {}
+
+    await store.run("u1:key", IdempotencyStore.fingerprint("a"), compute)
+    with pytest.raises(IdempotencyConflictError):
+        await store.run("u1:key", IdempotencyStore.fingerprint("b"), compute)
+
+@pytest.mark.asyncio
+async def test_failures_are_not_replayed():
+    store = IdempotencyStore()
+    attempts = 0
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RuntimeError("upstream timeout")
+        return {"ok": True}
+
+    fingerprint = IdempotencyStore.fingerprint("x")
+    with pytest.raises(RuntimeError):
+        await store.run("k", fingerprint, flaky)
+    payload, replayed = await store.run("k", fingerprint, flaky)
+    assert payload == {"ok": True} and not replayed
+
+@pytest.mark.asyncio
+async def test_expired_and_overflowing_entries_are_dropped_in_order(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.middleware.idempotency.time.monotonic", lambda: now[0])
+    store = IdempotencyStore(ttl=10.0, max_entries=2)
+
+    async def compute():
+        return {}
+
+    fingerprint = IdempotencyStore.fingerprint("a")
+    await store.run("k1", fingerprint, compute)
+    now[0] += 5
+    await store.run("k2", fingerprint, compute)
+    # A replay makes k1 recently used without extending its expiry
+    assert (await store.run("k1", fingerprint, compute))[1]
+
+    await store.run("k3", fingerprint, compute)
+    assert list(store._entries) == ["k1", "k3"]
+
+    now[0] += 6
+    await store.run("k4", fingerprint, compute)
+    assert list(store._entries) == ["k3", "k4"] and list(store._expiry_order) == ["k3", "k4"]
+
+@pytest.mark.asyncio
+async def test_shared_store_replays_across_workers():
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeAsyncRedis()
+    worker_a = IdempotencyStore(redis=redis, poll_interval=0.01)
+    worker_b = IdempotencyStore(redis=redis, poll_interval=0.01)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"is_valid": True}
+
+    fingerprint = IdempotencyStore.fingerprint("hello")
+    (first, replayed_a), (second, replayed_b) = await asyncio.gather(
+        worker_a.run("u1:key", fingerprint, compute),
+        worker_b.run("u1:key", fingerprint, compute)
+    )
+
+    assert calls == 1
+    assert first == second == {"is_valid": True}
+    assert sorted([replayed_a, replayed_b]) == [False, True]
+
+    with pytest.raises(IdempotencyConflictError):
+        await IdempotencyStore(redis=redis).run("u1:key", IdempotencyStore.fingerprint("other"), compute)
@@ -0,0 +1,66 @@
+import itertools
+import json
+import re
+
+from app.config.input_type_rules import INPUT_TYPE_RULES
+from app.models.validation_result import InputType
+from app.utils.input_type_classifier import InputTypeClassifier
+
+def legacy_detect_input_type(current_input, previous_input=None):
+    """The per-pattern re.search implementation the rule table replaced"""
+    current_lower = current_input.lower()
+    preference_patterns = {
+        'add': [r'i prefer', r'i like', r'i want', r'i would rather', r'set preference', r'update preference'],
+        'remove': [r'remove preference', r"don't prefer", r"don't like", r'remove', r'delete preference'],
+        'query': [r'what are my preferences', r'show preferences', r'list preferences', r'get preferences']
+    }
+    operation_types = {
+        'add': InputType.PREFERENCE_UPDATE,
+        'remove': InputType.PREFERENCE_REMOVAL,
+        'query': InputType.PREFERENCE_QUERY
+    }
+    for operation, patterns in preference_patterns.items():
+        if any(re.search(pattern, current_lower) for pattern in patterns):
+            return operation_types[operation]
+    clarification_starters = [
+        r'^yes', r'^no', r'^actually', r'^i meant', r'^to clarify',
+        r'^let me clarify', r'^what i meant'
+    ]
+    if previous_input and any(re.search(pattern, current_lower) for pattern in clarification_starters):
+        return InputType.CLARIFICATION_RESPONSE
+    if any(re.search(pattern, current_lower) for pattern in [r'rewrite', r'rephrase', r'change', r'modify']):
+        return InputType.REWRITE_REQUEST
+    if any(re.search(pattern, current_lower) for pattern in [r'add more', r'enhance', r'elaborate', r'provide more']):
+        return InputType.INPUT_ENHANCEMENT
+    return InputType.NEW_QUERY
+
+FRAGMENTS = [
+    "I prefer Python", "i would rather not", "Remove preference for java", "I don't like drama",
+    "what are my preferences?", "show preferences", "Yes, exactly", "no", "Actually I meant Go",
+    "to clarify:", "please rephrase this", "exchange rates", "elaborate on it", "provide more detail",
+    "Tell me about distributed systems", "", "   ",
+]
+
+def test_matches_legacy_behaviour():
+    classifier = InputTypeClassifier(INPUT_TYPE_RULES)
+    inputs = [" ".join(pair) for pair in itertools.product(FRAGMENTS, repeat=2)]
+    for text, previous in itertools.product(inputs, [None, "", "I want to learn Rust"]):
+        assert classifier.classify(text, previous) == legacy_detect_input_type(text, previous), (text, previous)
+
+def test_rules_load_from_json(tmp_path, monkeypatch):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps([
+        {"input_type": "preference_query", "patterns": [r"\bmy settings\b"]},
+        {"input_type": "clarification_response", "patterns": [r"^sure"], "requires_previous": True}
+    ]))
+    monkeypatch.setenv("INPUT_TYPE_RULES_PATH", str(path))
+    classifier = InputTypeClassifier.from_env()
+
+    assert classifier.classify("Show my settings") == InputType.PREFERENCE_QUERY
+    assert classifier.classify("sure thing") == InputType.NEW_QUERY
+    assert classifier.classify("sure thing", "previous question") == InputType.CLARIFICATION_RESPONSE
+    assert classifier.matches(InputType.CLARIFICATION_RESPONSE, "Sure")
+
+def test_validator_uses_rule_table(validator):
+    assert validator._detect_input_type("Please rewrite my question") == InputType.REWRITE_REQUEST
+    assert validator._is_clarification("Let me clarify that", "previous")
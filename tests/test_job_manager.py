@@ -0,0 +1,114 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+
+from app.models.job import JobStatus
+from app.utils.exceptions import OverloadedError
+from app.utils.job_manager import JobManager
+from app.utils.llm_client import record_token_usage
+
+async def slow_double(params, report):
+    report(0.5, "Halfway")
+    await asyncio.sleep(0.01)
+    return {"value": params["value"] * 2}
+
+async def failing(params, report):
+    raise RuntimeError("boom")
+
+@pytest.mark.asyncio
+async def test_job_runs_and_streams_progress():
+    manager = JobManager(max_workers=2)
+    manager.register("double", slow_double)
+
+    job = manager.submit("double", {"value": 21}, user_id="u1")
+    updates = [update async for update in manager.watch(job.job_id) if update is not None]
+
+    assert updates[-1].status == JobStatus.SUCCEEDED
+    assert updates[-1].result == {"value": 42}
+    assert any(update.message == "Halfway" for update in updates)
+    await manager.stop()
+
+@pytest.mark.asyncio
+async def test_identical_submission_reuses_cached_job():
+    manager = JobManager(max_workers=1)
+    manager.register("double", slow_double)
+
+    first = manager.submit("double", {"value": 1}, user_id="u1")
+    second = manager.submit("double", {"value": 1}, user_id="u1")
+    other_user = manager.submit("double", {"value": 1}, user_id="u2")
+
+    assert second.job_id == first.job_id
+    assert other_user.job_id != first.job_id
+    await manager.stop()
+
+@pytest.mark.asyncio
+async def test_failed_and_expired_jobs():
+    manager = JobManager(max_workers=1, result_ttl=0.0)
+    manager.register("fail", failing)
+
+    job = manager.submit("fail", {})
+    updates = [update async for update in manager.watch(job.job_id) if update is not None]
+    assert updates[-1].status == JobStatus.FAILED
+    assert updates[-1].error == "boom"
+
+    await asyncio.sleep(0.001)
+    assert manager.get(job.job_id) is None
+    await manager.stop()
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected():
+    manager = JobManager(max_workers=1, max_queue=1)
+    manager.register("double", slow_double)
+
+    manager.submit("double", {"value": 1})
+    await asyncio.sleep(0)
+    manager.submit("double", {"value": 2})
+    with pytest.raises(OverloadedError):
+        manager.submit("double", {"value": 3})
+    with pytest.raises(ValueError):
+        manager.submit("unknown", {})
+    await manager.stop()
+
+@pytest.mark.asyncio
+async def test_other_worker_follows_job_through_shared_store():
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeAsyncRedis()
+    owner = JobManager(max_workers=1, redis=redis)
+    owner.register("double", slow_double)
+    other = JobManager(redis=redis, poll_interval=0.005)
+
+    job = owner.submit("double", {"value": 21}, user_id="u1")
+    # Mirror writes are fire-and-forget; wait until the job is visible elsewhere
+    while await other.fetch(job.job_id) is None:
+        await asyncio.sleep(0.001)
+    updates = [update async for update in other.watch(job.job_id) if update is not None]
+
+    assert updates[-1].status == JobStatus.SUCCEEDED
+    assert updates[-1].result == {"value": 42}
+    fetched = await other.fetch(job.job_id)
+    assert fetched.user_id == "u1"
+    assert await other.fetch("missing") is None
+    await owner.stop()
+
+@pytest.mark.asyncio
+async def test_tokens_used_by_a_job_are_reported_on_finish():
+    async def call_llm(params, report):
+        record_token_usage(SimpleNamespace(usage_metadata={"total_tokens": 300}))
+        await asyncio.sleep(0.01)
+        return {}
+
+    settled = []
+
+    async def on_finish(tokens):
+        settled.append(tokens)
+
+    manager = JobManager(max_workers=1)
+    manager.register("llm", call_llm)
+    job = manager.submit("llm", {}, user_id="u1", on_finish=on_finish)
+    # A resubmission reuses the job, so nothing it reserved is spent
+    manager.submit("llm", {}, user_id="u1", on_finish=on_finish)
+    [update async for update in manager.watch(job.job_id)]
+    await asyncio.gather(*manager._pending_tasks)
+
+    assert settled == [0, 300]
+    await manager.stop()
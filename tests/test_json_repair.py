@@ -0,0 +1,90 @@
+import json
+import pytest
+
+from app.models.user_input import UserInput
+from app.models.validation_result import ValidationResult
+from app.utils.exceptions import ParsingError
+from app.utils.json_repair import fill_defaults, parse_json_object
+
+RESPONSE = {
+    "is_valid": True,
+    "has_background": True,
+    "has_goals": False,
+    "background_completeness": 0.85,
+    "goals": ["learn rust", "ship \"v2\""],
+    "background_info": {"role": "developer", "skills": "python, go"},
+    "input_type": "new_query"
+}
+
+class Message:
+    def __init__(self, content: str):
+        self.content = content
+
+def test_object_is_found_in_prose_and_fences():
+    text = "Sure! Here is the analysis:\n```json\n" + json.dumps(RESPONSE, indent=2) + "\n```\nLet me know {if} that helps."
+    assert parse_json_object(text) == (RESPONSE, False)
+
+def test_trailing_commas_and_python_literals_are_fixed():
+    data, repaired = parse_json_object('{"a": [1, 2,], "b": True, "c": None, "d": {"e": False,},}')
+    assert repaired
+    assert data == {"a": [1, 2], "b": True, "c": None, "d": {"e": False}}
+
+def test_every_truncation_parses_to_a_prefix():
+    text = json.dumps(RESPONSE)
+    for end in range(1, len(text)):
+        data, repaired = parse_json_object(text[:end])
+        assert repaired
+        for name, value in data.items():
+            if isinstance(value, str) and value != RESPONSE[name]:
+                # Only the string being written when the response was cut off is partial
+                assert RESPONSE[name].startswith(value)
+            elif name not in ("goals", "background_info"):
+                assert value == RESPONSE[name]
+
+def test_truncation_inside_unicode_escapes():
+    response = {"role": "caf\u00e9 owner", "city": "Z\u00fcrich \U0001f3d4\ufe0f", "goals": ["na\u00efve \\u00 text"]}
+    text = json.dumps(response)
+    assert "\\ud83c" in text
+    for end in range(1, len(text)):
+        data, _ = parse_json_object(text[:end])
+        for name, value in data.items():
+            if isinstance(value, str):
+                # Never a cut-off escape or half of a surrogate pair
+                assert response[name].startswith(value)
+
+def test_truncated_values_are_closed_or_dropped():
+    assert parse_json_object('{"role": "data engin')[0] == {"role": "data engin"}
+    assert parse_json_object('{"goals": ["a", "b"], "score": 0.8')[0] == {"goals": ["a", "b"]}
+    assert parse_json_object('{"ok": true, "info": {"x": [1, {"y": nul')[0] == {"ok": True, "info": {"x": [1, {}]}}
+
+def test_no_object_is_an_error():
+    with pytest.raises(ParsingError):
+        parse_json_object("I cannot help with that.")
+
+def test_defaults_are_filled_and_required_fields_reported():
+    data = {"is_valid": True, "has_background": False}
+    missing = fill_defaults(data, ValidationResult)
+    assert missing == ["has_goals", "background_completeness", "goals_clarity", "input_type"]
+    assert data["safety_score"] == 1.0 and data["goals"] == []
+
+@pytest.mark.asyncio
+async def test_only_missing_fields_are_requested_again(validator, fake_llm):
+    prompts = []
+
+    async def ainvoke(messages, **kwargs):
+        prompts.append(messages[-1].content)
+        if len(prompts) == 1:
+            # Cut off after the first few fields
+            return Message(json.dumps(fake_llm.response)[:60])
+        return Message('{"background_completeness": 0.4, "goals_clarity": 0.7}')
+
+    fake_llm.ainvoke = ainvoke
+    result = await validator.validate_input(
+        UserInput(raw_input="Tell me about careers in distributed systems and what the market looks like these days")
+    )
+
+    assert len(prompts) == 2
+    assert "background_completeness, goals_clarity" in prompts[1]
+    assert '"is_valid"' not in prompts[1].split("Keys and types")[1]
+    assert result.is_valid and not result.degraded
+    assert result.background_completeness == 0.4 and result.goals_clarity == 0.7
@@ -0,0 +1,65 @@
+import json
+import pytest
+
+from app.models.user_input import UserInput
+from app.models.validation_result import InputType
+from app.utils.local_classifier import LocalClassifierStats, LocalInputClassifier, evaluate, load_samples
+
+BACKGROUNDS = ["I am a backend developer", "I'm a nurse with ten years of experience", "I work as a teacher"]
+GOALS = ["I want to move into machine learning", "my goal is to become a data engineer", "I plan to learn Rust"]
+REWRITES = ["please rephrase that", "can you rewrite my question", "modify the last request"]
+
+def make_samples():
+    samples = []
+    for background in BACKGROUNDS:
+        for goal in GOALS:
+            samples.append((f"{background} and {goal}", {"input_type": "new_query", "has_background": True, "has_goals": True}))
+        samples.append((background, {"input_type": "new_query", "has_background": True, "has_goals": False}))
+    for goal in GOALS:
+        samples.append((goal, {"input_type": "new_query", "has_background": False, "has_goals": True}))
+    for rewrite in REWRITES:
+        samples.append((rewrite, {"input_type": "rewrite_request", "has_background": False, "has_goals": False}))
+    return samples * 3
+
+@pytest.fixture(scope="module")
+def trained():
+    texts, labels = zip(*make_samples())
+    return LocalInputClassifier.train(texts, labels, epochs=150, threshold=0.8, shadow_rate=0.0)
+
+def test_trained_model_predicts_and_round_trips(trained, tmp_path):
+    prediction = trained.predict("I am a backend developer and I want to move into machine learning")
+    assert prediction.input_type == InputType.NEW_QUERY
+    assert prediction.has_background and prediction.has_goals
+    assert all(0.5 <= value <= 1.0 for value in prediction.confidences.values())
+
+    path = str(tmp_path / "model.npz")
+    trained.save(path)
+    loaded = LocalInputClassifier.load(path, threshold=0.8)
+    assert loaded.predict("please rephrase that").input_type == InputType.REWRITE_REQUEST
+
+def test_offline_report_from_logged_samples(trained, tmp_path):
+    path = tmp_path / "samples.jsonl"
+    lines = [json.dumps({"input": text, "validation_result": label}) for text, label in make_samples()[:10]]
+    path.write_text("\n".join(lines + ["not json", json.dumps({"message": "unrelated"})]))
+
+    texts, labels = load_samples(str(path))
+    report = evaluate(trained, texts, labels)
+    assert report["samples"] == 10
+    assert 0.0 <= report["skip_rate"] <= 1.0
+    assert report["agreement_overall"] >= 0.9
+
+@pytest.mark.asyncio
+async def test_validator_skips_llm_only_when_confident(validator, fake_llm, trained):
+    trained.stats = LocalClassifierStats()
+    trained.threshold = 0.0
+    validator.local_classifier = trained
+    result = await validator.validate_input(UserInput(raw_input="I work as a teacher and I plan to learn Rust"))
+    assert fake_llm.calls == 0
+    assert result.validation_details["source"] == "local_classifier"
+
+    trained.threshold = 1.01
+    await validator.validate_input(UserInput(raw_input="Tell me about distributed systems"))
+    assert fake_llm.calls == 1
+    metrics = trained.metrics()
+    assert metrics["skipped_llm"] == 1 and metrics["skip_rate"] == 0.5
+    assert metrics["uncertain_agreement"] is not None
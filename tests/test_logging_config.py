@@ -0,0 +1,40 @@
+import json
+import logging
+import queue
+
+from app.config.logging_config import JsonFormatter, SamplingFilter, NonBlockingQueueHandler
+
+def make_record(msg="Unsafe content detected: %s", args=("hate_speech",), level=logging.WARNING, **extra):
+    record = logging.LogRecord("root", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+def test_json_formatter_includes_extra_fields():
+    record = make_record(categories=["hate_speech"])
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Unsafe content detected: hate_speech"
+    assert entry["level"] == "WARNING"
+    assert entry["categories"] == ["hate_speech"]
+
+def test_sampling_filter_drops_floods_and_reports_suppressed():
+    sampler = SamplingFilter(rate=0.0001, burst=3)
+    passed = [sampler.filter(make_record()) for _ in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+
+    # Errors have their own bucket
+    assert sampler.filter(make_record(level=logging.ERROR))
+
+    sampler._buckets[("root", "test_logging_config", logging.WARNING)][0] = 1.0
+    record = make_record()
+    assert sampler.filter(record)
+    assert record.suppressed == 7
+
+def test_queue_handler_never_blocks_and_defers_formatting():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    first = make_record()
+    handler.emit(first)
+    handler.emit(make_record())
+
+    assert handler.dropped == 1
+    queued = handler.queue.get_nowait()
+    assert queued is first and queued.args == ("hate_speech",)
@@ -0,0 +1,125 @@
+import asyncio
+import pytest
+
+from app.models.graph_state import GraphState
+from app.models.preference import PreferenceCategory, PreferenceOperation, PreferenceUpdate, PreferenceValue
+from app.models.user_input import UserInput
+from app.models.validation_result import InputType
+from app.nodes.validation import PreferenceNode
+from app.utils.exceptions import PreferenceError
+from app.utils.preference_store import PreferenceStore
+
+TECH = PreferenceCategory.TECHNOLOGY
+LOCATION = PreferenceCategory.LOCATION
+
+def update(operation, category, value):
+    return PreferenceUpdate(operation=operation, preferences=[PreferenceValue(category=category, value=value)])
+
+def values(change, category):
+    return [preference.value for preference in change.preferences[category]]
+
+@pytest.mark.asyncio
+async def test_operations_and_versions():
+    store = PreferenceStore(max_per_category=5)
+
+    change = await store.apply("u1", update(PreferenceOperation.ADD, TECH, ["Python", "Rust"]))
+    assert change.changed and change.version == 1
+    assert values(change, TECH) == ["Python", "Rust"]
+
+    # Re-adding a value (any case) replaces it in place; an identical one changes nothing
+    change = await store.apply("u1", update(PreferenceOperation.ADD, TECH, "python"))
+    assert values(change, TECH) == ["python", "Rust"] and change.version == 2
+    change = await store.apply("u1", update(PreferenceOperation.ADD, TECH, "python"))
+    assert not change.changed and change.version == 2
+
+    await store.apply("u1", update(PreferenceOperation.ADD, LOCATION, "Berlin"))
+    change = await store.apply("u1", update(PreferenceOperation.REMOVE, TECH, "RUST"))
+    assert values(change, TECH) == ["python"]
+
+    change = await store.apply("u1", update(PreferenceOperation.UPDATE, TECH, ["Go"]))
+    assert values(change, TECH) == ["Go"]
+
+    stored = await store.get("u1")
+    assert stored.version == 5
+    assert stored.category_versions == {TECH: 5, LOCATION: 3}
+
+    # Queries read the store without changing it
+    change = await store.apply("u1", PreferenceUpdate(operation=PreferenceOperation.QUERY, preferences=[]))
+    assert not change.changed and change.version == 5
+    assert set(change.preferences) == {TECH, LOCATION}
+    assert await store.version("u2") == 0
+
+@pytest.mark.asyncio
+async def test_update_over_the_category_limit_is_rejected_whole():
+    store = PreferenceStore(max_per_category=3)
+    await store.apply("u1", update(PreferenceOperation.ADD, TECH, ["a", "b"]))
+
+    with pytest.raises(PreferenceError):
+        await store.apply("u1", PreferenceUpdate(operation=PreferenceOperation.ADD, preferences=[
+            PreferenceValue(category=LOCATION, value="Paris"),
+            PreferenceValue(category=TECH, value=["c", "d"]),
+        ]))
+
+    stored = await store.get("u1")
+    assert stored.version == 1
+    assert LOCATION not in stored.categories
+    assert [preference.value for preference in stored.categories[TECH]] == ["a", "b"]
+    assert store.metrics()["rejected"] == 1
+
+@pytest.mark.asyncio
+async def test_concurrent_updates_through_shared_store():
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeAsyncRedis()
+    worker_a = PreferenceStore(max_per_category=10, redis=redis, max_retries=8)
+    worker_b = PreferenceStore(max_per_category=10, redis=redis, max_retries=8)
+
+    # Every round of optimistic retries lets at least one update through
+    await asyncio.gather(*[
+        (worker_a if i % 2 else worker_b).apply("u1", update(PreferenceOperation.ADD, TECH, f"tech {i}"))
+        for i in range(8)
+    ])
+
+    stored = await worker_a.get("u1")
+    assert stored.version == 8
+    assert len(stored.categories[TECH]) == 8
+
+@pytest.mark.asyncio
+async def test_preference_query_skips_llm(validator, fake_llm):
+    result = await validator.validate_input(UserInput(raw_input="What are my preferences?", session_id="s1"))
+    assert result.preference_updates.operation == PreferenceOperation.QUERY
+    assert fake_llm.calls == 0
+
+    store = PreferenceStore()
+    await store.apply("u1", update(PreferenceOperation.ADD, TECH, "Python"))
+    state = GraphState(
+        user_input=UserInput(raw_input="What are my preferences?"),
+        validation_result=result,
+        messages=[],
+        next_step="query_preferences",
+        token=None,
+        user_id="u1",
+        preferences=None
+    )
+    state = await PreferenceNode(PreferenceOperation.QUERY, store)(state)
+    assert values(state["preferences"], TECH) == ["Python"]
+
+@pytest.mark.asyncio
+async def test_statements_add_to_stored_preferences_unless_they_replace(validator):
+    store = PreferenceStore()
+    for text in ("I prefer Python for backend work", "I like Rust as well"):
+        result = await validator.validate_input(UserInput(raw_input=text))
+        change = await store.apply("u1", result.preference_updates)
+    assert result.preference_updates.operation == PreferenceOperation.ADD
+    assert values(change, TECH) == ["python", "rust"]
+
+    result = await validator.validate_input(UserInput(raw_input="I prefer Kotlin instead of those"))
+    assert result.preference_updates.operation == PreferenceOperation.UPDATE
+    assert values(await store.apply("u1", result.preference_updates), TECH) == ["kotlin"]
+
+@pytest.mark.asyncio
+async def test_unrecognised_preference_update_asks_for_clarification(validator, fake_llm):
+    result = await validator.validate_input(UserInput(raw_input="I prefer the quieter ones from before"))
+
+    assert not result.is_valid and result.error_message == "Preference clarification needed"
+    assert result.input_type == InputType.PREFERENCE_UPDATE
+    assert result.clarification_questions and fake_llm.calls == 0
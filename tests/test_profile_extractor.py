@@ -0,0 +1,71 @@
+import pytest
+
+from app.models.user_input import UserInput
+from app.utils.profile_extractor import PROFILE_FIELDS, ProfileExtractor
+
+SECTIONED_INPUT = """
+Background: I have a Bachelor's degree in Computer Science and 3 years of experience in web development.
+I'm proficient in Python, JavaScript, and React.
+
+Goals: My goal is to transition into AI/ML development and learn about LLMs and neural networks.
+I'm looking for guidance on the best learning path and resources.
+"""
+
+def test_sectioned_input_is_decided_locally():
+    extraction = ProfileExtractor().extract(SECTIONED_INPUT)
+
+    assert extraction.uncertain(0.8) == []
+    values = extraction.values
+    assert values["has_background"] and values["has_goals"]
+    assert values["background_completeness"] > 0.7
+    assert values["background_info"]["experience_years"] == "3"
+    assert values["background_info"]["education"] == "Bachelor's degree in Computer Science"
+    assert values["background_info"]["skills"] == "python, javascript, react"
+    assert values["goals"][0] == "transition into AI/ML development and learn about LLMs and neural networks"
+
+def test_weak_signals_are_left_to_the_llm():
+    extractor = ProfileExtractor()
+    # A goal mentioned as a topic is not a skill, and nothing states a background
+    extraction = extractor.extract("Tell me about careers in distributed systems and what the market looks like these days")
+    assert extraction.values["background_info"] == {}
+    assert set(extraction.uncertain(0.8)) == set(PROFILE_FIELDS)
+
+    extraction = extractor.extract("I am a backend developer with 5 years of Java experience and I want to move into ML")
+    assert extraction.values["background_info"] == {"role": "backend developer", "experience_years": "5"}
+    assert extraction.uncertain(0.8) == ["goals_clarity"]
+
+def test_weak_regex_hits_are_not_confident_background():
+    extractor = ProfileExtractor()
+    # A number of years without "experience", and a degree that is only mentioned
+    extraction = extractor.extract("What is the 5 year plan for a bachelor's student?")
+    assert "experience_years" not in extraction.values["background_info"]
+    assert "has_background" in extraction.uncertain(0.8) and "background_info" in extraction.uncertain(0.8)
+
+    # "I'm a" followed by something that is not an occupation
+    extraction = extractor.extract("I'm a bit lost and need some direction in my career")
+    assert "role" not in extraction.values["background_info"]
+    extraction = extractor.extract("I am interested in becoming a data engineer")
+    assert extraction.values["background_info"] == {}
+
+    extraction = extractor.extract("I work as a nurse and have 3 yrs exp in ICU care")
+    assert extraction.values["background_info"] == {"role": "nurse", "experience_years": "3", "experience_area": "ICU care"}
+    assert "has_background" not in extraction.uncertain(0.8)
+
+@pytest.mark.asyncio
+async def test_llm_is_asked_only_about_uncertain_fields(validator, fake_llm):
+    prompts = []
+    ainvoke = fake_llm.ainvoke
+
+    async def recording_ainvoke(messages, **kwargs):
+        prompts.append(messages[-1].content)
+        return await ainvoke(messages, **kwargs)
+
+    fake_llm.ainvoke = recording_ainvoke
+    fake_llm.response = {**fake_llm.response, "has_background": False, "background_info": {"wrong": "yes"}}
+
+    result = await validator.validate_input(UserInput(raw_input=SECTIONED_INPUT))
+
+    assert '"background_info"' not in prompts[0] and '"goals_clarity"' not in prompts[0]
+    assert '"clarity_score"' in prompts[0]
+    assert result.has_background
+    assert result.background_info["experience_years"] == "3"
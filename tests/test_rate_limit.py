@@ -0,0 +1,58 @@
+import pytest
+from types import SimpleNamespace
+
+from app.middleware.rate_limit import (
+    RateLimit, InMemoryRateLimitBackend, RedisRateLimitBackend, UserRateLimiter
+)
+from app.utils.exceptions import UserRateLimitExceeded
+
+def make_request(user):
+    return SimpleNamespace(state=SimpleNamespace(user=user), client=SimpleNamespace(host="10.0.0.1"), headers={})
+
+def test_parse_rate_limit():
+    limit = RateLimit.parse("60/minute;burst=10")
+    assert limit.rate == 60 and limit.period == 60 and limit.burst == 10
+    assert limit.emission_interval == 1.0
+    assert RateLimit.parse("5/minute").burst == 5
+
+async def exhaust(backend, limit):
+    allowed = 0
+    for _ in range(limit.burst + 3):
+        decision = await backend.hit("process_input:u1", limit)
+        if not decision.allowed:
+            assert decision.retry_after > 0
+            break
+        allowed += 1
+    return allowed
+
+@pytest.mark.asyncio
+async def test_in_memory_gcra_allows_burst_then_limits():
+    limit = RateLimit.parse("5/minute")
+    assert await exhaust(InMemoryRateLimitBackend(), limit) == 5
+
+@pytest.mark.asyncio
+async def test_redis_gcra_matches_in_memory():
+    fakeredis = pytest.importorskip("fakeredis")
+    backend = RedisRateLimitBackend(fakeredis.FakeAsyncRedis())
+    limit = RateLimit.parse("5/minute")
+    assert await exhaust(backend, limit) == 5
+
+@pytest.mark.asyncio
+async def test_limits_are_per_user_and_per_tier():
+    limiter = UserRateLimiter(InMemoryRateLimitBackend(), tiers={
+        "free": RateLimit.parse("1/minute"),
+        "pro": RateLimit.parse("3/minute")
+    })
+
+    await limiter.check(make_request({"user_id": "alice"}), "process_input")
+    with pytest.raises(UserRateLimitExceeded) as exc_info:
+        await limiter.check(make_request({"user_id": "alice"}), "process_input")
+    assert exc_info.value.retry_after >= 1
+
+    # Another user behind the same address has their own bucket
+    await limiter.check(make_request({"user_id": "bob"}), "process_input")
+
+    for _ in range(3):
+        await limiter.check(make_request({"user_id": "carol", "tier": "pro"}), "process_input")
+    with pytest.raises(UserRateLimitExceeded):
+        await limiter.check(make_request({"user_id": "carol", "tier": "pro"}), "process_input")
@@ -0,0 +1,60 @@
+import pytest
+
+from app.models.conversation_memory import ConversationTurn
+from app.models.user_input import UserInput
+from app.models.validation_result import InputType, ValidationResult
+from app.utils.result_cache import ValidationResultCache
+
+def make_result(**overrides):
+    fields = dict(
+        is_valid=True, has_background=True, has_goals=True,
+        background_completeness=0.8, goals_clarity=0.8, input_type=InputType.NEW_QUERY
+    )
+    fields.update(overrides)
+    return ValidationResult(**fields)
+
+@pytest.mark.asyncio
+async def test_repeated_first_turn_inputs_skip_llm(validator, fake_llm):
+    await validator.validate_input(UserInput(raw_input="I am a nurse looking to move into tech", session_id="a"))
+    # Different session, same empty context; NFKC and whitespace differences don't matter
+    result = await validator.validate_input(UserInput(raw_input="I am a  nurse looking to move into ｔｅｃｈ ", session_id="b"))
+
+    assert fake_llm.calls == 1
+    assert result.is_valid
+    assert validator.result_cache.metrics()["hit_ratio"] == 0.5
+
+    # Same input with different recent context is a miss
+    await validator.validate_input(UserInput(raw_input="I am a nurse looking to move into tech", session_id="b"))
+    assert fake_llm.calls == 2
+
+def test_context_and_type_are_part_of_the_key():
+    cache = ValidationResultCache()
+    turns = [ConversationTurn(user_input="hello", input_type="new_query")]
+    cache.put("input", turns, InputType.NEW_QUERY, make_result())
+
+    assert cache.get("input", turns, InputType.NEW_QUERY) is not None
+    assert cache.get("input", [], InputType.NEW_QUERY) is None
+    assert cache.get("input", turns, InputType.REWRITE_REQUEST) is None
+
+def test_errors_and_degraded_results_are_not_cached():
+    cache = ValidationResultCache()
+    cache.put("a", [], InputType.NEW_QUERY, make_result(degraded=True))
+    cache.put("b", [], InputType.NEW_QUERY, make_result(is_valid=False, validation_details={"error_type": "LLMError"}))
+
+    assert cache.get("a", [], InputType.NEW_QUERY) is None
+    assert cache.get("b", [], InputType.NEW_QUERY) is None
+    assert cache.metrics()["skipped"] == 2
+
+def test_entries_expire_and_are_bounded(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.utils.result_cache.time.monotonic", lambda: now[0])
+    cache = ValidationResultCache(max_entries=2, ttl=10)
+    for text in ("a", "b", "c"):
+        cache.put(text, [], InputType.NEW_QUERY, make_result())
+    assert cache.get("a", [], InputType.NEW_QUERY) is None
+    assert cache.get("c", [], InputType.NEW_QUERY) is not None
+
+    now[0] += 11
+    assert cache.get("c", [], InputType.NEW_QUERY) is None
+    assert cache.metrics()["evictions"] == 1
+    assert cache.metrics()["expirations"] == 1
@@ -0,0 +1,58 @@
+import json
+
+from fastapi.responses import JSONResponse
+
+from app.models.preference import PreferenceAnalysisResult, PreferenceOperation
+from app.models.validation_result import InputType, ValidationResult
+from app.utils.input_validator import BLOCKED_RESULT
+from app.utils.json_response import ModelJSONResponse
+
+def test_template_results_match_validated_construction(validator):
+    result = validator._create_blocked_result({"input_rails": {"allowed": False}})
+    expected = ValidationResult(
+        is_valid=False,
+        has_background=False,
+        has_goals=False,
+        background_completeness=0.0,
+        goals_clarity=0.0,
+        clarity_score=0.0,
+        safety_score=0.0,
+        context_score=0.0,
+        input_type=InputType.INVALID_INPUT,
+        error_message="Content blocked by safety checks",
+        missing_elements=['Blocked by guardrails'],
+        suggestions=["Please rephrase your query", "Please avoid sensitive or prohibited topics"],
+        clarification_questions=["Could you please rephrase your request in a more appropriate way?"],
+        guardrails_result={"input_rails": {"allowed": False}}
+    )
+    assert result == expected
+
+    error = validator._create_error_result("llm_error", "LLM failed", {"error": "timeout"})
+    assert error.error_message == "LLM failed" and error.validation_details["error_type"] == "llm_error"
+
+def test_template_results_do_not_share_state(validator):
+    analysis = PreferenceAnalysisResult(
+        detected_operation=PreferenceOperation.UPDATE,
+        detected_preferences=[],
+        confidence_score=0.3,
+        needs_clarification=True,
+        clarification_questions=["Which technologies?"]
+    )
+    first = validator._create_preference_clarification_result(analysis)
+    first.suggestions.append("changed")
+    first.clarification_questions.append("changed")
+    first.validation_details["changed"] = True
+
+    second = validator._create_preference_clarification_result(analysis)
+    assert "changed" not in second.suggestions and second.validation_details == {}
+    assert analysis.clarification_questions == ["Which technologies?"]
+    assert BLOCKED_RESULT.new().guardrails_result == {}
+
+def test_model_response_matches_dict_response():
+    result = BLOCKED_RESULT.new(guardrails_result={"rail": "input"})
+    payload = {"is_valid": False, "next_step": "error", "messages": [], "preferences": None}
+
+    fast = ModelJSONResponse({**payload, "validation_result": result})
+    slow = JSONResponse({**payload, "validation_result": result.model_dump(mode="json")})
+    assert json.loads(fast.body) == json.loads(slow.body)
+    assert fast.headers["content-type"] == "application/json"
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+
+from app.models.conversation_memory import ConversationTurn
+from app.models.user_input import UserInput
+from app.utils.session_memory import SessionMemoryStore
+
+@pytest.mark.asyncio
+async def test_shared_validator_keeps_sessions_apart(validator):
+    await asyncio.gather(
+        validator.validate_input(UserInput(raw_input="I am a nurse looking to move into tech", session_id="alice")),
+        validator.validate_input(UserInput(raw_input="Tell me about distributed systems", session_id="bob")),
+    )
+
+    alice = await validator.memory_store.get("alice")
+    bob = await validator.memory_store.get("bob")
+    assert [turn.user_input for turn in alice.turns] == ["I am a nurse looking to move into tech"]
+    assert [turn.user_input for turn in bob.turns] == ["Tell me about distributed systems"]
+
+    # Inputs without a session never share memory
+    await validator.validate_input(UserInput(raw_input="Tell me about Rust"))
+    assert len((await validator.memory_store.get(None)).turns) == 0
+
+@pytest.mark.asyncio
+async def test_sessions_are_bounded_and_lru_evicted():
+    store = SessionMemoryStore(max_sessions=2, max_turns=3)
+    first = await store.get("s1")
+    for i in range(5):
+        first.add_turn(ConversationTurn(user_input=f"turn {i}", input_type="new_query"))
+    assert [turn.user_input for turn in first.turns] == ["turn 2", "turn 3", "turn 4"]
+
+    await store.get("s2")
+    await store.get("s1")
+    await store.get("s3")
+    assert store.metrics() == {"sessions": 2, "evictions": 1}
+    assert (await store.get("s1")) is first
+    assert len((await store.get("s2")).turns) == 0
+
+@pytest.mark.asyncio
+async def test_sessions_persist_to_shared_store():
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeAsyncRedis()
+    store = SessionMemoryStore(redis=redis)
+    memory = await store.get("s1")
+    memory.add_turn(ConversationTurn(user_input="I want to learn Go", input_type="new_query", goals=["learn go"]))
+    store.save("s1")
+    await asyncio.gather(*store._pending_writes)
+
+    restored = await SessionMemoryStore(redis=redis).get("s1")
+    assert restored.get_goals() == ["learn go"]
+
+@pytest.mark.asyncio
+async def test_workers_sharing_a_session_keep_each_others_turns():
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeAsyncRedis()
+    workers = [SessionMemoryStore(redis=redis, max_turns=3), SessionMemoryStore(redis=redis, max_turns=3)]
+
+    async def add_turn(store, text):
+        memory = await store.get("s1")
+        memory.add_turn(ConversationTurn(user_input=text, input_type="new_query"))
+        store.save("s1")
+        await asyncio.gather(*store._pending_writes)
+
+    # Alternate workers, each holding a cached copy the other has since extended
+    await add_turn(workers[0], "turn 0")
+    await add_turn(workers[1], "turn 1")
+    await add_turn(workers[0], "turn 2")
+    # Both workers read, then both write
+    first, second = await workers[0].get("s1"), await workers[1].get("s1")
+    first.add_turn(ConversationTurn(user_input="turn 3a", input_type="new_query"))
+    second.add_turn(ConversationTurn(user_input="turn 3b", input_type="new_query"))
+    workers[0].save("s1")
+    workers[1].save("s1")
+    await asyncio.gather(*workers[0]._pending_writes, *workers[1]._pending_writes)
+
+    for store in workers + [SessionMemoryStore(redis=redis, max_turns=3)]:
+        memory = await store.get("s1")
+        assert [turn.user_input for turn in memory.turns] == ["turn 2", "turn 3a", "turn 3b"]
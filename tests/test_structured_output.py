@@ -0,0 +1,121 @@
+import json
+import pytest
+
+from app.models.user_input import UserInput
+from app.models.validation_result import ValidationResult
+from app.utils.input_validator import SERVICE_FIELDS
+from app.utils.structured_output import (
+    OutputMode, StructuredOutput, compact_instructions, tool_schema, verbose_instructions
+)
+from input_analysis_node import InputAnalysisOutput
+
+class ToolMessage:
+    def __init__(self, args: dict, calls: bool = True, content: str = ""):
+        self.content = content
+        self.tool_calls = [{"name": "ValidationResult", "args": args}] if calls else []
+
+class ToolCallingLLM:
+    def __init__(self):
+        self.bound = None
+
+    def bind_tools(self, tools, tool_choice=None):
+        self.bound = (tools, tool_choice)
+        return self
+
+def test_compact_instructions_keep_types_ranges_and_choices():
+    instructions = compact_instructions(InputAnalysisOutput)
+    assert '"confidence_score": int 0-100' in instructions
+    assert '"clarity_status": "clear"|"needs_clarification"|"ambiguous"' in instructions
+    assert '"analysis_summary": {"background": str' in instructions
+
+    instructions = compact_instructions(ValidationResult, SERVICE_FIELDS)
+    assert '"input_type": "new_query"|' in instructions and '"clarity_score"?: float 0-1' in instructions
+    assert '"degraded"' not in instructions
+    assert len(instructions) * 3 < len(verbose_instructions(ValidationResult, SERVICE_FIELDS))
+
+def test_schemas_are_built_once_per_model():
+    assert compact_instructions(ValidationResult, SERVICE_FIELDS) is compact_instructions(ValidationResult, SERVICE_FIELDS)
+    assert tool_schema(ValidationResult, SERVICE_FIELDS) is tool_schema(ValidationResult, SERVICE_FIELDS)
+
+def test_native_mode_uses_tool_calling_when_available():
+    output = StructuredOutput(ValidationResult, OutputMode.NATIVE)
+    llm = ToolCallingLLM()
+
+    assert output.bind(llm, SERVICE_FIELDS) is llm
+    tools, tool_choice = llm.bound
+    assert tool_choice == "ValidationResult"
+    parameters = tools[0]["function"]["parameters"]
+    assert "degraded" not in parameters["properties"] and "title" not in parameters
+    assert "Keys and types" not in output.instructions(llm)
+    assert json.loads(output.text(ToolMessage({"is_valid": True}))) == {"is_valid": True}
+
+    # Clients without tool calling get the compact schema in the prompt
+    plain = object()
+    assert output.bind(plain) is plain
+    assert output.instructions(plain, SERVICE_FIELDS) == compact_instructions(ValidationResult, SERVICE_FIELDS)
+
+class NativeLLM:
+    """Tool-calling client: bound calls answer with a tool call, plain calls (follow-ups) with content"""
+    def __init__(self, args=None, content="", follow_up=None):
+        self.args = args
+        self.content = content
+        self.follow_up = follow_up or {}
+        self.bound = None
+        self.prompts = []
+
+    def bind_tools(self, tools, tool_choice=None):
+        self.bound = (tools, tool_choice)
+        return BoundLLM(self)
+
+    async def ainvoke(self, messages, **kwargs):
+        self.prompts.append(messages[-1].content)
+        return ToolMessage(self.follow_up, calls=False, content=json.dumps(self.follow_up))
+
+class BoundLLM:
+    def __init__(self, llm: NativeLLM):
+        self.llm = llm
+
+    async def ainvoke(self, messages, **kwargs):
+        self.llm.prompts.append(messages[-1].content)
+        return ToolMessage(self.llm.args, calls=self.llm.args is not None, content=self.llm.content)
+
+def native_validator(validator, llm):
+    validator.llm = llm
+    validator.structured_output = StructuredOutput(ValidationResult, OutputMode.NATIVE)
+    return validator
+
+QUESTION = UserInput(raw_input="Tell me about careers in distributed systems and what the market looks like these days")
+
+@pytest.mark.asyncio
+async def test_native_tool_call_answer(validator, fake_llm):
+    llm = NativeLLM(args=fake_llm.response)
+    result = await native_validator(validator, llm).validate_input(QUESTION)
+
+    assert llm.bound[1] == "ValidationResult"
+    assert "Call the ValidationResult function" in llm.prompts[0] and "Keys and types" not in llm.prompts[0]
+    assert len(llm.prompts) == 1
+    assert result.is_valid and not result.degraded and result.goals_clarity == 0.8
+
+@pytest.mark.asyncio
+async def test_native_tool_call_with_missing_fields_asks_for_them(validator, fake_llm):
+    args = {name: value for name, value in fake_llm.response.items() if name not in ("background_completeness", "goals_clarity")}
+    llm = NativeLLM(args=args, follow_up={"background_completeness": 0.4, "goals_clarity": 0.7})
+    result = await native_validator(validator, llm).validate_input(QUESTION)
+
+    assert len(llm.prompts) == 2 and "background_completeness, goals_clarity" in llm.prompts[1]
+    assert not result.degraded
+    assert result.background_completeness == 0.4 and result.goals_clarity == 0.7
+
+@pytest.mark.asyncio
+async def test_native_answer_without_tool_call(validator, fake_llm):
+    # Answered in the message body despite the forced tool call: still parsed
+    llm = NativeLLM(content=json.dumps(fake_llm.response))
+    result = await native_validator(validator, llm).validate_input(QUESTION)
+    assert result.is_valid and not result.degraded
+
+    # No tool call and nothing usable: a degraded local answer, not an error
+    llm = NativeLLM(content="I can't help with that.")
+    result = await native_validator(validator, llm).validate_input(
+        UserInput(raw_input="What does a week look like for people who run infrastructure at large companies")
+    )
+    assert result.degraded
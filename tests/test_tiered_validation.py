@@ -0,0 +1,52 @@
+import time
+import pytest
+
+from app.models.user_input import UserInput
+from app.models.validation_result import InputType
+from app.utils.deadline import request_deadline, time_remaining
+
+class FailingLLM:
+    async def ainvoke(self, messages, **kwargs):
+        raise RuntimeError("upstream 503")
+
+@pytest.mark.asyncio
+async def test_llm_answer_without_deadline(validator, fake_llm):
+    result = await validator.validate_input(UserInput(raw_input="Tell me about distributed systems"))
+    assert fake_llm.calls == 1
+    assert result.is_valid and not result.degraded
+
+@pytest.mark.asyncio
+async def test_slow_llm_degrades_at_deadline(validator, fake_llm, monkeypatch):
+    # Leave enough time to try the LLM, but not enough for it to answer
+    monkeypatch.setattr("app.utils.input_validator.MIN_LLM_SECONDS", 0.0)
+    fake_llm.delay = 1.0
+    start = time.monotonic()
+    with request_deadline(0.05):
+        result = await validator.validate_input(UserInput(raw_input="Please rewrite my learning plan"))
+
+    assert time.monotonic() - start < 0.5
+    assert result.degraded and result.is_valid
+    assert result.input_type == InputType.REWRITE_REQUEST
+    assert result.validation_details["degraded_reason"] == "DeadlineExceededError"
+
+@pytest.mark.asyncio
+async def test_exhausted_deadline_skips_llm(validator, fake_llm):
+    with request_deadline(0.0):
+        assert time_remaining() == 0.0
+        result = await validator.validate_input(UserInput(raw_input="Tell me about distributed systems"))
+    assert fake_llm.calls == 0
+    assert result.degraded
+
+@pytest.mark.asyncio
+async def test_llm_failure_degrades_instead_of_erroring(validator):
+    validator.llm = FailingLLM()
+    result = await validator.validate_input(UserInput(raw_input="Tell me about distributed systems"))
+    assert result.degraded and result.is_valid
+    assert result.validation_details["degraded_reason"] == "LLMError"
+
+@pytest.mark.asyncio
+async def test_safety_tier_short_circuits_before_llm(validator, fake_llm):
+    with request_deadline(0.0):
+        result = await validator.validate_input(UserInput(raw_input="sudo rm -rf /"))
+    assert fake_llm.calls == 0
+    assert not result.is_valid and not result.degraded
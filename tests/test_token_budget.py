@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+
+from app.middleware.token_budget import (
+    TokenBudget, InMemoryTokenBudgetBackend, RedisTokenBudgetBackend, estimate_tokens
+)
+from app.utils.exceptions import UserRateLimitExceeded
+from app.utils.llm_client import track_token_usage, record_token_usage
+
+def make_request(user_id):
+    return SimpleNamespace(state=SimpleNamespace(user={"user_id": user_id}), client=SimpleNamespace(host="10.0.0.1"), headers={})
+
+def test_estimate_grows_with_input():
+    assert estimate_tokens("x" * 2000) - estimate_tokens("hi") == 500 - 1
+
+async def settle_cycle(budget):
+    # Cheap requests are refunded once they turn out not to use the LLM
+    for _ in range(10):
+        reservation = await budget.reserve(make_request("cheap"), 800)
+        await budget.settle(reservation, 0)
+
+    # An expensive user is throttled at their share...
+    reservation = await budget.reserve(make_request("heavy"), 800)
+    await budget.settle(reservation, 1000)
+    with pytest.raises(UserRateLimitExceeded) as exc_info:
+        await budget.reserve(make_request("heavy"), 800)
+    assert exc_info.value.retry_after >= 1
+
+    # ...without penalizing anyone else
+    await budget.reserve(make_request("cheap"), 800)
+
+@pytest.mark.asyncio
+async def test_in_memory_budget_settles_actual_usage():
+    budget = TokenBudget(InMemoryTokenBudgetBackend(), global_limit=3000, user_max=1500, min_share=1000)
+    await settle_cycle(budget)
+    assert budget.throttled_count == 1
+
+@pytest.mark.asyncio
+async def test_redis_budget_settles_actual_usage():
+    fakeredis = pytest.importorskip("fakeredis")
+    budget = TokenBudget(RedisTokenBudgetBackend(fakeredis.FakeAsyncRedis()), global_limit=3000, user_max=1500, min_share=1000)
+    await settle_cycle(budget)
+
+@pytest.mark.asyncio
+async def test_global_budget_is_shared():
+    budget = TokenBudget(InMemoryTokenBudgetBackend(), global_limit=2000, user_max=2000, min_share=500)
+    await budget.reserve(make_request("a"), 900)
+    await budget.reserve(make_request("b"), 900)
+    with pytest.raises(UserRateLimitExceeded):
+        await budget.reserve(make_request("c"), 900)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("store", ["memory", "redis"])
+async def test_one_reservation_cannot_take_the_whole_budget(store):
+    if store == "redis":
+        backend = RedisTokenBudgetBackend(pytest.importorskip("fakeredis").FakeAsyncRedis())
+    else:
+        backend = InMemoryTokenBudgetBackend()
+    budget = TokenBudget(backend, global_limit=3000, user_max=1500, min_share=1000)
+    reservation = await budget.reserve(make_request("big"), 50000)
+    assert reservation.tokens == 1500
+    await budget.reserve(make_request("other"), 800)
+    with pytest.raises(UserRateLimitExceeded):
+        await budget.reserve(make_request("big"), 800)
+
+@pytest.mark.asyncio
+async def test_idle_users_are_pruned(monkeypatch):
+    backend = InMemoryTokenBudgetBackend()
+    budget = TokenBudget(backend, global_limit=3000, user_max=1500, min_share=1000)
+    now = [1000.0]
+    monkeypatch.setattr("app.middleware.token_budget.time.time", lambda: now[0])
+
+    for user in ("a", "b"):
+        await budget.reserve(make_request(user), 100)
+    late = await budget.reserve(make_request("a"), 100)
+    now[0] += 61
+    await budget.settle(late, 0)
+    await budget.reserve(make_request("c"), 100)
+
+    assert set(backend._users) == {"c"} and set(backend._last_seen) == {"c"}
+
+@pytest.mark.asyncio
+async def test_token_usage_is_tracked_across_tasks():
+    response = SimpleNamespace(usage_metadata={"total_tokens": 120})
+
+    async def call_llm():
+        record_token_usage(response)
+
+    with track_token_usage() as usage:
+        await asyncio.gather(call_llm(), call_llm())
+    assert usage.total_tokens == 240 and usage.calls == 2